@@ -0,0 +1,226 @@
+"""
+Alert digests.
+
+Alerts are grouped into frequency buckets (instant, daily, weekly). A bucket
+run finds the users with an alert that is due -- never sent, or last sent
+before the current period (minute, day or ISO week) began -- and has
+undelivered ``AlertMatch`` rows, then handles
+them in chunks. Each chunk is one transaction that writes one
+``AlertDigest`` per user, attaches the matches to it and moves the alerts'
+``last_sent`` with a single ``bulk_update``; digests are delivered only
+after that commit.
+
+Delivery is at-most-once: a digest is claimed (``pending`` -> ``sending``)
+by a conditional update before it is sent, so two workers never send the
+same digest, and a digest left in ``sending`` by a crash is marked failed
+rather than sent again. Each sent digest also lands in the user's in-app
+notification inbox.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Alert, AlertDigest, AlertMatch, Notification
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = (Alert.FREQUENCY_INSTANT, Alert.FREQUENCY_DAILY, Alert.FREQUENCY_WEEKLY)
+# Sends that have not finished after this long are assumed to have crashed.
+STALE_SENDING_AFTER = timedelta(minutes=30)
+
+
+def period_key(frequency, now):
+    """The period a digest belongs to; at most one digest per user per period"""
+    if frequency == Alert.FREQUENCY_WEEKLY:
+        year, week, _ = now.isocalendar()
+        return f'{year}-W{week:02d}'
+    if frequency == Alert.FREQUENCY_DAILY:
+        return now.strftime('%Y-%m-%d')
+    return now.strftime('%Y-%m-%dT%H:%M')
+
+
+def period_start(frequency, now):
+    """When the period ``period_key`` names for ``now`` began"""
+    start = now.replace(second=0, microsecond=0)
+    if frequency == Alert.FREQUENCY_INSTANT:
+        return start
+    start = start.replace(hour=0, minute=0)
+    if frequency == Alert.FREQUENCY_WEEKLY:
+        start -= timedelta(days=now.weekday())
+    return start
+
+
+def due_alerts(frequency, now):
+    """
+    Active alerts of ``frequency`` not yet sent in the current period that
+    have undelivered matches. Comparing against the period rather than
+    ``now`` minus an interval keeps a run that starts a little earlier than
+    the previous one from skipping a whole period.
+    """
+    # ``Exists`` rather than ``matches__digest__isnull``, whose outer join
+    # also lets through alerts with no matches at all. Matches on inactive
+    # jobs are never delivered, so they do not make an alert due either.
+    undelivered = AlertMatch.objects.filter(
+        alert_id=OuterRef('pk'), digest__isnull=True, job__is_active=True
+    )
+    return Alert.objects.filter(
+        Q(last_sent__isnull=True) | Q(last_sent__lt=period_start(frequency, now)),
+        Exists(undelivered),
+        frequency=frequency,
+        is_active=True,
+    )
+
+
+def due_user_ids(frequency, now):
+    return list(
+        due_alerts(frequency, now).order_by('user_id').values_list('user_id', flat=True).distinct()
+    )
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def build_digests(frequency, user_ids, now, period):
+    """
+    Write the digests of ``user_ids`` for ``period`` in one transaction and
+    return the ids of those still waiting to be sent.
+    """
+    with transaction.atomic():
+        alerts = list(
+            due_alerts(frequency, now).filter(user_id__in=user_ids).only('id', 'user_id', 'last_sent')
+        )
+        if not alerts:
+            return []
+        owner = {alert.id: alert.user_id for alert in alerts}
+        matches = list(
+            AlertMatch.objects.filter(
+                alert_id__in=list(owner), digest__isnull=True, job__is_active=True
+            ).only('id', 'alert_id', 'job_id')
+        )
+
+        users = sorted({owner[m.alert_id] for m in matches})
+        AlertDigest.objects.bulk_create(
+            [AlertDigest(user_id=user_id, frequency=frequency, period=period) for user_id in users],
+            ignore_conflicts=True,
+        )
+        digests = {
+            d.user_id: d
+            for d in AlertDigest.objects.filter(frequency=frequency, period=period, user_id__in=users)
+        }
+
+        for match in matches:
+            digest = digests[owner[match.alert_id]]
+            if digest.status == AlertDigest.STATUS_PENDING:
+                match.digest_id = digest.id
+                match.sent_at = now
+        AlertMatch.objects.bulk_update(
+            [m for m in matches if m.digest_id], ['digest', 'sent_at'], batch_size=1000
+        )
+        delivered = {m.alert_id for m in matches if m.digest_id}
+        alerts = [alert for alert in alerts if alert.id in delivered]
+        for alert in alerts:
+            alert.last_sent = now
+        Alert.objects.bulk_update(alerts, ['last_sent'], batch_size=1000)
+
+    return [d.id for d in digests.values() if d.status == AlertDigest.STATUS_PENDING]
+
+
+def claim(digest_id):
+    """Move a digest from pending to sending; ``False`` if another worker got it first"""
+    return AlertDigest.objects.filter(id=digest_id, status=AlertDigest.STATUS_PENDING).update(
+        status=AlertDigest.STATUS_SENDING, claimed_at=timezone.now()
+    ) == 1
+
+
+def render_digest(digest, jobs):
+    lines = [f'{len(jobs)} new job(s) match your {digest.frequency} alerts:', '']
+    lines.extend(f'- {job.title} at {job.company_name} ({job.location})' for job in jobs)
+    return '\n'.join(lines)
+
+
+def deliver_digests(digest_ids):
+    """Send the given digests; returns how many were sent by this call"""
+    claimed = [digest_id for digest_id in digest_ids if claim(digest_id)]
+    if not claimed:
+        return 0
+
+    digests = AlertDigest.objects.filter(id__in=claimed).select_related('user')
+    jobs = defaultdict(dict)
+    matches = AlertMatch.objects.filter(digest_id__in=claimed).select_related('job').order_by('job_id')
+    for match in matches:
+        jobs[match.digest_id][match.job_id] = match.job
+
+    sent = []
+    connection = get_connection()
+    for digest in digests:
+        try:
+            EmailMessage(
+                subject=f'New jobs matching your alerts ({digest.period})',
+                body=render_digest(digest, list(jobs[digest.id].values())),
+                to=[digest.user.email],
+                connection=connection,
+            ).send()
+        except Exception:
+            logger.exception("Could not send alert digest %s", digest.id)
+            status = AlertDigest.STATUS_FAILED
+        else:
+            status = AlertDigest.STATUS_SENT
+            sent.append(digest)
+        AlertDigest.objects.filter(id=digest.id).update(
+            status=status, sent_at=timezone.now() if status == AlertDigest.STATUS_SENT else None
+        )
+
+    notify([
+        Notification(
+            user_id=digest.user_id,
+            kind=Notification.KIND_ALERT_DIGEST,
+            title=f'{len(jobs[digest.id])} new job(s) match your alerts',
+            body=render_digest(digest, list(jobs[digest.id].values())),
+            digest=digest,
+        )
+        for digest in sent
+    ])
+    return len(sent)
+
+
+def recover(now):
+    """
+    Deal with a previous run that crashed: digests never claimed are still
+    sent; digests stuck mid-send are failed, not re-sent.
+    """
+    AlertDigest.objects.filter(
+        status=AlertDigest.STATUS_SENDING, claimed_at__lt=now - STALE_SENDING_AFTER
+    ).update(status=AlertDigest.STATUS_FAILED)
+    return list(
+        AlertDigest.objects.filter(status=AlertDigest.STATUS_PENDING).values_list('id', flat=True)
+    )
+
+
+def process_batch(frequency, user_ids, now, period):
+    """Build and deliver one chunk of users; returns ``(built, sent)``"""
+    digest_ids = build_digests(frequency, user_ids, now, period)
+    return len(digest_ids), deliver_digests(digest_ids)
+
+
+def run_bucket(frequency, now=None, batch_size=None):
+    """Process every due user of ``frequency`` in this process; returns ``(built, sent)``"""
+    now = now or timezone.now()
+    batch_size = batch_size or settings.ALERT_DIGEST_BATCH_SIZE
+    period = period_key(frequency, now)
+
+    sent = deliver_digests(recover(now))
+    built = 0
+    for user_ids in chunked(due_user_ids(frequency, now), batch_size):
+        batch_built, batch_sent = process_batch(frequency, user_ids, now, period)
+        built += batch_built
+        sent += batch_sent
+    return built, sent
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.alerts.matching import match_new_jobs
+
+
+class Command(BaseCommand):
+    help = "Match jobs posted or reactivated since the last run against every active alert"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Jobs matched per batch")
+
+    def handle(self, *args, **options):
+        run = match_new_jobs(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {run.jobs_scanned} jobs, recorded {run.matches_found} alert matches"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.alerts.digests import FREQUENCIES, run_bucket
+
+
+class Command(BaseCommand):
+    help = "Build and send the digests of due alerts, one frequency bucket at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frequency', choices=sorted(FREQUENCIES), action='append', dest='frequencies',
+                            help="Bucket to process (repeatable; defaults to all)")
+        parser.add_argument('--batch-size', type=int, help="Users per batch")
+
+    def handle(self, *args, **options):
+        for frequency in options['frequencies'] or list(FREQUENCIES):
+            built, sent = run_bucket(frequency, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{frequency}: built {built} digests, sent {sent}"))
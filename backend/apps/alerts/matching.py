@@ -0,0 +1,216 @@
+"""
+Alert matching.
+
+All active alerts are compiled into one term -> clause postings index. An
+alert's ``keywords`` are comma-separated clauses ("python django, rust");
+a clause matches a job when every one of its terms occurs in the job's
+title, description, tags or required skills, and the alert matches when
+any clause does and every term of its ``location_filter`` (if set) occurs
+in the job's location. Each clause is posted under its rarest term only,
+so matching a batch of jobs is one pass over the jobs' terms plus a subset
+check per candidate clause -- no query per alert.
+
+Jobs reach the matcher through ``PendingAlertJob``, which job saves fill as
+jobs are posted or reactivated, rather than through an id watermark: ids
+can commit out of order and a job activated long after it was created
+would sit below any watermark.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.events import publish_many
+
+from apps.jobs.models import Job
+from apps.jobs.search import SEARCH_FIELDS, tokenize
+
+from .models import Alert, AlertMatch, AlertMatchRun, PendingAlertJob
+
+def parse_clauses(keywords):
+    """``"python django, rust"`` -> ``[frozenset({'python', 'django'}), frozenset({'rust'})]``"""
+    clauses = []
+    for part in (keywords or '').split(','):
+        terms = frozenset(tokenize(part))
+        if terms and terms not in clauses:
+            clauses.append(terms)
+    return clauses
+
+
+def job_terms(job):
+    return set(tokenize(' '.join(getattr(job, field) or '' for field in SEARCH_FIELDS)))
+
+
+class AlertMatcher:
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._alerts = {}
+        self._term_counts = Counter()
+        self._lock = threading.RLock()
+        self.synced_at = None
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def __contains__(self, alert_id):
+        return alert_id in self._alerts
+
+    def add_alert(self, alert_id, keywords, location_filter=None):
+        """Compile an alert, replacing any previous version of it"""
+        clauses = parse_clauses(keywords)
+        location = frozenset(tokenize(location_filter)) or None
+        with self._lock:
+            self._discard(alert_id)
+            if not clauses:
+                return
+            self._alerts[alert_id] = (clauses, location)
+            for clause in clauses:
+                self._term_counts.update(clause)
+            for clause in clauses:
+                # Rarest term so far: fewest candidate clauses per job term.
+                anchor = min(clause, key=lambda term: (self._term_counts[term], term))
+                self._postings[anchor].add((alert_id, clause))
+
+    def remove_alert(self, alert_id):
+        with self._lock:
+            self._discard(alert_id)
+
+    def _discard(self, alert_id):
+        entry = self._alerts.pop(alert_id, None)
+        if entry is None:
+            return
+        for clause in entry[0]:
+            self._term_counts.subtract(clause)
+            for term in clause:
+                posting = self._postings.get(term)
+                if posting is not None:
+                    posting.discard((alert_id, clause))
+                    if not posting:
+                        del self._postings[term]
+
+    def match(self, jobs):
+        """Return ``{alert_id: [job_id, ...]}`` for a batch of ``Job`` instances"""
+        matches = defaultdict(list)
+        with self._lock:
+            for job in jobs:
+                terms = job_terms(job)
+                location = set(tokenize(job.location))
+                matched = set()
+                for term in terms:
+                    for alert_id, clause in self._postings.get(term, ()):
+                        if alert_id in matched or not clause <= terms:
+                            continue
+                        alert_location = self._alerts[alert_id][1]
+                        if alert_location and not alert_location <= location:
+                            continue
+                        matched.add(alert_id)
+                        matches[alert_id].append(job.id)
+        return dict(matches)
+
+    @classmethod
+    def from_db(cls):
+        matcher = cls()
+        matcher.synced_at = time.time()
+        alerts = Alert.objects.filter(is_active=True).values_list('id', 'keywords', 'location_filter')
+        for alert_id, keywords, location_filter in alerts.iterator(chunk_size=5000):
+            matcher.add_alert(alert_id, keywords, location_filter)
+        return matcher
+
+    def sync(self):
+        """Catch up with alerts created, edited, deactivated or deleted since the last sync"""
+        started = time.time()
+        since = datetime.fromtimestamp(self.synced_at or 0, tz=dt_timezone.utc)
+        changed = Alert.objects.filter(updated_at__gte=since).values_list(
+            'id', 'keywords', 'location_filter', 'is_active'
+        )
+        for alert_id, keywords, location_filter, is_active in changed.iterator(chunk_size=5000):
+            if is_active:
+                self.add_alert(alert_id, keywords, location_filter)
+            else:
+                self.remove_alert(alert_id)
+        # Deleted rows leave no updated_at trace.
+        live = set(Alert.objects.filter(is_active=True).values_list('id', flat=True))
+        with self._lock:
+            for alert_id in [a for a in self._alerts if a not in live]:
+                self._discard(alert_id)
+        self.synced_at = started
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_alert_matcher(max_age=None):
+    """
+    This process's matcher, synced with the ``Alert`` table if older than
+    ``max_age`` seconds (``ALERT_MATCHER_SYNC_INTERVAL`` by default)
+    """
+    global _matcher
+    if max_age is None:
+        max_age = getattr(settings, 'ALERT_MATCHER_SYNC_INTERVAL', 30)
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = AlertMatcher.from_db()
+        elif time.time() - (_matcher.synced_at or 0) >= max_age:
+            _matcher.sync()
+        return _matcher
+
+
+def match_new_jobs(batch_size=1000):
+    """
+    Match the queued jobs against every active alert, record an
+    ``AlertMatch`` per hit and empty the queue. Returns the ``AlertMatchRun``.
+    """
+    run = AlertMatchRun.objects.create(started_at=timezone.now())
+    matcher = get_alert_matcher(max_age=0)
+    while True:
+        with transaction.atomic():
+            # ``skip_locked`` lets concurrent runs split the queue.
+            pending = list(
+                PendingAlertJob.objects.select_for_update(skip_locked=True)
+                .order_by('id').values_list('id', 'job_id')[:batch_size]
+            )
+            if not pending:
+                break
+            jobs = list(
+                Job.objects.filter(id__in=[job_id for _, job_id in pending], is_active=True)
+                .only('id', 'location', *SEARCH_FIELDS)
+                .order_by('id')
+            )
+            if jobs:
+                _record(run, matcher, jobs)
+            PendingAlertJob.objects.filter(id__in=[pending_id for pending_id, _ in pending]).delete()
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=['jobs_scanned', 'matches_found', 'finished_at'])
+    return run
+
+
+def _record(run, matcher, jobs):
+    hits = matcher.match(jobs)
+    # The matcher may lag behind alerts deleted or paused since its last sync.
+    owners = dict(
+        Alert.objects.filter(id__in=list(hits), is_active=True).values_list('id', 'user_id')
+    ) if hits else {}
+    matches = [
+        AlertMatch(alert_id=alert_id, job_id=job_id)
+        for alert_id, job_ids in hits.items()
+        if alert_id in owners
+        for job_id in job_ids
+    ]
+    AlertMatch.objects.bulk_create(matches, batch_size=1000, ignore_conflicts=True)
+
+    by_user = defaultdict(lambda: {'alerts': set(), 'jobs': set()})
+    for match in matches:
+        by_user[owners[match.alert_id]]['alerts'].add(match.alert_id)
+        by_user[owners[match.alert_id]]['jobs'].add(match.job_id)
+    publish_many(
+        (user_id, 'alert_matches', {'alerts': sorted(hit['alerts']), 'jobs': sorted(hit['jobs'])})
+        for user_id, hit in by_user.items()
+    )
+    run.jobs_scanned += len(jobs)
+    run.matches_found += len(matches)
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("alerts", "0002_initial"),
+        ("jobs", "0004_skilldemand"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertMatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("matched_at", models.DateTimeField(auto_now_add=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AlertMatchRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("last_job_id", models.BigIntegerField(default=0)),
+                ("jobs_scanned", models.IntegerField(default=0)),
+                ("matches_found", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="is_active",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["is_active"], name="alerts_aler_is_acti_7b725c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["updated_at"], name="alerts_aler_updated_6e6de0_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="alertmatch",
+            name="alert",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="matches",
+                to="alerts.alert",
+            ),
+        ),
+        migrations.AddField(
+            model_name="alertmatch",
+            name="job",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="jobs.job"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alertmatchrun",
+            index=models.Index(
+                fields=["finished_at"], name="alerts_aler_finishe_ef6622_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alertmatch",
+            index=models.Index(
+                fields=["alert", "sent_at"], name="alerts_aler_alert_i_4c9a52_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="alertmatch",
+            constraint=models.UniqueConstraint(
+                fields=("alert", "job"), name="unique_alert_job_match"
+            ),
+        ),
+    ]
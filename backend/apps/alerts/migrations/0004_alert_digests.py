@@ -0,0 +1,109 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_frequencies(apps, schema_editor):
+    """Fold free-text frequencies onto the instant/daily/weekly buckets"""
+    Alert = apps.get_model("alerts", "Alert")
+    known = {"instant", "daily", "weekly"}
+    for alert in Alert.objects.exclude(frequency__in=known).only("id", "frequency"):
+        frequency = alert.frequency.strip().lower()
+        alert.frequency = frequency if frequency in known else "daily"
+        alert.save(update_fields=["frequency"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("alerts", "0003_alert_matching"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_frequencies, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="AlertDigest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("frequency", models.CharField(max_length=50)),
+                ("period", models.CharField(max_length=20)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("sending", "Sending"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="alert",
+            name="frequency",
+            field=models.CharField(
+                choices=[
+                    ("instant", "Instant"),
+                    ("daily", "Daily"),
+                    ("weekly", "Weekly"),
+                ],
+                default="daily",
+                max_length=50,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["frequency", "last_sent"], name="alerts_aler_frequen_22c945_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="alertdigest",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="alert_digests",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="alertmatch",
+            name="digest",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="matches",
+                to="alerts.alertdigest",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alertdigest",
+            index=models.Index(
+                fields=["status", "created_at"], name="alerts_aler_status_dee098_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="alertdigest",
+            constraint=models.UniqueConstraint(
+                fields=("user", "frequency", "period"), name="unique_user_digest_period"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("alerts", "0005_notifications"),
+        ("jobs", "0005_jobskill_from_text"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="alertmatchrun",
+            name="last_job_id",
+        ),
+        migrations.CreateModel(
+            name="PendingAlertJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("queued_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "job",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+        ),
+    ]
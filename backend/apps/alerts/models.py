@@ -1,11 +1,140 @@
 from django.db import models
 from apps.authentication.models import User
+from apps.jobs.models import Job
 
 class Alert(models.Model):
+    FREQUENCY_INSTANT = 'instant'
+    FREQUENCY_DAILY = 'daily'
+    FREQUENCY_WEEKLY = 'weekly'
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     keywords = models.CharField(max_length=200)
     location_filter = models.CharField(max_length=100, blank=True, null=True)
-    frequency = models.CharField(max_length=50)
+    frequency = models.CharField(
+        max_length=50,
+        choices=[
+            (FREQUENCY_INSTANT, 'Instant'),
+            (FREQUENCY_DAILY, 'Daily'),
+            (FREQUENCY_WEEKLY, 'Weekly'),
+        ],
+        default=FREQUENCY_DAILY
+    )
     last_sent = models.DateTimeField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['frequency', 'last_sent']),
+        ]
+
+class PendingAlertJob(models.Model):
+    """
+    A job posted or reactivated since the matcher last ran, queued in the
+    same transaction as the job save so no activation is ever missed.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name='+')
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+class AlertMatchRun(models.Model):
+    """A pass of the alert matcher over the queued jobs"""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    jobs_scanned = models.IntegerField(default=0)
+    matches_found = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['finished_at']),
+        ]
+
+    def __str__(self):
+        return f"Alert match run at {self.started_at}"
+
+class AlertDigest(models.Model):
+    """
+    One user's digest for one frequency bucket and period.
+
+    Digests are written (with their matches attached) before anything is
+    sent, and ``(user, frequency, period)`` is unique, so a crashed or
+    repeated run finds the digest already built instead of building and
+    sending a second one.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='alert_digests')
+    frequency = models.CharField(max_length=50)
+    period = models.CharField(max_length=20)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (STATUS_PENDING, 'Pending'),
+            (STATUS_SENDING, 'Sending'),
+            (STATUS_SENT, 'Sent'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_PENDING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'frequency', 'period'], name='unique_user_digest_period'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.frequency} digest {self.period} for {self.user_id} ({self.status})"
+
+class AlertMatch(models.Model):
+    """A new job that satisfies an alert, waiting to be delivered"""
+    alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name='matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE)
+    matched_at = models.DateTimeField(auto_now_add=True)
+    # Set when the match is assigned to a digest.
+    digest = models.ForeignKey(AlertDigest, on_delete=models.SET_NULL, null=True, blank=True, related_name='matches')
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['alert', 'job'], name='unique_alert_job_match'),
+        ]
+        indexes = [
+            models.Index(fields=['alert', 'sent_at']),
+        ]
+
+class Notification(models.Model):
+    """An in-app notification shown in the user's inbox"""
+    KIND_ALERT_DIGEST = 'alert_digest'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=50, choices=[(KIND_ALERT_DIGEST, 'Alert digest')])
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    digest = models.ForeignKey(AlertDigest, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Unread filter and unread counts.
+            models.Index(fields=['user', 'is_read', 'created_at']),
+            # Inbox pages: newest first, ``id`` breaking ties for the keyset cursor.
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} for {self.user_id}"
 
 # Create your models here.
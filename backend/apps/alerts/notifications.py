@@ -0,0 +1,81 @@
+"""
+In-app notifications and their unread counters.
+
+The unread badge is polled on every page load, so each user's unread count
+is kept in the cache and adjusted with ``incr`` as notifications are created
+and read rather than recounted. A missing counter is recounted once from
+the ``(user, is_read, created_at)`` index; counters also expire after
+``NOTIFICATION_UNREAD_TIMEOUT`` so any drift (e.g. rows deleted in bulk)
+heals on its own.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.events import publish_many
+
+from .models import Notification
+
+
+def get_cache():
+    return caches[settings.NOTIFICATION_CACHE_ALIAS]
+
+
+def _unread_key(user_id):
+    return f'notifications:user:{user_id}:unread'
+
+
+def unread_count(user_id):
+    cache = get_cache()
+    count = cache.get(_unread_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        # ``add`` so a counter another request has started adjusting is kept.
+        if not cache.add(_unread_key(user_id), count, timeout=settings.NOTIFICATION_UNREAD_TIMEOUT):
+            count = cache.get(_unread_key(user_id), count)
+    return max(count, 0)
+
+
+def _adjust_unread(deltas):
+    """Apply ``{user_id: delta}`` to the cached counters once the transaction commits"""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    def adjust():
+        cache = get_cache()
+        for user_id, delta in deltas.items():
+            try:
+                if cache.incr(_unread_key(user_id), delta) < 0:
+                    cache.delete(_unread_key(user_id))
+            except ValueError:
+                # Not cached: the next read counts from the table.
+                pass
+
+    transaction.on_commit(adjust)
+
+
+def notify(notifications):
+    """
+    Create ``Notification`` instances in bulk, bump their users' unread
+    counters and push them to connected clients.
+    """
+    notifications = Notification.objects.bulk_create(notifications, batch_size=1000)
+    _adjust_unread(Counter(n.user_id for n in notifications if not n.is_read))
+    publish_many(
+        (n.user_id, 'notification', {'id': n.id, 'kind': n.kind, 'title': n.title, 'created_at': n.created_at})
+        for n in notifications
+    )
+    return notifications
+
+
+def mark_read(user_id, queryset):
+    """Mark the user's unread notifications in ``queryset`` read; returns how many changed"""
+    changed = queryset.filter(user_id=user_id, is_read=False).update(
+        is_read=True, read_at=timezone.now()
+    )
+    _adjust_unread({user_id: -changed})
+    return changed
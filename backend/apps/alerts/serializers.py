@@ -1,8 +1,22 @@
 from rest_framework import serializers
-from .models import Alert
+from .models import Alert, Notification
 
 class AlertSerializer(serializers.ModelSerializer):
     class Meta:
         model = Alert
         fields = '__all__'
-        read_only_fields = ('last_sent',)
\ No newline at end of file
+        read_only_fields = ('last_sent',)
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ('id', 'kind', 'title', 'body', 'digest', 'is_read', 'read_at', 'created_at')
+        read_only_fields = fields
+class MarkNotificationsReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=1000)
+    # An inbox ``read_cursor``: that notification and every older one.
+    before = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('before' in attrs):
+            raise serializers.ValidationError('Pass exactly one of ids or before.')
+        return attrs
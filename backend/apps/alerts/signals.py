@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.jobs.models import Job
+
+from .models import PendingAlertJob
+
+
+@receiver(post_save, sender=Job)
+def queue_for_matching(sender, instance, created, **kwargs):
+    """Queue jobs that were just posted active or switched back on"""
+    if instance.is_active and (created or getattr(instance, '_loaded_is_active', None) is False):
+        PendingAlertJob.objects.bulk_create([PendingAlertJob(job_id=instance.pk)], ignore_conflicts=True)
@@ -0,0 +1,34 @@
+from celery import group, shared_task
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import digests
+from .matching import match_new_jobs as run_matching
+
+
+@shared_task(ignore_result=True)
+def match_new_jobs():
+    """Periodic pass matching newly posted jobs against every active alert"""
+    run = run_matching()
+    return run.id
+
+
+@shared_task(ignore_result=True)
+def send_alert_digests(frequency):
+    """Fan the due users of a frequency bucket out to workers in chunks"""
+    now = timezone.now()
+    period = digests.period_key(frequency, now)
+    digests.deliver_digests(digests.recover(now))
+    user_ids = digests.due_user_ids(frequency, now)
+    batches = digests.chunked(user_ids, settings.ALERT_DIGEST_BATCH_SIZE)
+    group(
+        send_alert_digest_batch.s(frequency, batch, now.isoformat(), period) for batch in batches
+    ).apply_async()
+    return len(user_ids)
+
+
+@shared_task(ignore_result=True)
+def send_alert_digest_batch(frequency, user_ids, now, period):
+    built, sent = digests.process_batch(frequency, user_ids, parse_datetime(now), period)
+    return sent
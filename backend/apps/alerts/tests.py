@@ -1,3 +1,145 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import caches
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.common.testing import make_job
+from apps.jobs.models import Job
+
+from .digests import due_alerts, period_start
+from .matching import match_new_jobs
+from .models import Alert, AlertMatch, Notification, PendingAlertJob
+from .notifications import notify
+
+
+class MatchingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.alert = Alert.objects.create(user=self.user, keywords='python developer')
+
+    def matched_job_ids(self):
+        return set(AlertMatch.objects.filter(alert=self.alert).values_list('job_id', flat=True))
+
+    def test_existing_catalogue_is_not_matched(self):
+        old = make_job('Python Developer')
+        PendingAlertJob.objects.all().delete()
+        match_new_jobs()
+        self.assertNotIn(old.id, self.matched_job_ids())
+
+    def test_new_jobs_are_matched_once(self):
+        job = make_job('Python Developer')
+        make_job('Rust Developer')
+        run = match_new_jobs()
+        self.assertEqual((run.jobs_scanned, run.matches_found), (2, 1))
+        self.assertEqual(self.matched_job_ids(), {job.id})
+        self.assertFalse(PendingAlertJob.objects.exists())
+        self.assertEqual(match_new_jobs().jobs_scanned, 0)
+
+    def test_reactivated_jobs_are_matched(self):
+        job = make_job('Python Developer', is_active=False)
+        match_new_jobs()
+        self.assertEqual(self.matched_job_ids(), set())
+
+        job = Job.objects.get(pk=job.pk)
+        job.is_active = True
+        job.save()
+        match_new_jobs()
+        self.assertEqual(self.matched_job_ids(), {job.id})
+
+    def test_edits_do_not_requeue(self):
+        job = make_job('Python Developer')
+        match_new_jobs()
+        job = Job.objects.get(pk=job.pk)
+        job.description = 'Updated'
+        job.save()
+        self.assertFalse(PendingAlertJob.objects.exists())
+
+
+class DigestDueTests(TestCase):
+    # A Wednesday, at the daily bucket's 07:00 run.
+    now = datetime(2024, 5, 15, 7, 0, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.job = make_job('Python Developer')
+
+    def alert(self, frequency, last_sent):
+        alert = Alert.objects.create(user=self.user, keywords='python', frequency=frequency, last_sent=last_sent)
+        AlertMatch.objects.create(alert=alert, job=self.job)
+        return alert
+
+    def test_period_start(self):
+        self.assertEqual(period_start(Alert.FREQUENCY_DAILY, self.now), datetime(2024, 5, 15, tzinfo=timezone.utc))
+        self.assertEqual(period_start(Alert.FREQUENCY_WEEKLY, self.now), datetime(2024, 5, 13, tzinfo=timezone.utc))
+        self.assertEqual(
+            period_start(Alert.FREQUENCY_INSTANT, self.now + timedelta(seconds=42)), self.now
+        )
+
+    def test_late_previous_send_does_not_skip_a_day(self):
+        sent_late = self.alert(Alert.FREQUENCY_DAILY, self.now - timedelta(days=1) + timedelta(seconds=5))
+        sent_today = self.alert(Alert.FREQUENCY_DAILY, self.now - timedelta(hours=6))
+        never = self.alert(Alert.FREQUENCY_DAILY, None)
+        self.assertEqual(
+            set(due_alerts(Alert.FREQUENCY_DAILY, self.now)), {sent_late, never}
+        )
+        self.assertNotIn(sent_today, due_alerts(Alert.FREQUENCY_DAILY, self.now))
+
+    def test_weekly_due_by_iso_week(self):
+        last_week = self.alert(Alert.FREQUENCY_WEEKLY, self.now - timedelta(days=3))
+        self.alert(Alert.FREQUENCY_WEEKLY, self.now - timedelta(days=1))
+        self.assertEqual(list(due_alerts(Alert.FREQUENCY_WEEKLY, self.now)), [last_week])
+
+    def test_alerts_without_undelivered_matches_are_not_due(self):
+        alert = self.alert(Alert.FREQUENCY_DAILY, None)
+        AlertMatch.objects.filter(alert=alert).delete()
+        self.assertFalse(due_alerts(Alert.FREQUENCY_DAILY, self.now).exists())
+
+    def test_matches_on_inactive_jobs_do_not_make_an_alert_due(self):
+        self.alert(Alert.FREQUENCY_DAILY, None)
+        Job.objects.filter(pk=self.job.pk).update(is_active=False)
+        self.assertFalse(due_alerts(Alert.FREQUENCY_DAILY, self.now).exists())
+
+
+class InboxTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        notify([
+            Notification(user=self.user, kind=Notification.KIND_ALERT_DIGEST, title=f'Digest {i}')
+            for i in range(5)
+        ])
+
+    def test_pages_and_marks_read_through_cursor(self):
+        first = self.client.get('/api/v1/alerts/notifications/', {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        titles = [n['title'] for n in first['results'] + second['results']]
+        self.assertEqual(titles, ['Digest 4', 'Digest 3', 'Digest 2', 'Digest 1'])
+        self.assertEqual(first['unread_count'], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/v1/alerts/notifications/read/', {'before': second['read_cursor']}, format='json'
+            ).json()
+        self.assertEqual(response['marked'], 3)
+        self.assertEqual(self.client.get('/api/v1/alerts/notifications/unread-count/').json(), {'unread_count': 2})
+        self.assertEqual(
+            sorted(Notification.objects.filter(is_read=False).values_list('title', flat=True)),
+            ['Digest 3', 'Digest 4'],
+        )
+
+    def test_bad_before_cursor_is_rejected(self):
+        def encode(values):
+            return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
 
-# Create your tests here.
+        for bad in ('!!!', encode(['abc', 1]), encode(['2024-01-01T00:00:00Z', 'x']), encode(['2024-01-01T00:00:00Z', [1]])):
+            with self.subTest(cursor=bad):
+                response = self.client.post('/api/v1/alerts/notifications/read/', {'before': bad}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 5)
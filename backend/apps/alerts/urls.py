@@ -3,8 +3,9 @@ from rest_framework.routers import DefaultRouter
 from . import views
 
 router = DefaultRouter()
-router.register(r'', views.AlertViewSet, basename='alert')
+# Before the alerts themselves, whose detail route would otherwise take ``notifications/``.
 router.register(r'notifications', views.AlertNotificationViewSet, basename='notification')
+router.register(r'', views.AlertViewSet, basename='alert')
 
 urlpatterns = [
     # Mark notification as read
@@ -12,4 +13,4 @@ urlpatterns = [
     
     # Include router URLs
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
@@ -1,8 +1,13 @@
 from django.shortcuts import render
-from rest_framework import viewsets, filters
+from django.db.models import Q
+from rest_framework import viewsets, filters, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .models import Alert
-from .serializers import AlertSerializer
+from apps.common.pagination import KeysetPagination
+from . import notifications
+from .models import Alert, Notification
+from .serializers import AlertSerializer, NotificationSerializer, MarkNotificationsReadSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
@@ -22,12 +27,65 @@ class AlertViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class AlertNotificationViewSet(viewsets.ViewSet):
+class NotificationPagination(KeysetPagination):
+    """
+    Inbox pages, newest first. Each page also carries the user's unread count
+    and a ``read_cursor`` (the position of its newest notification) that can
+    be sent back as ``before`` to mark the page and everything older read.
+    """
+    ordering = ('-created_at', '-id')
+
+    def through_filter(self, model, encoded):
+        """Rows at or after the position ``encoded`` in the inbox ordering"""
+        self.fields = list(self.ordering)
+        values = self.decode_token(encoded)
+        # Parsed here too, so a malformed id is a ``NotFound`` like any other bad value.
+        return self.cursor_filter(model, values) | Q(pk=self.parse_values(model, values)[-1])
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['read_cursor'] = self.encode_cursor(self.page[0]) if self.page else None
+        response.data['unread_count'] = notifications.unread_count(self.request.user.id)
+        return response
+
+class AlertNotificationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """The user's notification inbox; ``?unread=true`` lists unread ones only"""
+    serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
-    def list(self, request):
-        return Response([])
+    pagination_class = NotificationPagination
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user)
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(is_read=False)
+        return queryset.order_by(*NotificationPagination.ordering)
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        return Response({'unread_count': notifications.unread_count(request.user.id)})
+
+    @action(detail=False, methods=['post'], url_path='read')
+    def mark_read(self, request):
+        """Mark notifications read by ``ids`` or everything up to a ``before`` read cursor"""
+        serializer = MarkNotificationsReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = Notification.objects.all()
+        if 'ids' in serializer.validated_data:
+            queryset = queryset.filter(id__in=serializer.validated_data['ids'])
+        else:
+            try:
+                queryset = queryset.filter(
+                    NotificationPagination().through_filter(Notification, serializer.validated_data['before'])
+                )
+            except (NotFound, ValueError):
+                raise ValidationError({'before': ['Invalid cursor.']})
+        marked = notifications.mark_read(request.user.id, queryset)
+        return Response({'marked': marked, 'unread_count': notifications.unread_count(request.user.id)})
 
 class MarkNotificationReadView(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request, pk):
+        if not Notification.objects.filter(pk=pk, user=request.user).exists():
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        notifications.mark_read(request.user.id, Notification.objects.filter(pk=pk))
         return Response({'message': f'Notification {pk} marked as read.'})
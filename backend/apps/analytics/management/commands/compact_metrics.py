@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.metrics import compact
+
+
+class Command(BaseCommand):
+    help = "Fold hourly metric buckets older than ANALYTICS_HOURLY_RETENTION_DAYS into daily buckets"
+
+    def handle(self, *args, **options):
+        folded = compact()
+        self.stdout.write(self.style.SUCCESS(f"Folded {folded} hourly buckets"))
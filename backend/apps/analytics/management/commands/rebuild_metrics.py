@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.metrics import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard metric rollups from the source tables"
+
+    def handle(self, *args, **options):
+        rollups, buckets = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rollups} totals and {buckets} daily buckets"))
@@ -0,0 +1,312 @@
+"""
+Incrementally maintained dashboard metrics.
+
+Writes to the source tables report their effect as ``(metric, dimension,
+delta, at)`` changes: ``delta`` moves the metric's running total in
+``MetricRollup`` and, when ``at`` is given, the ``TimeBucket`` that ``at``
+falls in (deleting a row decrements the bucket it was counted in). Changes
+are applied after the surrounding transaction commits, as ``UPDATE ... SET
+value = value + delta`` statements, so the dashboard reads a handful of
+precomputed rows instead of aggregating the source tables. Bulk writes that
+bypass model signals report their changes explicitly; ``rebuild``
+recomputes everything from the source tables to repair any drift.
+
+Recent events are counted in hourly buckets; ``compact`` folds hourly
+buckets older than ``ANALYTICS_HOURLY_RETENTION_DAYS`` into daily ones, so a
+metric keeps 24 rows per recent day and one per older day. Every event is
+in exactly one bucket, so ``series`` answers any range by summing the
+daily and hourly buckets inside it, however many raw rows there are.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import MetricRollup, TimeBucket
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_JOBS = 'jobs.active'
+JOBS_POSTED = 'jobs.posted'
+# Current applications by status are read from ``apps.applications.counters``.
+APPLICATIONS_SUBMITTED = 'applications.submitted'
+USERS = 'users'
+RECOMMENDATIONS = 'recommendations'  # current materialized rows
+RECOMMENDATIONS_GENERATED = 'recommendations.generated'  # new (user, job) pairs
+RECOMMENDATION_FEEDBACK = 'recommendations.feedback'  # by event
+# Metrics counted in time buckets as well as in running totals.
+BUCKETED = (USERS, JOBS_POSTED, APPLICATIONS_SUBMITTED, RECOMMENDATIONS_GENERATED, RECOMMENDATION_FEEDBACK)
+# Metrics split by a dimension, as the model field whose choices it takes.
+SPLIT_BY = {
+    RECOMMENDATION_FEEDBACK: ('recommendations.RecommendationFeedback', 'event'),
+}
+
+HOUR = TimeBucket.GRANULARITY_HOUR
+DAY = TimeBucket.GRANULARITY_DAY
+# Weeks and months are summed from the stored buckets.
+GRANULARITIES = (HOUR, DAY, 'week', 'month')
+
+
+def day_start(at):
+    return timezone.localtime(at).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def period_start(at, granularity):
+    """Start of the ``granularity`` period containing ``at``"""
+    if granularity == HOUR:
+        return timezone.localtime(at).replace(minute=0, second=0, microsecond=0)
+    start = day_start(at)
+    if granularity == 'week':
+        return start - timedelta(days=start.weekday())
+    if granularity == 'month':
+        return start.replace(day=1)
+    return start
+
+
+def next_period(start, granularity):
+    if granularity == HOUR:
+        return start + timedelta(hours=1)
+    if granularity == DAY:
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def periods(start, end, granularity=DAY):
+    """Start of every ``granularity`` period overlapping ``[start, end)``"""
+    current = period_start(start, granularity)
+    starts = []
+    while current < end:
+        starts.append(current)
+        current = next_period(current, granularity)
+    return starts
+
+
+def recent_days(days, now=None):
+    """``(start, end)`` of the last ``days`` whole days, today included"""
+    end = day_start(now or timezone.now()) + timedelta(days=1)
+    return end - timedelta(days=days), end
+
+
+def compaction_cutoff(now=None):
+    """Hourly buckets starting before this are folded into days"""
+    return day_start((now or timezone.now()) - timedelta(days=settings.ANALYTICS_HOURLY_RETENTION_DAYS))
+
+
+def record(changes):
+    """Apply ``[(metric, dimension, delta, at), ...]`` once the current transaction commits"""
+    cutoff = compaction_cutoff()
+    totals = Counter()
+    buckets = Counter()
+    for metric, dimension, delta, at in changes:
+        totals[metric, dimension] += delta
+        if at is not None:
+            # Events older than the hourly window go straight to their day.
+            granularity = HOUR if at >= cutoff else DAY
+            buckets[metric, dimension, granularity, period_start(at, granularity)] += delta
+    totals = {key: delta for key, delta in totals.items() if delta}
+    buckets = {key: delta for key, delta in buckets.items() if delta}
+    if not totals and not buckets:
+        return
+
+    def apply():
+        try:
+            for (metric, dimension), delta in totals.items():
+                _increment(MetricRollup, delta, metric=metric, dimension=dimension)
+            for (metric, dimension, granularity, start), delta in buckets.items():
+                _increment(
+                    TimeBucket, delta, metric=metric, dimension=dimension,
+                    granularity=granularity, start=start,
+                )
+        except Exception:
+            # Metrics must never fail the write they describe; ``rebuild`` repairs them.
+            logger.exception("Could not update dashboard metrics")
+
+    transaction.on_commit(apply)
+
+
+def _increment(model, delta, **lookup):
+    if model.objects.filter(**lookup).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(value=delta, **lookup)
+    except IntegrityError:
+        # Another writer created the row first.
+        model.objects.filter(**lookup).update(value=F('value') + delta)
+
+
+def compact(now=None):
+    """Fold hourly buckets older than the hourly window into daily buckets; returns rows folded"""
+    cutoff = compaction_cutoff(now)
+    with transaction.atomic():
+        old = TimeBucket.objects.select_for_update().filter(granularity=HOUR, start__lt=cutoff)
+        ids = []
+        days = Counter()
+        for bucket_id, metric, dimension, start, value in old.values_list(
+            'id', 'metric', 'dimension', 'start', 'value'
+        ):
+            ids.append(bucket_id)
+            days[metric, dimension, day_start(start)] += value
+        for (metric, dimension, start), value in days.items():
+            if value:
+                _increment(TimeBucket, value, metric=metric, dimension=dimension, granularity=DAY, start=start)
+        for offset in range(0, len(ids), 1000):
+            TimeBucket.objects.filter(id__in=ids[offset:offset + 1000]).delete()
+    return len(ids)
+
+
+def totals():
+    """``{metric: {dimension: value}}`` for every running total"""
+    result = {}
+    for metric, dimension, value in MetricRollup.objects.values_list('metric', 'dimension', 'value'):
+        result.setdefault(metric, {})[dimension] = value
+    return result
+
+
+def series(metrics, start, end, granularity=DAY):
+    """
+    ``{metric: {dimension: {period_start: value}}}`` for ``[start, end)``,
+    with ``start`` aligned down to the granularity.
+
+    Compacted days have no hours left, so an hourly series reports them as
+    one point at midnight, and a range starting inside such a day counts
+    the whole day.
+    """
+    start = period_start(start, granularity)
+    buckets = TimeBucket.objects.filter(
+        metric__in=metrics, start__gte=day_start(start), start__lt=end
+    ).values_list('metric', 'dimension', 'granularity', 'start', 'value')
+    result = {metric: {} for metric in metrics}
+    for metric, dimension, bucket_granularity, bucket_start, value in buckets:
+        if bucket_granularity == HOUR and bucket_start < start:
+            continue
+        points = result[metric].setdefault(dimension, {})
+        key = period_start(bucket_start, granularity)
+        points[key] = points.get(key, 0) + value
+    return result
+
+
+def dimensions(metric):
+    """The dimension values ``metric`` is split by, or ``None`` if it is a plain count"""
+    if metric not in SPLIT_BY:
+        return None
+    model, field = SPLIT_BY[metric]
+    return [value for value, _ in apps.get_model(model)._meta.get_field(field).choices]
+
+
+def dimension_keys(metric, seen=()):
+    """``['']`` for a plain count, otherwise every known dimension and any others in ``seen``"""
+    known = dimensions(metric)
+    if known is None:
+        return ['']
+    return [*known, *sorted(set(seen) - set(known))]
+
+
+def by_dimension(metric, values):
+    """
+    ``values`` (``{dimension: value}``) in the metric's fixed shape: a number
+    for plain counts, otherwise every known dimension with zeros filled in.
+    """
+    if dimensions(metric) is None:
+        return values.get('', 0)
+    return {dimension: values.get(dimension, 0) for dimension in dimension_keys(metric, values)}
+
+
+def clicks_per_recommendation(clicks, generated):
+    """
+    Clicks over newly recommended pairs. Impressions are not recorded, so
+    this is not a click-through rate: a pair can be clicked on many times
+    or never shown at all.
+    """
+    return round(clicks / generated, 4) if generated else None
+
+
+def parse_bound(value, default=None):
+    """A range bound from an ISO date or datetime (a date means its local midnight)"""
+    if not value:
+        return default
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _grouped(queryset, dimension=None, when=None, trunc=TruncDay):
+    """Rows of ``(dimension value, bucket start, count)`` aggregated in the database"""
+    fields = []
+    if dimension:
+        fields.append(dimension)
+    if when:
+        queryset = queryset.annotate(bucket=trunc(when))
+        fields.append('bucket')
+    for row in queryset.values(*fields).annotate(n=Count('pk')).order_by():
+        yield row.get(dimension, '') if dimension else '', row.get('bucket'), row['n']
+
+
+def rebuild():
+    """
+    Recompute the rollups from the source tables (a few aggregate queries
+    each; run off-peak): hourly buckets inside the hourly window, daily ones
+    before it. ``RECOMMENDATIONS_GENERATED`` is kept as is: materialization
+    overwrites rows in place, so the tables no longer say when each pair was
+    first recommended.
+    """
+    from apps.applications.models import Application
+    from apps.authentication.models import User
+    from apps.jobs.models import Job
+    from apps.recommendations.models import Recommendation, RecommendationFeedback
+
+    sources = [
+        (ACTIVE_JOBS, Job.objects.filter(is_active=True), None, None),
+        (JOBS_POSTED, Job.objects.all(), None, 'date_posted'),
+        (APPLICATIONS_SUBMITTED, Application.objects.all(), None, 'date_applied'),
+        (USERS, User.objects.all(), None, 'created_at'),
+        (RECOMMENDATIONS, Recommendation.objects.all(), None, None),
+        (RECOMMENDATION_FEEDBACK, RecommendationFeedback.objects.all(), 'event', 'created_at'),
+    ]
+    cutoff = compaction_cutoff()
+    rollups = Counter()
+    buckets = Counter()
+    for metric, queryset, dimension, when in sources:
+        if when is None:
+            for key, _, n in _grouped(queryset, dimension):
+                rollups[metric, key] += n
+            continue
+        for granularity, rows, trunc in (
+            (DAY, queryset.filter(**{f'{when}__lt': cutoff}), TruncDay),
+            (HOUR, queryset.filter(**{f'{when}__gte': cutoff}), TruncHour),
+        ):
+            for key, bucket, n in _grouped(rows, dimension, when, trunc):
+                rollups[metric, key] += n
+                buckets[metric, key, granularity, bucket] += n
+
+    metrics = [source[0] for source in sources]
+    with transaction.atomic():
+        MetricRollup.objects.filter(metric__in=metrics).delete()
+        TimeBucket.objects.filter(metric__in=metrics).delete()
+        MetricRollup.objects.bulk_create(
+            [MetricRollup(metric=m, dimension=d, value=v) for (m, d), v in rollups.items()],
+            batch_size=1000,
+        )
+        TimeBucket.objects.bulk_create(
+            [
+                TimeBucket(metric=m, dimension=d, granularity=g, start=s, value=v)
+                for (m, d, g, s), v in buckets.items()
+            ],
+            batch_size=1000,
+        )
+    return len(rollups), len(buckets)
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("metric", models.CharField(max_length=100)),
+                ("dimension", models.CharField(blank=True, default="", max_length=100)),
+                ("value", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("metric", "dimension"), name="unique_metric_rollup"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TimeBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("metric", models.CharField(max_length=100)),
+                ("dimension", models.CharField(blank=True, default="", max_length=100)),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("day", "Day")], default="day", max_length=10
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("metric", "granularity", "start", "dimension"),
+                        name="unique_time_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="timebucket",
+            name="granularity",
+            field=models.CharField(
+                choices=[("hour", "Hour"), ("day", "Day")], default="day", max_length=10
+            ),
+        ),
+    ]
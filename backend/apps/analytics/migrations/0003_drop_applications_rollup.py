@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:51
+
+from django.db import migrations
+
+
+def drop_applications_rollup(apps, schema_editor):
+    """Applications by status are read from the application counters now"""
+    MetricRollup = apps.get_model("analytics", "MetricRollup")
+    MetricRollup.objects.filter(metric="applications").delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0002_hourly_buckets"),
+        ("applications", "0004_application_status_pipeline"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_applications_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.db import models
+
+class MetricRollup(models.Model):
+    """
+    Running total of a dashboard metric, optionally split by ``dimension``
+    (e.g. an application status). Maintained incrementally by
+    ``apps.analytics.metrics``.
+    """
+    metric = models.CharField(max_length=100)
+    dimension = models.CharField(max_length=100, blank=True, default='')
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'dimension'], name='unique_metric_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}[{self.dimension}] = {self.value}"
+
+class TimeBucket(models.Model):
+    """
+    Count of a metric's events in the hour or day starting at ``start``.
+    Hours are folded into days once they leave the hourly window.
+    """
+    GRANULARITY_HOUR = 'hour'
+    GRANULARITY_DAY = 'day'
+
+    metric = models.CharField(max_length=100)
+    dimension = models.CharField(max_length=100, blank=True, default='')
+    granularity = models.CharField(
+        max_length=10,
+        choices=[(GRANULARITY_HOUR, 'Hour'), (GRANULARITY_DAY, 'Day')],
+        default=GRANULARITY_DAY
+    )
+    start = models.DateTimeField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'granularity', 'start', 'dimension'], name='unique_time_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}[{self.dimension}] {self.granularity} {self.start:%Y-%m-%d %H:%M} = {self.value}"
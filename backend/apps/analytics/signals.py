@@ -0,0 +1,75 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.applications.models import Application
+from apps.authentication.models import User
+from apps.jobs.models import Job
+from apps.recommendations.models import Recommendation, RecommendationFeedback
+
+from . import metrics
+
+
+@receiver(post_save, sender=User)
+def count_user(sender, instance, created, **kwargs):
+    if created:
+        metrics.record([(metrics.USERS, '', 1, instance.created_at)])
+
+
+@receiver(post_save, sender=Job)
+def count_job(sender, instance, created, **kwargs):
+    changes = []
+    if created:
+        changes.append((metrics.JOBS_POSTED, '', 1, instance.date_posted))
+        was_active = False
+    else:
+        was_active = getattr(instance, '_loaded_is_active', None)
+        if was_active is None:
+            # Loaded without ``is_active``: nothing to compare against.
+            return
+    if instance.is_active != was_active:
+        changes.append((metrics.ACTIVE_JOBS, '', 1 if instance.is_active else -1, None))
+    metrics.record(changes)
+
+
+@receiver(post_save, sender=Application)
+def count_application(sender, instance, created, **kwargs):
+    # Counts by status are kept by ``apps.applications.counters``.
+    if created:
+        metrics.record([(metrics.APPLICATIONS_SUBMITTED, '', 1, instance.date_applied)])
+
+
+@receiver(post_save, sender=Recommendation)
+def count_recommendation(sender, instance, created, **kwargs):
+    if created:
+        metrics.record([
+            (metrics.RECOMMENDATIONS, '', 1, None),
+            (metrics.RECOMMENDATIONS_GENERATED, '', 1, instance.date_generated),
+        ])
+
+
+@receiver(post_delete, sender=User)
+def uncount_user(sender, instance, **kwargs):
+    metrics.record([(metrics.USERS, '', -1, instance.created_at)])
+
+
+@receiver(post_delete, sender=Job)
+def uncount_job(sender, instance, **kwargs):
+    changes = [(metrics.JOBS_POSTED, '', -1, instance.date_posted)]
+    if instance.is_active:
+        changes.append((metrics.ACTIVE_JOBS, '', -1, None))
+    metrics.record(changes)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    metrics.record([(metrics.APPLICATIONS_SUBMITTED, '', -1, instance.date_applied)])
+
+
+@receiver(post_delete, sender=Recommendation)
+def uncount_recommendation(sender, instance, **kwargs):
+    metrics.record([(metrics.RECOMMENDATIONS, '', -1, None)])
+
+
+@receiver(post_delete, sender=RecommendationFeedback)
+def uncount_feedback(sender, instance, **kwargs):
+    metrics.record([(metrics.RECOMMENDATION_FEEDBACK, instance.event, -1, instance.created_at)])
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from . import metrics
+
+
+@shared_task(ignore_result=True)
+def compact_metric_buckets():
+    """Hourly fold of hourly metric buckets that have left the hourly window into days"""
+    return metrics.compact()
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+
+from . import metrics
+from .models import TimeBucket
+
+
+class CompactionTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.old_day = metrics.day_start(self.now - timedelta(days=30))
+
+    def bucket(self, start, value, granularity=metrics.HOUR, metric=metrics.USERS):
+        return TimeBucket.objects.create(metric=metric, granularity=granularity, start=start, value=value)
+
+    def test_folds_old_hours_into_their_day(self):
+        self.bucket(self.old_day + timedelta(hours=3), 2)
+        self.bucket(self.old_day + timedelta(hours=9), 5)
+        self.bucket(self.old_day, 1, granularity=metrics.DAY)
+        recent = self.bucket(metrics.period_start(self.now, metrics.HOUR), 4)
+
+        self.assertEqual(metrics.compact(self.now), 2)
+        self.assertEqual(
+            list(TimeBucket.objects.order_by('start').values_list('granularity', 'start', 'value')),
+            [(metrics.DAY, self.old_day, 8), (metrics.HOUR, recent.start, 4)],
+        )
+        self.assertEqual(metrics.compact(self.now), 0)
+
+    def test_series_is_unchanged_by_compaction(self):
+        self.bucket(self.old_day + timedelta(hours=1), 3)
+        self.bucket(self.old_day + timedelta(hours=20), 4)
+        start, end = self.old_day, self.old_day + timedelta(days=1)
+        before = metrics.series([metrics.USERS], start, end)
+        metrics.compact(self.now)
+        self.assertEqual(metrics.series([metrics.USERS], start, end), before)
+        self.assertEqual(before, {metrics.USERS: {'': {self.old_day: 7}}})
+
+
+class ResponseShapeTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@example.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_split_metrics_keep_every_dimension(self):
+        today = metrics.day_start(timezone.now())
+        empty = self.client.get('/api/v1/analytics/analytics/', {'days': 2}).json()['analytics']['series']
+        TimeBucket.objects.create(
+            metric=metrics.RECOMMENDATION_FEEDBACK, dimension='click', granularity=metrics.DAY, start=today, value=3
+        )
+        filled = self.client.get('/api/v1/analytics/analytics/', {'days': 2}).json()['analytics']['series']
+
+        feedback = metrics.dimensions(metrics.RECOMMENDATION_FEEDBACK)
+        for rows in (empty, filled):
+            for row in rows:
+                self.assertIsInstance(row[metrics.USERS], int)
+                self.assertEqual(list(row[metrics.RECOMMENDATION_FEEDBACK]), feedback)
+        self.assertEqual(filled[-1][metrics.RECOMMENDATION_FEEDBACK]['click'], 3)
+        self.assertIsNone(filled[-1]['clicks_per_recommendation'])
+
+    def test_series_lists_empty_dimensions(self):
+        series = self.client.get('/api/v1/analytics/series/', {
+            'metric': [metrics.USERS, metrics.RECOMMENDATION_FEEDBACK],
+        }).json()['series']
+        self.assertEqual([s['dimension'] for s in series[metrics.USERS]], [''])
+        self.assertEqual(
+            sorted(s['dimension'] for s in series[metrics.RECOMMENDATION_FEEDBACK]),
+            sorted(metrics.dimensions(metrics.RECOMMENDATION_FEEDBACK)),
+        )
+        self.assertTrue(all(s['total'] == 0 for s in series[metrics.RECOMMENDATION_FEEDBACK]))
+
+    def test_dashboard_reports_clicks_per_recommendation(self):
+        data = self.client.get('/api/v1/analytics/dashboard/').json()['metrics']['recommendations']
+        self.assertNotIn('click_through_rate', data)
+        self.assertEqual(data['feedback'], {event: 0 for event in metrics.dimensions(metrics.RECOMMENDATION_FEEDBACK)})
+        self.assertIsNone(data['clicks_per_recommendation'])
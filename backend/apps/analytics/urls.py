@@ -9,5 +9,6 @@ urlpatterns = [
     path('jobs/pending/', views.PendingJobsView.as_view(), name='pending-jobs'),
     path('jobs/<int:pk>/approve/', views.ApproveJobView.as_view(), name='approve-job'),
     path('analytics/', views.DetailedAnalyticsView.as_view(), name='detailed-analytics'),
+    path('series/', views.MetricSeriesView.as_view(), name='metric-series'),
     path('system-logs/', views.SystemLogsView.as_view(), name='system-logs'),
 ]
\ No newline at end of file
@@ -1,11 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+
+from apps.applications import counters
+from apps.applications.models import Application
+
+from . import metrics
 
 class DashboardMetricsView(APIView):
-    permission_classes = [IsAuthenticated]
+    """
+    Headline admin metrics, read from the precomputed rollups (a few dozen
+    rows) and the application counters rather than aggregated from the
+    source tables.
+    """
+    permission_classes = [IsAdminUser]
+    days = 30
+
     def get(self, request):
-        return Response({'metrics': {}})
+        totals = metrics.totals()
+        start, end = metrics.recent_days(self.days)
+        new_users = metrics.series([metrics.USERS], start, end)[metrics.USERS].get('', {})
+        feedback = metrics.by_dimension(
+            metrics.RECOMMENDATION_FEEDBACK, totals.get(metrics.RECOMMENDATION_FEEDBACK, {})
+        )
+        generated = totals.get(metrics.RECOMMENDATIONS_GENERATED, {}).get('', 0)
+        by_status = counters.counts()[counters.GLOBAL]
+        return Response({'metrics': {
+            'active_jobs': totals.get(metrics.ACTIVE_JOBS, {}).get('', 0),
+            'total_users': totals.get(metrics.USERS, {}).get('', 0),
+            'applications_by_status': {
+                status: by_status.get(status, 0) for status, _ in Application.STATUS_CHOICES
+            },
+            'new_users_per_day': [
+                {'date': day.date(), 'count': new_users.get(day, 0)} for day in metrics.periods(start, end)
+            ],
+            'recommendations': {
+                'generated': generated,
+                'feedback': feedback,
+                'clicks_per_recommendation': metrics.clicks_per_recommendation(feedback['click'], generated),
+            },
+        }})
 
 class UserManagementView(APIView):
     permission_classes = [IsAuthenticated]
@@ -28,9 +67,97 @@ class ApproveJobView(APIView):
         return Response({'message': f'Job {pk} approved.'})
 
 class DetailedAnalyticsView(APIView):
-    permission_classes = [IsAuthenticated]
+    """
+    Daily series of every bucketed metric for the last ``?days=`` days
+    (default 30). Plain counts are numbers and split metrics are objects
+    with every dimension present, whatever was recorded.
+    """
+    permission_classes = [IsAdminUser]
+    max_days = 366
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'detail': 'days must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        days = max(1, min(days, self.max_days))
+
+        start, end = metrics.recent_days(days)
+        series = metrics.series(metrics.BUCKETED, start, end)
+        rows = []
+        for day in metrics.periods(start, end):
+            row = {'date': day.date()}
+            for metric in metrics.BUCKETED:
+                row[metric] = metrics.by_dimension(
+                    metric, {dimension: values.get(day, 0) for dimension, values in series[metric].items()}
+                )
+            row['clicks_per_recommendation'] = metrics.clicks_per_recommendation(
+                row[metrics.RECOMMENDATION_FEEDBACK]['click'], row[metrics.RECOMMENDATIONS_GENERATED]
+            )
+            rows.append(row)
+        return Response({'analytics': {'days': days, 'series': rows}})
+
+class MetricSeriesView(APIView):
+    """
+    Any date range of the bucketed metrics, summed from hourly and daily
+    buckets: ``?metric=users&metric=jobs.posted&start=2025-01-01&end=2025-07-01&granularity=week``.
+    ``start`` and ``end`` are ISO dates or datetimes (``end`` exclusive,
+    default now; ``start`` defaults to 30 days before ``end``) and
+    ``granularity`` is ``hour``, ``day`` (default), ``week`` or ``month``.
+    Each metric lists one series per dimension (``''`` for plain counts),
+    including those with no events in the range.
+    """
+    permission_classes = [IsAdminUser]
+
     def get(self, request):
-        return Response({'analytics': {}})
+        params = request.query_params
+        names = params.getlist('metric') or list(metrics.BUCKETED)
+        unknown = sorted(set(names) - set(metrics.BUCKETED))
+        if unknown:
+            return Response(
+                {'detail': f"Unknown metric(s): {', '.join(unknown)}.", 'metrics': metrics.BUCKETED},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        granularity = params.get('granularity', metrics.DAY)
+        if granularity not in metrics.GRANULARITIES:
+            return Response(
+                {'detail': f"granularity must be one of {', '.join(metrics.GRANULARITIES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            end = metrics.parse_bound(params.get('end'), timezone.now())
+            start = metrics.parse_bound(params.get('start'), end - timedelta(days=30))
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if start >= end:
+            return Response({'detail': 'start must be before end.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        starts = metrics.periods(start, end, granularity)
+        if len(starts) > settings.ANALYTICS_MAX_SERIES_POINTS:
+            return Response(
+                {'detail': f'At most {settings.ANALYTICS_MAX_SERIES_POINTS} points; use a coarser granularity.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        series = metrics.series(names, start, end, granularity)
+        for name in names:
+            for dimension in metrics.dimension_keys(name):
+                series[name].setdefault(dimension, {})
+        return Response({
+            'start': starts[0],
+            'end': end,
+            'granularity': granularity,
+            'series': {
+                name: [
+                    {
+                        'dimension': dimension,
+                        'total': sum(points.values()),
+                        'points': [{'start': s, 'value': points.get(s, 0)} for s in starts],
+                    }
+                    for dimension, points in sorted(series[name].items())
+                ]
+                for name in names
+            },
+        })
 
 class SystemLogsView(APIView):
     permission_classes = [IsAuthenticated]
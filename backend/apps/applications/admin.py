@@ -1,3 +1,18 @@
 from django.contrib import admin
 
+from .models import ApplicationCounter, ApplicationStatusChange
+
 # Register your models here.
+
+@admin.register(ApplicationCounter)
+class ApplicationCounterAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'key', 'status', 'value')
+    list_filter = ('scope', 'status')
+    search_fields = ('=key',)
+
+@admin.register(ApplicationStatusChange)
+class ApplicationStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ('application', 'from_status', 'to_status', 'changed_by', 'changed_at')
+    list_filter = ('to_status',)
+    raw_id_fields = ('application', 'changed_by')
+    date_hierarchy = 'changed_at'
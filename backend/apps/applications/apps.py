@@ -5,3 +5,6 @@ class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.applications'
     verbose_name = 'Applications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,182 @@
+"""
+Denormalised application counts by status.
+
+Every application write adjusts the global, per-user and per-job counters
+for the statuses it leaves and enters with ``UPDATE ... SET value = value +
+delta`` in the same transaction, so a committed application is always
+counted and stats are a single indexed read instead of a count over
+``Application``. Writes that bypass the model (``QuerySet.update``) must
+report their changes through ``record``; ``reconcile`` recounts from the
+table and repairs any drift.
+"""
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Application, ApplicationCounter
+
+BATCH_SIZE = 300
+
+GLOBAL = ApplicationCounter.SCOPE_GLOBAL
+USER = ApplicationCounter.SCOPE_USER
+JOB = ApplicationCounter.SCOPE_JOB
+
+
+def changes_for(counted, delta):
+    """Counter deltas for one application counted as ``(user_id, job_id, status)``"""
+    user_id, job_id, status = counted
+    return [
+        (GLOBAL, random.randrange(settings.APPLICATION_COUNTER_STRIPES), status, delta),
+        (USER, user_id, status, delta),
+        (JOB, job_id, status, delta),
+    ]
+
+
+def _matching(keys):
+    condition = Q()
+    for scope, key, status in keys:
+        condition |= Q(scope=scope, key=key, status=status)
+    return ApplicationCounter.objects.filter(condition)
+
+
+def record(changes):
+    """
+    Apply ``[(scope, key, status, delta), ...]`` in the current transaction:
+    one ``UPDATE`` per distinct delta for the counters that exist and a bulk
+    insert for the rest, so moving many applications costs a few queries.
+    """
+    deltas = Counter()
+    for scope, key, status, delta in changes:
+        deltas[scope, key, status] += delta
+    deltas = {k: delta for k, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        keys = sorted(deltas)
+        existing = set()
+        for offset in range(0, len(keys), BATCH_SIZE):
+            existing.update(
+                _matching(keys[offset:offset + BATCH_SIZE]).values_list('scope', 'key', 'status')
+            )
+        by_delta = {}
+        for k in keys:
+            if k in existing:
+                by_delta.setdefault(deltas[k], []).append(k)
+        for delta, group in sorted(by_delta.items()):
+            for offset in range(0, len(group), BATCH_SIZE):
+                _matching(group[offset:offset + BATCH_SIZE]).update(value=F('value') + delta)
+
+        missing = [k for k in keys if k not in existing]
+        try:
+            with transaction.atomic():
+                ApplicationCounter.objects.bulk_create(
+                    [ApplicationCounter(scope=s, key=k, status=st, value=deltas[s, k, st]) for s, k, st in missing],
+                    batch_size=BATCH_SIZE,
+                )
+        except IntegrityError:
+            # Another writer created some of them first.
+            for scope, key, status in missing:
+                _increment(deltas[scope, key, status], scope=scope, key=key, status=status)
+
+
+def move(old, new):
+    """Move one application from ``old`` to ``new`` (either may be ``None``)"""
+    if old == new:
+        return
+    changes = []
+    if old is not None:
+        changes.extend(changes_for(old, -1))
+    if new is not None:
+        changes.extend(changes_for(new, 1))
+    record(changes)
+
+
+def _increment(delta, **lookup):
+    if ApplicationCounter.objects.filter(**lookup).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            ApplicationCounter.objects.create(value=delta, **lookup)
+    except IntegrityError:
+        # Another writer created the row first.
+        ApplicationCounter.objects.filter(**lookup).update(value=F('value') + delta)
+
+
+def counts(user_id=None, job_id=None):
+    """
+    ``{'global': {status: n}, 'user': {...}, 'job': {...}}`` for the scopes
+    asked for, read in one query.
+    """
+    wanted = Q(scope=GLOBAL)
+    if user_id is not None:
+        wanted |= Q(scope=USER, key=user_id)
+    if job_id is not None:
+        wanted |= Q(scope=JOB, key=job_id)
+    result = {GLOBAL: {}}
+    if user_id is not None:
+        result[USER] = {}
+    if job_id is not None:
+        result[JOB] = {}
+    rows = ApplicationCounter.objects.filter(wanted).values('scope', 'status').annotate(n=Sum('value'))
+    for row in rows.order_by():
+        if row['n']:
+            result[row['scope']][row['status']] = row['n']
+    return result
+
+
+def reconcile():
+    """
+    Recount every counter from ``Application``, fixing the ones that
+    drifted and dropping user and job rows that reached zero; returns how
+    many rows were corrected or dropped. Takes a few aggregate
+    queries and locks the counters while it runs, so run it off-peak.
+    """
+    with transaction.atomic():
+        # Lock before counting. Counting first would miss a write committed
+        # in between and then overwrite the counter it had just moved; with
+        # the lock held, such a write waits and applies its delta on top.
+        stored = {
+            (c.scope, c.key, c.status): c
+            for c in ApplicationCounter.objects.select_for_update()
+        }
+        actual = Counter()
+        for row in Application.objects.values('status').annotate(n=Count('id')).order_by():
+            actual[GLOBAL, 0, row['status']] = row['n']
+        for scope, field in ((USER, 'user_id'), (JOB, 'job_id')):
+            for row in Application.objects.values(field, 'status').annotate(n=Count('id')).order_by():
+                actual[scope, row[field], row['status']] = row['n']
+
+        # Global stripes are compared as their sum and collapsed into stripe 0.
+        global_sums = Counter()
+        for (scope, key, status), counter in stored.items():
+            if scope == GLOBAL:
+                global_sums[status] += counter.value
+
+        update, create, delete = [], [], []
+        for (scope, key, status), counter in stored.items():
+            if scope == GLOBAL:
+                if global_sums[status] == actual[GLOBAL, 0, status]:
+                    continue
+                value = actual[GLOBAL, 0, status] if key == 0 else 0
+            else:
+                value = actual[scope, key, status]
+                if not value:
+                    delete.append(counter.id)
+                    continue
+            if counter.value != value:
+                counter.value = value
+                update.append(counter)
+        for (scope, key, status), value in actual.items():
+            if scope == GLOBAL and global_sums[status] == value:
+                continue
+            if (scope, key, status) not in stored and value:
+                create.append(ApplicationCounter(scope=scope, key=key, status=status, value=value))
+
+        ApplicationCounter.objects.bulk_update(update, ['value'], batch_size=1000)
+        ApplicationCounter.objects.bulk_create(create, batch_size=1000)
+        for offset in range(0, len(delete), 1000):
+            ApplicationCounter.objects.filter(id__in=delete[offset:offset + 1000]).delete()
+    return len(update) + len(create) + len(delete)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.applications.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount application counters from the applications table and fix any drift"
+
+    def handle(self, *args, **options):
+        fixed = reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Corrected {fixed} application counters"))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:19
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_applications(apps, schema_editor):
+    Application = apps.get_model("applications", "Application")
+    ApplicationCounter = apps.get_model("applications", "ApplicationCounter")
+    counters = []
+    for scope, field in (("global", None), ("user", "user_id"), ("job", "job_id")):
+        fields = [field, "status"] if field else ["status"]
+        rows = Application.objects.values(*fields).annotate(n=Count("id")).order_by()
+        counters.extend(
+            ApplicationCounter(
+                scope=scope,
+                key=row[field] if field else 0,
+                status=row["status"],
+                value=row["n"],
+            )
+            for row in rows.iterator()
+        )
+    ApplicationCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("global", "Global"),
+                            ("user", "User"),
+                            ("job", "Job"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("key", models.BigIntegerField(default=0)),
+                ("status", models.CharField(max_length=50)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("scope", "key", "status"),
+                        name="unique_application_counter",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(count_existing_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,219 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUSES = (
+    "applied",
+    "under_review",
+    "interview_scheduled",
+    "interviewed",
+    "offer_extended",
+    "accepted",
+    "rejected",
+    "withdrawn",
+)
+# Other spellings found in existing rows, lower-cased with spaces and
+# hyphens as underscores.
+SYNONYMS = {
+    "pending": "applied",
+    "submitted": "applied",
+    "new": "applied",
+    "review": "under_review",
+    "reviewing": "under_review",
+    "in_review": "under_review",
+    "screening": "under_review",
+    "interview": "interview_scheduled",
+    "interviewing": "interview_scheduled",
+    "scheduled": "interview_scheduled",
+    "interview_completed": "interviewed",
+    "offer": "offer_extended",
+    "offered": "offer_extended",
+    "hired": "accepted",
+    "declined": "rejected",
+    "withdrew": "withdrawn",
+}
+
+
+def canonical(value):
+    key = "_".join((value or "").replace("-", " ").lower().split())
+    return key if key in STATUSES else SYNONYMS.get(key)
+
+
+def normalize_statuses(apps, schema_editor):
+    """Map existing statuses onto the enumeration; fails on values it does not know"""
+    Application = apps.get_model("applications", "Application")
+    ApplicationCounter = apps.get_model("applications", "ApplicationCounter")
+    stray = Application.objects.exclude(status__in=STATUSES)
+    values = list(stray.values_list("status", flat=True).distinct())
+    if not values:
+        return
+    unknown = sorted(repr(value) for value in values if canonical(value) is None)
+    if unknown:
+        raise ValueError(
+            f"Unknown application statuses {', '.join(unknown)}: add them to SYNONYMS "
+            f"in this migration or update those rows to one of {', '.join(STATUSES)}."
+        )
+    for value in values:
+        Application.objects.filter(status=value).update(status=canonical(value))
+    # The counters were keyed by the old values; recount them.
+    ApplicationCounter.objects.all().delete()
+    counters = []
+    for scope, field in (("global", None), ("user", "user_id"), ("job", "job_id")):
+        fields = [field, "status"] if field else ["status"]
+        rows = Application.objects.values(*fields).annotate(n=Count("id")).order_by()
+        counters.extend(
+            ApplicationCounter(
+                scope=scope,
+                key=row[field] if field else 0,
+                status=row["status"],
+                value=row["n"],
+            )
+            for row in rows.iterator()
+        )
+    ApplicationCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0003_applicationcounter"),
+        ("jobs", "0005_jobskill_from_text"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatusChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("applied", "Applied"),
+                            ("under_review", "Under Review"),
+                            ("interview_scheduled", "Interview Scheduled"),
+                            ("interviewed", "Interviewed"),
+                            ("offer_extended", "Offer Extended"),
+                            ("accepted", "Accepted"),
+                            ("rejected", "Rejected"),
+                            ("withdrawn", "Withdrawn"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "to_status",
+                    models.CharField(
+                        choices=[
+                            ("applied", "Applied"),
+                            ("under_review", "Under Review"),
+                            ("interview_scheduled", "Interview Scheduled"),
+                            ("interviewed", "Interviewed"),
+                            ("offer_extended", "Offer Extended"),
+                            ("accepted", "Accepted"),
+                            ("rejected", "Rejected"),
+                            ("withdrawn", "Withdrawn"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "ordering": ["changed_at", "id"],
+            },
+        ),
+        migrations.RunPython(normalize_statuses, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="application",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("applied", "Applied"),
+                    ("under_review", "Under Review"),
+                    ("interview_scheduled", "Interview Scheduled"),
+                    ("interviewed", "Interviewed"),
+                    ("offer_extended", "Offer Extended"),
+                    ("accepted", "Accepted"),
+                    ("rejected", "Rejected"),
+                    ("withdrawn", "Withdrawn"),
+                ],
+                default="applied",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["job", "status", "date_applied"],
+                name="application_pipeline_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["user", "status"], name="application_user_status_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="application",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    (
+                        "status__in",
+                        [
+                            "applied",
+                            "under_review",
+                            "interview_scheduled",
+                            "interviewed",
+                            "offer_extended",
+                            "accepted",
+                            "rejected",
+                            "withdrawn",
+                        ],
+                    )
+                ),
+                name="application_status_valid",
+            ),
+        ),
+        migrations.AddField(
+            model_name="applicationstatuschange",
+            name="application",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="status_changes",
+                to="applications.application",
+            ),
+        ),
+        migrations.AddField(
+            model_name="applicationstatuschange",
+            name="changed_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="applicationstatuschange",
+            index=models.Index(
+                fields=["application", "changed_at"],
+                name="application_applica_229274_idx",
+            ),
+        ),
+    ]
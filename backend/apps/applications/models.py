@@ -1,15 +1,122 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
 from apps.authentication.models import User
 from apps.jobs.models import Job
 
+# The status names the frontend uses. At module level so ``Application.Meta``
+# can build its check constraint from them.
+STATUS_CHOICES = [
+    ('applied', 'Applied'),
+    ('under_review', 'Under Review'),
+    ('interview_scheduled', 'Interview Scheduled'),
+    ('interviewed', 'Interviewed'),
+    ('offer_extended', 'Offer Extended'),
+    ('accepted', 'Accepted'),
+    ('rejected', 'Rejected'),
+    ('withdrawn', 'Withdrawn'),
+]
+
 class Application(models.Model):
+    STATUS_APPLIED = 'applied'
+    STATUS_UNDER_REVIEW = 'under_review'
+    STATUS_INTERVIEW_SCHEDULED = 'interview_scheduled'
+    STATUS_INTERVIEWED = 'interviewed'
+    STATUS_OFFER_EXTENDED = 'offer_extended'
+    STATUS_ACCEPTED = 'accepted'
+    STATUS_REJECTED = 'rejected'
+    STATUS_WITHDRAWN = 'withdrawn'
+    STATUS_CHOICES = STATUS_CHOICES
+    # The statuses each status may move to; the last three are final.
+    TRANSITIONS = {
+        STATUS_APPLIED: {STATUS_UNDER_REVIEW, STATUS_INTERVIEW_SCHEDULED, STATUS_REJECTED, STATUS_WITHDRAWN},
+        STATUS_UNDER_REVIEW: {STATUS_INTERVIEW_SCHEDULED, STATUS_REJECTED, STATUS_WITHDRAWN},
+        STATUS_INTERVIEW_SCHEDULED: {STATUS_INTERVIEWED, STATUS_REJECTED, STATUS_WITHDRAWN},
+        STATUS_INTERVIEWED: {STATUS_OFFER_EXTENDED, STATUS_REJECTED, STATUS_WITHDRAWN},
+        STATUS_OFFER_EXTENDED: {STATUS_ACCEPTED, STATUS_REJECTED, STATUS_WITHDRAWN},
+        STATUS_ACCEPTED: set(),
+        STATUS_REJECTED: set(),
+        STATUS_WITHDRAWN: set(),
+    }
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
-    status = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_APPLIED)
     cover_letter = models.TextField(blank=True, null=True)
     resume_snapshot_url = models.URLField(blank=True, null=True)
     date_applied = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Per-job pipelines: one status of one job, oldest applicants first.
+            models.Index(fields=['job', 'status', 'date_applied'], name='application_pipeline_idx'),
+            models.Index(fields=['user', 'status'], name='application_user_status_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(status__in=[status for status, _ in STATUS_CHOICES]),
+                name='application_status_valid',
+            ),
+        ]
+
+    @classmethod
+    def can_transition(cls, current, new):
+        return new == current or new in cls.TRANSITIONS.get(current, ())
+
+    def clean(self):
+        previous = getattr(self, '_loaded_status', None)
+        if previous is not None and not self.can_transition(previous, self.status):
+            raise ValidationError({'status': f"Cannot move an application from {previous} to {self.status}."})
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets saves tell a status change from any other edit without a query.
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_counted = instance.counted_as()
+        return instance
+
+    def counted_as(self, previous=None):
+        """
+        ``(user_id, job_id, status)`` the counters hold this row under, taking
+        fields that were never loaded from ``previous``; ``None`` if unknown.
+        """
+        previous = previous or (None, None, None)
+        values = tuple(
+            self.__dict__.get(field, default)
+            for field, default in zip(('user_id', 'job_id', 'status'), previous)
+        )
+        return None if None in values else values
+
+    def save(self, *args, **kwargs):
+        # Counters are adjusted by ``post_save`` receivers inside this transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        # After ``post_save``, so every receiver still sees the previous status.
+        self._loaded_status = self.status
+        self._loaded_counted = self.counted_as(getattr(self, '_loaded_counted', None))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+class ApplicationStatusChange(models.Model):
+    """One status change of an application; ``from_status`` is blank for the initial status"""
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['changed_at', 'id']
+        indexes = [
+            models.Index(fields=['application', 'changed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status or '-'} -> {self.to_status}"
+
 class Interview(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE)
     scheduled_at = models.DateTimeField()
@@ -19,4 +126,37 @@ class Interview(models.Model):
     def __str__(self):
         return f"Interview for {self.application.user.email} - {self.application.job.title} at {self.scheduled_at}"
 
+class ApplicationCounter(models.Model):
+    """
+    How many applications have a status, globally, for a user or for a job.
+
+    Maintained by ``apps.applications.counters`` in the same transaction as
+    the application write. The global count is striped over a few ``key``
+    rows so concurrent writers do not queue on one row; reads sum them.
+    """
+    SCOPE_GLOBAL = 'global'
+    SCOPE_USER = 'user'
+    SCOPE_JOB = 'job'
+
+    scope = models.CharField(
+        max_length=10,
+        choices=[
+            (SCOPE_GLOBAL, 'Global'),
+            (SCOPE_USER, 'User'),
+            (SCOPE_JOB, 'Job'),
+        ]
+    )
+    # The user or job id; the stripe for global counters.
+    key = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=50)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key', 'status'], name='unique_application_counter'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}:{self.status} = {self.value}"
+
 # Create your models here.
@@ -6,6 +6,37 @@ class ApplicationSerializer(serializers.ModelSerializer):
         model = Application
         fields = '__all__'
 
+    def validate_status(self, value):
+        if self.instance is None:
+            if value != Application.STATUS_APPLIED:
+                raise serializers.ValidationError('New applications start as applied.')
+            return value
+        current = self.instance.status
+        if not Application.can_transition(current, value):
+            raise serializers.ValidationError(f'Cannot move an application from {current} to {value}.')
+        request = self.context.get('request')
+        if (
+            value != current and value != Application.STATUS_WITHDRAWN and request is not None
+            and not request.user.is_staff and self.instance.job.posted_by_id != request.user.id
+        ):
+            raise serializers.ValidationError('Applicants can only withdraw their application.')
+        return value
+class PipelineApplicationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Application
+        fields = ('id', 'user', 'status', 'date_applied')
+        read_only_fields = fields
+class BulkTransitionSerializer(serializers.Serializer):
+    """Move the listed applications, or every one in ``from_status``, to ``status``"""
+    status = serializers.ChoiceField(choices=Application.STATUS_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), max_length=1000, required=False)
+    from_status = serializers.ChoiceField(choices=Application.STATUS_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('ids') and 'from_status' not in attrs:
+            raise serializers.ValidationError('Give either ids or from_status.')
+        return attrs
+
 class InterviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Interview
@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.common.events import publish
+
+from . import counters
+from .models import Application, ApplicationStatusChange
+
+
+@receiver(post_save, sender=Application)
+def push_status_change(sender, instance, created, **kwargs):
+    if not created and instance.status == getattr(instance, '_loaded_status', None):
+        return
+    publish(instance.user_id, 'application_status', {
+        'application': instance.pk, 'job': instance.job_id, 'status': instance.status,
+    })
+
+
+@receiver(pre_save, sender=Application)
+def load_counted_state(sender, instance, **kwargs):
+    """Fetch what the counters hold an existing row under when it was loaded without it"""
+    if instance.pk is None or getattr(instance, '_loaded_counted', None) is not None:
+        return
+    instance._loaded_counted = (
+        Application.objects.filter(pk=instance.pk).values_list('user_id', 'job_id', 'status').first()
+    )
+
+
+@receiver(post_save, sender=Application)
+def count_application(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_counted', None)
+    counters.move(previous, instance.counted_as(previous))
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    counters.move(getattr(instance, '_loaded_counted', None) or instance.counted_as(), None)
+
+
+@receiver(post_save, sender=Application)
+def record_status_change(sender, instance, created, **kwargs):
+    """History row for a new application or a status change; ``_changed_by`` names who made it"""
+    counted = None if created else getattr(instance, '_loaded_counted', None)
+    previous = counted[2] if counted else ''
+    if previous == instance.status:
+        return
+    changed_by = getattr(instance, '_changed_by', None)
+    ApplicationStatusChange.objects.create(
+        application=instance,
+        from_status=previous,
+        to_status=instance.status,
+        changed_by_id=changed_by.pk if changed_by else (instance.user_id if created else None),
+    )
@@ -1,3 +1,167 @@
-from django.test import TestCase
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.authentication.models import User
+from apps.common.testing import make_job
+
+from . import counters
+from .models import Application, ApplicationCounter, ApplicationStatusChange
+from .transitions import bulk_transition
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.job = make_job('Developer')
+
+    def counts(self):
+        return counters.counts(user_id=self.user.id, job_id=self.job.id)
+
+    def test_saves_and_deletes_move_the_counters(self):
+        application = Application.objects.create(user=self.user, job=self.job)
+        self.assertEqual(self.counts(), {
+            counters.GLOBAL: {'applied': 1}, counters.USER: {'applied': 1}, counters.JOB: {'applied': 1},
+        })
+
+        application = Application.objects.get(pk=application.pk)
+        application.status = Application.STATUS_UNDER_REVIEW
+        application.save()
+        self.assertEqual(self.counts()[counters.GLOBAL], {'under_review': 1})
+        self.assertEqual(self.counts()[counters.JOB], {'under_review': 1})
+
+        application.delete()
+        self.assertEqual(self.counts(), {counters.GLOBAL: {}, counters.USER: {}, counters.JOB: {}})
+
+    def test_move_between_scopes(self):
+        counters.move(None, (self.user.id, self.job.id, 'applied'))
+        counters.move((self.user.id, self.job.id, 'applied'), (self.user.id, self.job.id, 'offer_extended'))
+        self.assertEqual(self.counts()[counters.USER], {'offer_extended': 1})
+        self.assertEqual(sum(self.counts()[counters.GLOBAL].values()), 1)
+
+    def test_reconcile_repairs_drift(self):
+        Application.objects.create(user=self.user, job=self.job)
+        ApplicationCounter.objects.filter(scope=counters.USER).update(value=5)
+        ApplicationCounter.objects.create(scope=counters.JOB, key=self.job.id, status='accepted', value=2)
+        ApplicationCounter.objects.filter(scope=counters.GLOBAL).delete()
+
+        self.assertEqual(counters.reconcile(), 3)
+        self.assertEqual(self.counts(), {
+            counters.GLOBAL: {'applied': 1}, counters.USER: {'applied': 1}, counters.JOB: {'applied': 1},
+        })
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_dashboard_reads_the_counters(self):
+        Application.objects.create(user=self.user, job=self.job)
+        admin = User.objects.create(username='admin', email='admin@example.com', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        by_status = client.get('/api/v1/analytics/dashboard/').json()['metrics']['applications_by_status']
+        self.assertEqual(by_status, {status: int(status == 'applied') for status, _ in Application.STATUS_CHOICES})
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.poster = User.objects.create(username='poster', email='poster@example.com', is_staff=True)
+        self.job = make_job('Developer', posted_by=self.poster)
+        self.applicants = [
+            User.objects.create(username=f'seeker{i}', email=f'seeker{i}@example.com') for i in range(3)
+        ]
+        self.applications = [Application.objects.create(user=user, job=self.job) for user in self.applicants]
+
+    def patch(self, user, application, status):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.patch(f'/api/v1/applications/{application.id}/', {'status': status}, format='json')
+
+    def test_only_forward_moves(self):
+        application = self.applications[0]
+        self.assertEqual(self.patch(self.poster, application, 'interview_scheduled').status_code, 200)
+        self.assertEqual(self.patch(self.poster, application, 'under_review').status_code, 400)
+        self.assertEqual(self.patch(self.poster, application, 'interviewed').status_code, 200)
+        self.assertEqual(
+            list(application.status_changes.values_list('from_status', 'to_status')),
+            [('', 'applied'), ('applied', 'interview_scheduled'), ('interview_scheduled', 'interviewed')],
+        )
+
+    def test_applicants_can_only_withdraw(self):
+        application = self.applications[0]
+        self.assertEqual(self.patch(self.applicants[0], application, 'under_review').status_code, 400)
+        self.assertEqual(self.patch(self.applicants[0], application, 'withdrawn').status_code, 200)
+        self.assertEqual(self.patch(self.poster, application, 'under_review').status_code, 400)
+
+    def test_bulk_transition_moves_and_skips(self):
+        rejected = Application.objects.get(pk=self.applications[2].pk)
+        rejected.status = Application.STATUS_REJECTED
+        rejected.save()
+
+        moved, skipped = bulk_transition(
+            Application.objects.filter(job=self.job), Application.STATUS_UNDER_REVIEW, changed_by=self.poster
+        )
+        self.assertEqual(moved, [self.applications[0].id, self.applications[1].id])
+        self.assertEqual(skipped, [rejected.id])
+        self.assertEqual(
+            counters.counts(job_id=self.job.id)[counters.JOB], {'under_review': 2, 'rejected': 1}
+        )
+        self.assertEqual(
+            ApplicationStatusChange.objects.filter(to_status='under_review', changed_by=self.poster).count(), 2
+        )
+
+    def test_pipeline_view_moves_a_stage(self):
+        client = APIClient()
+        client.force_authenticate(self.poster)
+        response = client.post(
+            f'/api/v1/applications/pipeline/{self.job.id}/transition/',
+            {'status': 'interview_scheduled', 'from_status': 'applied'}, format='json',
+        ).json()
+        self.assertEqual(len(response['moved']), 3)
+        counts = client.get(f'/api/v1/applications/pipeline/{self.job.id}/').json()['counts']
+        self.assertEqual(counts, {'interview_scheduled': 3})
+
+
+class StatusMigrationTests(TransactionTestCase):
+    before = [('applications', '0003_applicationcounter')]
+    after = [('applications', '0004_application_status_pipeline')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        # Users and jobs are untouched by going back, so the current models still fit them.
+        user = User.objects.create(username='seeker', email='seeker@example.com')
+        job = make_job('Developer')
+        old_apps = executor.loader.project_state(self.before).apps
+        self.Application = old_apps.get_model('applications', 'Application')
+        self.make = lambda status: self.Application.objects.create(user_id=user.id, job_id=job.id, status=status)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        return executor.loader.project_state(self.after).apps
+
+    def test_maps_other_spellings(self):
+        for status in ('Under Review', 'under-review', 'interviewing', 'Offered', 'hired', 'pending'):
+            self.make(status)
+        apps = self.migrate()
+        Application = apps.get_model('applications', 'Application')
+        self.assertEqual(
+            list(Application.objects.values_list('status', flat=True).order_by('id')),
+            ['under_review', 'under_review', 'interview_scheduled', 'offer_extended', 'accepted', 'applied'],
+        )
+        counters = apps.get_model('applications', 'ApplicationCounter').objects.filter(scope='global')
+        self.assertEqual(
+            dict(counters.values_list('status', 'value')),
+            {'under_review': 2, 'interview_scheduled': 1, 'offer_extended': 1, 'accepted': 1, 'applied': 1},
+        )
+
+    def test_unknown_status_fails(self):
+        self.make('applied')
+        self.make('on hold')
+        with self.assertRaisesMessage(ValueError, "'on hold'"):
+            self.migrate()
+        # Let tearDown migrate forward again.
+        self.Application.objects.filter(status='on hold').delete()
@@ -0,0 +1,59 @@
+"""
+Application status changes.
+
+Single applications change status through ordinary saves: ``clean`` and
+the serializers check the move against ``Application.TRANSITIONS`` and
+the model signals write the history row and move the counters.
+``bulk_transition`` moves a whole selection of an employer's pipeline with
+one ``UPDATE`` per chunk, one bulk insert of history rows and one pass
+over the counters, instead of a save (and its signals) per application.
+"""
+from django.db import transaction
+
+from apps.common.events import publish_many
+
+from . import counters
+from .models import Application, ApplicationStatusChange
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def bulk_transition(applications, status, changed_by=None):
+    """
+    Move the applications in ``applications`` (a queryset) that may go to
+    ``status``; returns ``(moved ids, skipped ids)``. Applications already
+    in ``status`` or in a status that cannot reach it are skipped.
+    """
+    if status not in Application.TRANSITIONS:
+        raise InvalidTransition(f'Unknown status: {status}')
+    with transaction.atomic():
+        rows = list(
+            applications.select_for_update().order_by('id').values_list('id', 'user_id', 'job_id', 'status')
+        )
+        moved = [row for row in rows if row[3] != status and Application.can_transition(row[3], status)]
+        moved_ids = [row[0] for row in moved]
+        for offset in range(0, len(moved_ids), 1000):
+            Application.objects.filter(id__in=moved_ids[offset:offset + 1000]).update(status=status)
+
+        ApplicationStatusChange.objects.bulk_create(
+            [
+                ApplicationStatusChange(
+                    application_id=app_id, from_status=previous, to_status=status, changed_by=changed_by
+                )
+                for app_id, _, _, previous in moved
+            ],
+            batch_size=1000,
+        )
+        changes = []
+        for _, user_id, job_id, previous in moved:
+            changes.extend(counters.changes_for((user_id, job_id, previous), -1))
+            changes.extend(counters.changes_for((user_id, job_id, status), 1))
+        counters.record(changes)
+        publish_many(
+            (user_id, 'application_status', {'application': app_id, 'job': job_id, 'status': status})
+            for app_id, user_id, job_id, _ in moved
+        )
+    moved_set = set(moved_ids)
+    return moved_ids, [row[0] for row in rows if row[0] not in moved_set]
@@ -9,6 +9,12 @@ router.register(r'interviews', views.InterviewViewSet, basename='interview')
 urlpatterns = [
     # Application statistics
     path('stats/', views.ApplicationStatsView.as_view(), name='application-stats'),
+    # Employer pipelines
+    path('pipeline/<int:job_id>/', views.JobPipelineView.as_view(), name='application-pipeline'),
+    path(
+        'pipeline/<int:job_id>/transition/', views.JobPipelineTransitionView.as_view(),
+        name='application-pipeline-transition',
+    ),
     
     # Include router URLs
     path('', include(router.urls)),
@@ -1,8 +1,15 @@
-from django.shortcuts import render
-from rest_framework import viewsets
+from django.shortcuts import get_object_or_404, render
+from rest_framework import generics, status, viewsets
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from apps.common.pagination import KeysetPagination
+from apps.jobs.models import Job
+from . import counters
 from .models import Application, Interview
-from .serializers import ApplicationSerializer, InterviewSerializer
+from .serializers import (
+    ApplicationSerializer, InterviewSerializer, PipelineApplicationSerializer, BulkTransitionSerializer,
+)
+from .transitions import bulk_transition
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
@@ -23,6 +30,11 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         # Automatically set the user to the current user
         serializer.save(user=self.request.user)
 
+    def perform_update(self, serializer):
+        # Recorded as ``changed_by`` in the status history.
+        serializer.instance._changed_by = self.request.user
+        serializer.save()
+
 class InterviewViewSet(viewsets.ModelViewSet):
     serializer_class = InterviewSerializer
     permission_classes = [IsAuthenticated]
@@ -32,13 +44,93 @@ class InterviewViewSet(viewsets.ModelViewSet):
             return Interview.objects.all()
         return Interview.objects.filter(application__user=self.request.user)
 
+def get_pipeline_job(request, job_id):
+    """The job whose applicants ``request.user`` may manage: staff or the job's poster"""
+    job = get_object_or_404(Job.objects.only('id', 'posted_by_id'), pk=job_id)
+    if not request.user.is_staff and job.posted_by_id != request.user.id:
+        raise PermissionDenied("Only the job's poster can manage its applicants.")
+    return job
+
+class PipelinePagination(KeysetPagination):
+    ordering = ('date_applied', 'id')
+
+class JobPipelineView(generics.ListAPIView):
+    """
+    A job's applicant pipeline, for staff and the job's poster.
+
+    ``counts`` per status come from the application counters. ``results``
+    are the applicants in ``?status=`` (``applied`` by default), oldest
+    first, keyset-paginated along the ``(job, status, date_applied)`` index
+    so every page is a bounded index range scan.
+    """
+    serializer_class = PipelineApplicationSerializer
+    pagination_class = PipelinePagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        self.job = get_pipeline_job(self.request, self.kwargs['job_id'])
+        stage = self.request.query_params.get('status', Application.STATUS_APPLIED)
+        if stage not in Application.TRANSITIONS:
+            raise ValidationError({'status': f'Unknown status: {stage}'})
+        return (
+            Application.objects.filter(job_id=self.job.id, status=stage)
+            .only('id', 'user', 'status', 'date_applied')
+            .order_by('date_applied', 'id')
+        )
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['counts'] = counters.counts(job_id=self.job.id)[counters.JOB]
+        return response
+
+class JobPipelineTransitionView(APIView):
+    """
+    ``POST {"status": "interview_scheduled", "ids": [1, 2]}`` (or ``"from_status":
+    "applied"`` for a whole stage) moves a job's applicants in bulk. Those
+    that cannot make the move are reported as skipped.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, job_id):
+        job = get_pipeline_job(request, job_id)
+        serializer = BulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        applications = Application.objects.filter(job_id=job.id)
+        if data.get('ids'):
+            applications = applications.filter(id__in=data['ids'])
+        if 'from_status' in data:
+            applications = applications.filter(status=data['from_status'])
+        moved, skipped = bulk_transition(applications, data['status'], changed_by=request.user)
+        return Response({'moved': moved, 'skipped': skipped}, status=status.HTTP_200_OK)
+
 class ApplicationStatsView(APIView):
+    """
+    Application counts, overall and the requester's, by status. ``?job=<id>``
+    adds that job's counts for staff and the job's poster. Read from
+    ``ApplicationCounter`` in one query however many applications exist.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total = Application.objects.count()
-        user_total = Application.objects.filter(user=request.user).count()
-        return Response({
-            'total_applications': total,
-            'your_applications': user_total
-        })
+        job_id = request.query_params.get('job')
+        if job_id is not None:
+            try:
+                job_id = int(job_id)
+            except ValueError:
+                raise ValidationError({'job': 'Must be an integer.'})
+            job = get_object_or_404(Job.objects.only('id', 'posted_by_id'), pk=job_id)
+            if not request.user.is_staff and job.posted_by_id != request.user.id:
+                raise PermissionDenied("Only the job's poster can see its applications.")
+
+        result = counters.counts(user_id=request.user.id, job_id=job_id)
+        data = {
+            'total_applications': sum(result[counters.GLOBAL].values()),
+            'your_applications': sum(result[counters.USER].values()),
+            'by_status': result[counters.GLOBAL],
+            'your_by_status': result[counters.USER],
+        }
+        if job_id is not None:
+            data['job_applications'] = sum(result[counters.JOB].values())
+            data['job_by_status'] = result[counters.JOB]
+        return Response(data)
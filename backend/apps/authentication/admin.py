@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Skill, UserSkill, Education, WorkExperience
+from .models import User, Skill, SkillAlias, UserSkill, Education, WorkExperience, ResumeUpload
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -24,12 +24,23 @@ class CustomUserAdmin(UserAdmin):
         }),
     )
 
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 1
+
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'created_at')
     list_filter = ('category',)
-    search_fields = ('name', 'description')
+    search_fields = ('name', 'description', 'aliases__alias')
     ordering = ('name',)
+    inlines = [SkillAliasInline]
+
+@admin.register(SkillAlias)
+class SkillAliasAdmin(admin.ModelAdmin):
+    list_display = ('alias', 'skill', 'updated_at')
+    search_fields = ('alias', 'skill__name')
+    raw_id_fields = ('skill',)
 
 @admin.register(UserSkill)
 class UserSkillAdmin(admin.ModelAdmin):
@@ -53,3 +64,11 @@ class WorkExperienceAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'company', 'position')
     raw_id_fields = ('user',)
     date_hierarchy = 'start_date'
+
+@admin.register(ResumeUpload)
+class ResumeUploadAdmin(admin.ModelAdmin):
+    list_display = ('user', 'original_name', 'size', 'deduplicated', 'status', 'created_at', 'finished_at')
+    list_filter = ('status', 'deduplicated')
+    search_fields = ('user__email', 'original_name', 'sha256')
+    raw_id_fields = ('user',)
+    readonly_fields = ('sha256', 'size', 'result', 'started_at', 'finished_at')
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0002_alter_education_options_alter_skill_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="education",
+            index=models.Index(
+                fields=["updated_at"], name="authenticat_updated_4aef81_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userskill",
+            index=models.Index(
+                fields=["updated_at"], name="authenticat_updated_4b8a32_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workexperience",
+            index=models.Index(
+                fields=["updated_at"], name="authenticat_updated_ec2b9f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0005_resumeupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumeupload",
+            name="deduplicated",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="size",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:46
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0006_resumeupload_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumeupload",
+            name="parse_key",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="parsed",
+            field=models.JSONField(
+                blank=True,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                null=True,
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -95,6 +96,26 @@ class Skill(models.Model):
     def __str__(self):
         return self.name
 
+class SkillAlias(models.Model):
+    """Another spelling of a skill ("js" for JavaScript), stored normalised"""
+    alias = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['alias']
+        verbose_name_plural = 'skill aliases'
+
+    def __str__(self):
+        return f"{self.alias} -> {self.skill_id}"
+
+    def save(self, *args, **kwargs):
+        from .skill_dictionary import normalize_skill_name
+
+        self.alias = normalize_skill_name(self.alias)
+        super().save(*args, **kwargs)
+
 class UserSkill(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skills')
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='users')
@@ -123,6 +144,7 @@ class UserSkill(models.Model):
         indexes = [
             models.Index(fields=['user', 'skill']),
             models.Index(fields=['proficiency_level']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -152,6 +174,7 @@ class Education(models.Model):
         indexes = [
             models.Index(fields=['user', 'start_date']),
             models.Index(fields=['institution']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -191,6 +214,7 @@ class WorkExperience(models.Model):
         indexes = [
             models.Index(fields=['user', 'start_date']),
             models.Index(fields=['company']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -209,3 +233,49 @@ class WorkExperience(models.Model):
         years = duration.days // 365
         months = (duration.days % 365) // 30
         return f"{years}y {months}m"
+
+class ResumeUpload(models.Model):
+    """An uploaded resume and the state of its background parse"""
+    STATUS_QUEUED = 'queued'
+    STATUS_PARSING = 'parsing'
+    STATUS_PARSED = 'parsed'
+    STATUS_FAILED = 'failed'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resume_uploads')
+    # Stored under its content hash, so identical uploads share one file.
+    file = models.FileField(upload_to='resumes/')
+    original_name = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    size = models.PositiveIntegerField(default=0)
+    # The file was already stored by an earlier upload.
+    deduplicated = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (STATUS_QUEUED, 'Queued'),
+            (STATUS_PARSING, 'Parsing'),
+            (STATUS_PARSED, 'Parsed'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_QUEUED
+    )
+    message = models.CharField(max_length=255, blank=True)
+    # What the parse added to the profile: counts and the skills found.
+    result = models.JSONField(default=dict, blank=True)
+    # The parse itself, reused by later uploads with the same ``sha256`` and
+    # ``parse_key`` (parser and skill dictionary versions).
+    parsed = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    parse_key = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.original_name} ({self.status})"
@@ -0,0 +1,366 @@
+"""
+Background resume parsing.
+
+Uploads are only stored on the request thread; ``process_upload`` runs on
+the Celery workers consuming the ``resumes`` queue, whose prefork pool keeps
+PDF and DOCX extraction out of the web processes. A parse extracts the text,
+finds known skills with the canonical skill dictionary and picks dated
+entries out of the experience and education sections, then adds whatever
+the profile does not have yet in a few bulk inserts.
+
+Files are stored under the SHA-256 of their content, computed over the
+upload's chunks, so an identical re-upload reuses the stored file. Each
+upload keeps its parse, keyed by the parser and skill dictionary versions,
+so a later upload of the same content under the same versions reuses it
+with one indexed read instead of parsing again.
+
+PDF and DOCX support needs ``PyPDF2`` and ``python-docx``; without them
+those uploads fail with a message saying so.
+"""
+import hashlib
+import logging
+import os
+import re
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.events import publish
+
+from .models import User, UserSkill, Education, WorkExperience, ResumeUpload
+from .skill_dictionary import get_skill_dictionary
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = ('.pdf', '.docx', '.txt')
+# Bump when parsing changes, so cached results from older code are not reused.
+PARSER_VERSION = 2
+# Skills found in a resume say nothing about depth; users can adjust it.
+PARSED_PROFICIENCY = 2
+
+EXPERIENCE_HEADINGS = {
+    'experience', 'work experience', 'professional experience', 'employment',
+    'employment history', 'work history', 'career history',
+}
+EDUCATION_HEADINGS = {'education', 'academic background', 'qualifications', 'education and training'}
+OTHER_HEADINGS = {
+    'skills', 'technical skills', 'projects', 'certifications', 'summary', 'profile',
+    'objective', 'references', 'languages', 'interests', 'awards', 'publications', 'contact',
+}
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+MONTH = (
+    r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)'
+)
+DATE = rf'(?:\b{MONTH}\.?\s+|\b\d{{1,2}}/)?(?:19|20)\d{{2}}'
+DATE_RANGE_RE = re.compile(
+    rf'(?P<start>{DATE})\s*(?:-|–|—|to)\s*(?P<end>{DATE}|present|current|now)', re.IGNORECASE
+)
+YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+DEGREE_RE = re.compile(
+    r'\b(?:bachelor|master|doctor|ph\.?d|mba|b\.?sc|m\.?sc|b\.?eng|m\.?eng|b\.?a|m\.?a|b\.?s|m\.?s|'
+    r'associate|diploma|certificate)\b\.?',
+    re.IGNORECASE,
+)
+INSTITUTION_RE = re.compile(r'universit|college|institut|school|academy', re.IGNORECASE)
+ENTRY_SPLIT_RE = re.compile(r'\s+(?:at|@)\s+|\s+[-–|]\s+|,\s*')
+
+
+class ResumeParseError(Exception):
+    pass
+
+
+def content_hash(file_obj):
+    """SHA-256 hex digest of an uploaded file, read chunk by chunk"""
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def content_path(sha256, extension):
+    return f'resumes/{sha256[:2]}/{sha256}{extension.lower()}'
+
+
+def store(file_obj):
+    """
+    Store an upload under its content hash. Returns ``(name, sha256,
+    stored)``; ``stored`` is false when the same content was already there.
+    """
+    sha256 = content_hash(file_obj)
+    name = content_path(sha256, os.path.splitext(file_obj.name)[1])
+    if default_storage.exists(name):
+        return name, sha256, False
+    saved = default_storage.save(name, file_obj)
+    if saved != name:
+        # The same content was stored under ``name`` since the check above and
+        # the storage picked a free name instead; keep the first copy.
+        default_storage.delete(saved)
+        return name, sha256, False
+    return name, sha256, True
+
+
+def _parse_key(dictionary):
+    return f'{PARSER_VERSION}:{dictionary.token}'
+
+
+def previous_parse(upload, key):
+    """The parse of an earlier upload of the same content under ``key``, or ``None``"""
+    parsed = (
+        ResumeUpload.objects.filter(sha256=upload.sha256, parse_key=key, parsed__isnull=False)
+        .exclude(pk=upload.pk)
+        .values_list('parsed', flat=True)
+        .first()
+    )
+    if parsed is None:
+        return None
+    # Dates come back from JSON as ISO strings.
+    for entry in parsed['experience'] + parsed['education']:
+        for field in ('start_date', 'end_date'):
+            if entry[field]:
+                entry[field] = date.fromisoformat(entry[field])
+    return parsed
+
+
+def extract_text(fileobj, name):
+    """Plain text of a ``.pdf``, ``.docx`` or ``.txt`` file, cut to ``RESUME_MAX_TEXT_LENGTH``"""
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.pdf':
+        try:
+            from PyPDF2 import PdfReader
+        except ImportError:
+            raise ResumeParseError('PDF resumes cannot be parsed: PyPDF2 is not installed.')
+        text = '\n'.join(page.extract_text() or '' for page in PdfReader(fileobj).pages)
+    elif extension == '.docx':
+        try:
+            import docx
+        except ImportError:
+            raise ResumeParseError('DOCX resumes cannot be parsed: python-docx is not installed.')
+        document = docx.Document(fileobj)
+        lines = [paragraph.text for paragraph in document.paragraphs]
+        for table in document.tables:
+            lines.extend(' | '.join(cell.text for cell in row.cells) for row in table.rows)
+        text = '\n'.join(lines)
+    elif extension == '.txt':
+        text = fileobj.read().decode('utf-8', errors='replace')
+    else:
+        raise ResumeParseError(f'Unsupported resume format: {extension or name}')
+    return text[:settings.RESUME_MAX_TEXT_LENGTH]
+
+
+def parse_date(value, end=False):
+    """First day of the month named by ``value`` ("Mar 2020", "03/2020", "2020"); ``None`` for "present" """
+    value = value.strip().lower()
+    if value in ('present', 'current', 'now'):
+        return None
+    year = int(YEAR_RE.search(value).group())
+    month = 12 if end else 1
+    if '/' in value:
+        month = int(value.split('/')[0]) or month
+    elif value[:3] in MONTHS:
+        month = MONTHS[value[:3]]
+    return date(year, min(month, 12), 1)
+
+
+def sections(text):
+    """Yield ``(heading, lines)`` for the experience and education sections"""
+    current, lines = None, []
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        heading = line.rstrip(':').lower()
+        if heading in EXPERIENCE_HEADINGS or heading in EDUCATION_HEADINGS or heading in OTHER_HEADINGS:
+            if current:
+                yield current, lines
+            current, lines = None, []
+            if heading in EXPERIENCE_HEADINGS:
+                current = 'experience'
+            elif heading in EDUCATION_HEADINGS:
+                current = 'education'
+        elif current and line:
+            lines.append(line)
+    if current:
+        yield current, lines
+
+
+def _entry_parts(line, previous):
+    """Text around a date range, falling back to the line above when the dates stand alone"""
+    text = line.strip(' ,|-–—()')
+    if not text and previous:
+        text = previous
+    return [part.strip(' ,|-–—()') for part in ENTRY_SPLIT_RE.split(text) if part.strip(' ,|-–—()')]
+
+
+def parse_experience(lines):
+    entries = []
+    for pos, line in enumerate(lines):
+        match = DATE_RANGE_RE.search(line)
+        if not match:
+            continue
+        parts = _entry_parts(line[:match.start()] + line[match.end():], lines[pos - 1] if pos else '')
+        if not parts:
+            continue
+        end = parse_date(match['end'], end=True)
+        entries.append({
+            'position': parts[0][:100],
+            'company': (parts[1] if len(parts) > 1 else '')[:200],
+            'start_date': parse_date(match['start']),
+            'end_date': end,
+            'is_current': end is None,
+        })
+    return entries
+
+
+def parse_education(lines):
+    entries = []
+    for pos, line in enumerate(lines):
+        match = DATE_RANGE_RE.search(line)
+        if match:
+            start, end = parse_date(match['start']), parse_date(match['end'], end=True)
+            rest = line[:match.start()] + line[match.end():]
+        else:
+            years = YEAR_RE.findall(line)
+            if not years:
+                continue
+            # A single year is the graduation year.
+            start = end = date(int(years[-1]), 1, 1)
+            rest = YEAR_RE.sub('', line)
+        parts = _entry_parts(rest, lines[pos - 1] if pos else '')
+        degree = next((p for p in parts if DEGREE_RE.search(p)), None)
+        institution = next((p for p in parts if INSTITUTION_RE.search(p)), None)
+        if degree is None and institution is None:
+            continue
+        field = ''
+        if degree:
+            # "Bachelor of Arts in History" and "BSc in Physics" name the field after the last in/of.
+            field = re.split(r'(?:^|\s+)(?:in|of)\s+', DEGREE_RE.sub('', degree, count=1).strip())[-1]
+        entries.append({
+            'degree': (degree or '')[:100],
+            'field_of_study': field.strip(' ,.')[:100],
+            'institution': (institution or next((p for p in parts if p != degree), ''))[:200],
+            'start_date': start,
+            'end_date': end,
+            'is_current': end is None,
+        })
+    return entries
+
+
+def parse_resume(text, dictionary=None):
+    """``{'skills': [skill ids], 'experience': [...], 'education': [...]}`` found in ``text``"""
+    dictionary = dictionary or get_skill_dictionary()
+    parsed = {'skills': dictionary.find(text), 'experience': [], 'education': []}
+    for section, lines in sections(text):
+        if section == 'experience':
+            parsed['experience'].extend(parse_experience(lines))
+        else:
+            parsed['education'].extend(parse_education(lines))
+    return parsed
+
+
+def apply_to_profile(user_id, parsed):
+    """Add the parsed skills and entries the user's profile lacks; returns how many of each"""
+    experience_keys = {
+        (company.lower(), position.lower(), start)
+        for company, position, start in WorkExperience.objects.filter(user_id=user_id).values_list(
+            'company', 'position', 'start_date'
+        )
+    }
+    education_keys = {
+        (institution.lower(), degree.lower(), start)
+        for institution, degree, start in Education.objects.filter(user_id=user_id).values_list(
+            'institution', 'degree', 'start_date'
+        )
+    }
+    experience = []
+    for entry in parsed['experience']:
+        key = (entry['company'].lower(), entry['position'].lower(), entry['start_date'])
+        if key not in experience_keys:
+            experience_keys.add(key)
+            experience.append(WorkExperience(user_id=user_id, description='', **entry))
+    education = []
+    for entry in parsed['education']:
+        key = (entry['institution'].lower(), entry['degree'].lower(), entry['start_date'])
+        if key not in education_keys:
+            education_keys.add(key)
+            education.append(Education(user_id=user_id, **entry))
+
+    existing_skills = set(UserSkill.objects.filter(user_id=user_id).values_list('skill_id', flat=True))
+    skills = [
+        UserSkill(user_id=user_id, skill_id=skill_id, proficiency_level=PARSED_PROFICIENCY)
+        for skill_id in parsed['skills']
+        if skill_id not in existing_skills
+    ]
+    with transaction.atomic():
+        UserSkill.objects.bulk_create(skills, ignore_conflicts=True)
+        WorkExperience.objects.bulk_create(experience)
+        Education.objects.bulk_create(education)
+        if skills or experience or education:
+            User.objects.filter(pk=user_id).update(updated_at=timezone.now())
+    if skills or experience or education:
+        # Bulk inserts skip the model signals that drop cached recommendations.
+        from apps.recommendations import cache as recommendation_cache
+
+        recommendation_cache.invalidate_user(user_id)
+    return {'skills': len(skills), 'experience': len(experience), 'education': len(education)}
+
+
+def claim(upload_id):
+    """Mark a queued upload (or one whose parse outlived ``RESUME_PARSE_TIMEOUT``) as parsing"""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.RESUME_PARSE_TIMEOUT)
+    queued = ResumeUpload.objects.filter(pk=upload_id, status=ResumeUpload.STATUS_QUEUED)
+    abandoned = ResumeUpload.objects.filter(
+        pk=upload_id, status=ResumeUpload.STATUS_PARSING, started_at__lt=stale
+    )
+    return bool(
+        queued.update(status=ResumeUpload.STATUS_PARSING, started_at=now)
+        or abandoned.update(started_at=now)
+    )
+
+
+def process_upload(upload_id):
+    """Parse an upload into its user's profile; returns the finished ``ResumeUpload`` or ``None`` if taken"""
+    if not claim(upload_id):
+        return None
+    upload = ResumeUpload.objects.get(pk=upload_id)
+    cached = False
+    try:
+        dictionary = get_skill_dictionary()
+        key = _parse_key(dictionary)
+        parsed = previous_parse(upload, key) if upload.sha256 else None
+        if parsed is None:
+            with upload.file.open('rb') as fh:
+                text = extract_text(fh, upload.file.name)
+            parsed = parse_resume(text, dictionary)
+        else:
+            cached = True
+        upload.parsed, upload.parse_key = parsed, key
+        added = apply_to_profile(upload.user_id, parsed)
+    except ResumeParseError as exc:
+        upload.status = ResumeUpload.STATUS_FAILED
+        upload.message = str(exc)[:255]
+    except Exception as exc:
+        logger.exception("Could not parse resume upload %s", upload_id)
+        upload.status = ResumeUpload.STATUS_FAILED
+        upload.message = f'Could not parse the resume: {exc}'[:255]
+    else:
+        upload.status = ResumeUpload.STATUS_PARSED
+        upload.message = ''
+        upload.result = {
+            'added': added,
+            'skills_found': len(parsed['skills']),
+            'experience_found': len(parsed['experience']),
+            'education_found': len(parsed['education']),
+            'cached': cached,
+        }
+    upload.finished_at = timezone.now()
+    upload.save(update_fields=['status', 'message', 'result', 'parsed', 'parse_key', 'finished_at'])
+    publish(upload.user_id, 'resume', {'id': upload.id, 'status': upload.status, 'result': upload.result})
+    return upload
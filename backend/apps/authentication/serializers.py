@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import User, Skill, UserSkill, Education, WorkExperience
+from .models import User, Skill, UserSkill, Education, WorkExperience, ResumeUpload
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,4 +24,12 @@ class EducationSerializer(serializers.ModelSerializer):
 class WorkExperienceSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkExperience
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+class ResumeUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumeUpload
+        fields = (
+            'id', 'original_name', 'sha256', 'size', 'deduplicated', 'status', 'message', 'result',
+            'created_at', 'started_at', 'finished_at',
+        )
+        read_only_fields = fields
@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import User, Skill, SkillAlias, UserSkill, Education, WorkExperience
+from .skill_dictionary import invalidate_skill_dictionary
+
+
+@receiver(post_delete, sender=UserSkill)
+@receiver(post_delete, sender=Education)
+@receiver(post_delete, sender=WorkExperience)
+def touch_user_on_profile_delete(sender, instance, **kwargs):
+    """Deleted profile rows leave no ``updated_at`` behind, so stamp the owner instead"""
+    User.objects.filter(pk=instance.user_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=SkillAlias)
+@receiver(post_delete, sender=SkillAlias)
+def drop_skill_dictionary(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_skill_dictionary)
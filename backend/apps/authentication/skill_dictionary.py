@@ -0,0 +1,126 @@
+"""
+Canonical skill dictionary.
+
+Maps normalised skill names and ``SkillAlias`` spellings to ``Skill.id`` so
+free-text skill lists resolve to ids without a query per name. Each process
+holds one dictionary in memory; it is dropped when this process changes a
+skill or alias and rebuilt when the tables' fingerprint (row counts and
+latest ``updated_at``) shows another process did, checked at most every
+``SKILL_DICTIONARY_SYNC_INTERVAL`` seconds.
+"""
+import hashlib
+import re
+import threading
+import time
+
+from django.db.models import Count, Max
+
+from .models import Skill, SkillAlias
+
+# Words of free text; keeps the punctuation of names like C++, C# and Node.js.
+WORD_RE = re.compile(r'[^\s,;()\[\]/|]+')
+
+
+def normalize_skill_name(name):
+    return ' '.join((name or '').split()).lower()
+
+
+def split_skill_names(*values):
+    """Split comma-separated skill strings into normalised, de-duplicated names"""
+    names = []
+    for value in values:
+        for name in (value or '').split(','):
+            name = normalize_skill_name(name)
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def fingerprint():
+    return tuple(
+        tuple(model.objects.aggregate(n=Count('id'), latest=Max('updated_at')).values())
+        for model in (Skill, SkillAlias)
+    )
+
+
+class SkillDictionary:
+    def __init__(self, names, version=None):
+        self._ids = names
+        self.version = version
+        self.checked_at = time.time()
+        self.max_words = max((len(name.split()) for name in names), default=0)
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def token(self):
+        """Short digest of ``version``, equal in every process that loaded the same tables"""
+        return hashlib.md5(repr(self.version).encode()).hexdigest()[:12]
+
+    @classmethod
+    def from_db(cls):
+        version = fingerprint()
+        names = {
+            normalize_skill_name(alias): skill_id
+            for alias, skill_id in SkillAlias.objects.values_list('alias', 'skill_id')
+        }
+        # A skill's own name wins over another skill's alias.
+        names.update(
+            (normalize_skill_name(name), skill_id)
+            for skill_id, name in Skill.objects.values_list('id', 'name')
+        )
+        return cls(names, version)
+
+    def lookup(self, name):
+        """``Skill.id`` for a name or alias, or ``None``"""
+        return self._ids.get(normalize_skill_name(name))
+
+    def resolve(self, *values):
+        """Ids of the known skills in comma-separated ``values``, in order, without repeats"""
+        skill_ids = []
+        for name in split_skill_names(*values):
+            skill_id = self._ids.get(name)
+            if skill_id is not None and skill_id not in skill_ids:
+                skill_ids.append(skill_id)
+        return skill_ids
+
+    def find(self, text):
+        """Ids of the known skills mentioned anywhere in free ``text``, in order of appearance"""
+        words = [word.strip('.:') for word in WORD_RE.findall(normalize_skill_name(text))]
+        skill_ids = []
+        for start in range(len(words)):
+            # Longest match first, so "machine learning" wins over "machine".
+            for length in range(min(self.max_words, len(words) - start), 0, -1):
+                skill_id = self._ids.get(' '.join(words[start:start + length]))
+                if skill_id is not None:
+                    if skill_id not in skill_ids:
+                        skill_ids.append(skill_id)
+                    break
+        return skill_ids
+
+
+_dictionary = None
+_dictionary_lock = threading.Lock()
+
+
+def get_skill_dictionary():
+    """This process's dictionary, rebuilt if the skill tables changed since it was built"""
+    global _dictionary
+    from django.conf import settings
+
+    with _dictionary_lock:
+        if _dictionary is None:
+            _dictionary = SkillDictionary.from_db()
+        elif time.time() - _dictionary.checked_at >= settings.SKILL_DICTIONARY_SYNC_INTERVAL:
+            if fingerprint() != _dictionary.version:
+                _dictionary = SkillDictionary.from_db()
+            else:
+                _dictionary.checked_at = time.time()
+        return _dictionary
+
+
+def invalidate_skill_dictionary():
+    global _dictionary
+    with _dictionary_lock:
+        _dictionary = None
@@ -0,0 +1,21 @@
+from celery import shared_task
+from django.conf import settings
+
+from .models import ResumeUpload
+from .resumes import process_upload
+
+
+# ``acks_late`` so an upload whose worker died is redelivered; ``claim`` keeps
+# a redelivered or duplicate message from parsing it twice at once.
+@shared_task(bind=True, ignore_result=True, acks_late=True, reject_on_worker_lost=True, max_retries=3)
+def parse_resume_upload(self, upload_id):
+    """Parse an uploaded resume into its user's profile"""
+    upload = process_upload(upload_id)
+    if upload is None:
+        if ResumeUpload.objects.filter(pk=upload_id, status=ResumeUpload.STATUS_PARSING).exists():
+            # Another worker claimed it recently. If that worker died, its
+            # claim goes stale after ``RESUME_PARSE_TIMEOUT`` and this message
+            # is all that is left to parse the upload, so come back then.
+            raise self.retry(countdown=settings.RESUME_PARSE_TIMEOUT + 1)
+        return None
+    return upload.status
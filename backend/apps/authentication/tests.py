@@ -1,3 +1,132 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from celery.exceptions import Retry
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import ResumeUpload, User
+from .resumes import parse_education, parse_experience, process_upload, sections, store
+from .tasks import parse_resume_upload
+
+RESUME = """Jane Doe
+Experience
+Senior Engineer at Foo Ltd, 2015 - 2018
+Backend Developer | Acme Corp | March 2019 - Present
+Education
+BSc in Computer Science, University of Leeds 2011 - 2014
+Master of Science, Institute of Technology 06/2014 - 05/2016
+Skills
+Python, Django
+"""
+
+
+class ResumeParserTests(TestCase):
+    def setUp(self):
+        parsed = dict(sections(RESUME))
+        self.experience = parse_experience(parsed['experience'])
+        self.education = parse_education(parsed['education'])
+
+    def test_experience_entries(self):
+        self.assertEqual(self.experience, [
+            {
+                'position': 'Senior Engineer', 'company': 'Foo Ltd',
+                'start_date': date(2015, 1, 1), 'end_date': date(2018, 12, 1), 'is_current': False,
+            },
+            {
+                'position': 'Backend Developer', 'company': 'Acme Corp',
+                'start_date': date(2019, 3, 1), 'end_date': None, 'is_current': True,
+            },
+        ])
+
+    def test_education_entries(self):
+        self.assertEqual(
+            [(e['degree'], e['field_of_study'], e['institution']) for e in self.education],
+            [
+                ('BSc in Computer Science', 'Computer Science', 'University of Leeds'),
+                ('Master of Science', 'Science', 'Institute of Technology'),
+            ],
+        )
+        self.assertEqual(
+            [(e['start_date'], e['end_date']) for e in self.education],
+            [(date(2011, 1, 1), date(2014, 12, 1)), (date(2014, 6, 1), date(2016, 5, 1))],
+        )
+
+    def test_words_before_a_year_are_not_months(self):
+        entry, = parse_experience(['Analyst, Foo Ltd 2015 - 2018'])
+        self.assertEqual((entry['company'], entry['start_date']), ('Foo Ltd', date(2015, 1, 1)))
+        entry, = parse_education(['University of Leeds 2011 - 2014'])
+        self.assertEqual(entry['institution'], 'University of Leeds')
+
+
+class ParseTaskTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+
+    def upload(self, started_at):
+        return ResumeUpload.objects.create(
+            user=self.user, file='resumes/missing.txt', status=ResumeUpload.STATUS_PARSING, started_at=started_at
+        )
+
+    def test_redelivery_of_a_fresh_claim_retries_later(self):
+        upload = self.upload(timezone.now())
+        with self.assertRaises(Retry):
+            parse_resume_upload(upload.id)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ResumeUpload.STATUS_PARSING)
+
+    def test_stale_claim_is_taken_over(self):
+        upload = self.upload(timezone.now() - timedelta(days=1))
+        # The stored file is missing, so the parse fails once it runs.
+        with self.assertLogs('apps.authentication.resumes', 'ERROR'):
+            self.assertEqual(parse_resume_upload(upload.id), ResumeUpload.STATUS_FAILED)
+
+    def test_finished_uploads_are_left_alone(self):
+        upload = self.upload(None)
+        ResumeUpload.objects.filter(pk=upload.pk).update(status=ResumeUpload.STATUS_PARSED)
+        self.assertIsNone(parse_resume_upload(upload.id))
+
+
+class ResumeStorageTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        media = override_settings(MEDIA_ROOT=root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+
+    def resume(self):
+        return SimpleUploadedFile('resume.txt', RESUME.encode())
+
+    def test_concurrent_store_keeps_one_file(self):
+        name, _, stored = store(self.resume())
+        self.assertTrue(stored)
+        # This upload checked before the first one saved.
+        exists = default_storage.exists
+        with mock.patch.object(default_storage, 'exists') as checked:
+            checked.side_effect = lambda name: checked.call_count > 1 and exists(name)
+            again, _, stored = store(self.resume())
+        self.assertEqual((again, stored), (name, False))
+        self.assertEqual(default_storage.listdir(name.rsplit('/', 1)[0])[1], [name.rsplit('/', 1)[1]])
+
+    def test_identical_upload_reuses_the_stored_parse(self):
+        def upload():
+            name, sha256, _ = store(self.resume())
+            return ResumeUpload.objects.create(user=self.user, file=name, sha256=sha256)
+
+        first = process_upload(upload().id)
+        self.assertEqual(first.status, ResumeUpload.STATUS_PARSED)
+        self.assertFalse(first.result['cached'])
+
+        second = upload()
+        with mock.patch('apps.authentication.resumes.parse_resume') as parse:
+            second = process_upload(second.id)
+        parse.assert_not_called()
+        self.assertTrue(second.result['cached'])
+        self.assertEqual(second.parsed, first.parsed)
+        self.assertEqual(second.result['added'], {'skills': 0, 'experience': 0, 'education': 0})
@@ -16,6 +16,7 @@ urlpatterns = [
     path('logout/', views.LogoutView.as_view(), name='logout'),
     path('profile/', views.ProfileView.as_view(), name='profile'),
     path('upload-resume/', views.ResumeUploadView.as_view(), name='upload-resume'),
+    path('upload-resume/<int:pk>/', views.ResumeUploadStatusView.as_view(), name='resume-upload-status'),
     
     # Include router URLs
     path('', include(router.urls)),
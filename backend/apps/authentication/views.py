@@ -1,16 +1,28 @@
-from django.shortcuts import render
+import logging
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import User, Skill, UserSkill, Education, WorkExperience
-from .serializers import UserSerializer, SkillSerializer, UserSkillSerializer, EducationSerializer, WorkExperienceSerializer
+from .models import User, Skill, UserSkill, Education, WorkExperience, ResumeUpload
+from .resumes import EXTENSIONS as RESUME_EXTENSIONS, store as store_resume
+from .serializers import (
+    UserSerializer, SkillSerializer, UserSkillSerializer, EducationSerializer, WorkExperienceSerializer,
+    ResumeUploadSerializer,
+)
+from .tasks import parse_resume_upload
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import authenticate
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
 
 # Create your views here.
 
@@ -128,6 +140,13 @@ class ProfileView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class ResumeUploadView(APIView):
+    """
+    Store a resume as the user's current one and queue it for parsing.
+
+    Parsing (text, skills, experience and education) runs on the ``resumes``
+    workers, so the response is an immediate ``202 Accepted`` with a
+    ``status_url`` to poll; a ``resume`` event is also pushed when it ends.
+    """
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -135,7 +154,45 @@ class ResumeUploadView(APIView):
         file_obj = request.FILES.get('resume')
         if not file_obj:
             return Response({'error': 'No file provided.'}, status=status.HTTP_400_BAD_REQUEST)
-        file_path = default_storage.save(f'resumes/{file_obj.name}', file_obj)
-        request.user.resume_url = file_path
-        request.user.save()
-        return Response({'resume_url': file_path}, status=status.HTTP_200_OK)
+        if os.path.splitext(file_obj.name)[1].lower() not in RESUME_EXTENSIONS:
+            return Response(
+                {'error': f'Unsupported file type; upload one of {", ".join(RESUME_EXTENSIONS)}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if file_obj.size > settings.RESUME_MAX_UPLOAD_SIZE:
+            return Response({'error': 'The file is too large.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        name, sha256, stored = store_resume(file_obj)
+        upload = ResumeUpload(
+            user=request.user, file=name, original_name=file_obj.name[:255],
+            sha256=sha256, size=file_obj.size, deduplicated=not stored,
+        )
+        with transaction.atomic():
+            upload.save()
+            request.user.resume = upload.file.name
+            request.user.save(update_fields=['resume', 'updated_at'])
+
+        try:
+            parse_resume_upload.delay(upload.id)
+        except Exception as exc:
+            logger.exception("Could not enqueue resume upload %s", upload.id)
+            upload.status = ResumeUpload.STATUS_FAILED
+            upload.message = f'Could not enqueue parsing: {exc}'[:255]
+            upload.save(update_fields=['status', 'message'])
+            return Response(self.describe(request, upload), status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(self.describe(request, upload), status=status.HTTP_202_ACCEPTED)
+
+    def describe(self, request, upload):
+        data = ResumeUploadSerializer(upload).data
+        data['resume'] = request.build_absolute_uri(upload.file.url)
+        data['status_url'] = request.build_absolute_uri(
+            reverse('resume-upload-status', kwargs={'pk': upload.id})
+        )
+        return data
+
+class ResumeUploadStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        upload = get_object_or_404(ResumeUpload, pk=pk, user=request.user)
+        return Response(ResumeUploadSerializer(upload).data)
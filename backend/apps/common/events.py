@@ -0,0 +1,214 @@
+"""
+Per-user event fan-out for the real-time push channel.
+
+Application code calls ``publish`` / ``publish_many`` from ordinary
+(synchronous) request handlers, signals and Celery tasks; the events go out
+once the surrounding transaction commits. Connected clients consume them
+through ``Broker.subscribe``, an async context manager yielding a bounded
+``asyncio.Queue``, so an idle connection costs one suspended coroutine.
+
+``InMemoryBroker`` only reaches subscribers in the same process and is the
+stand-in for development and tests. ``RedisBroker`` relays events through
+Redis pub/sub so Celery workers and every ASGI process share them; each
+event loop in a process holds one Redis subscription connection and
+subscribes to a user's channel only while that user has a client connected
+through it.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _offer(queue, message):
+    """Enqueue without blocking; a client too slow to keep up loses its oldest events"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class InMemoryBroker:
+    """Delivers events to subscribers in this process only"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, message):
+        self.publish_many([(user_id, message)])
+
+    def publish_many(self, items):
+        for user_id, message in items:
+            self.dispatch(user_id, message)
+
+    def dispatch(self, user_id, message, loop=None):
+        """
+        Hand ``message`` to this process's subscribers of ``user_id`` (only
+        those on ``loop`` when given), from any thread.
+        """
+        with self._lock:
+            subscribers = [
+                (l, queue) for l, queue in self._subscribers.get(user_id, ()) if loop is None or l is loop
+            ]
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # The subscriber's event loop has shut down.
+                pass
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(entries) for entries in self._subscribers.values())
+
+    def _on_loop(self, user_id, loop):
+        return any(l is loop for l, _ in self._subscribers.get(user_id, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        entry = (loop, queue)
+        with self._lock:
+            first = not self._on_loop(user_id, loop)
+            self._subscribers[user_id].add(entry)
+        try:
+            if first:
+                await self._listen(user_id)
+            yield queue
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(entry)
+                last = not self._on_loop(user_id, loop)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+            if last:
+                await self._unlisten(user_id)
+
+    async def _listen(self, user_id):
+        """Hook: the first subscriber of ``user_id`` on the running event loop arrived"""
+
+    async def _unlisten(self, user_id):
+        """Hook: the last subscriber of ``user_id`` on the running event loop left"""
+
+
+class RedisBroker(InMemoryBroker):
+    """Relays events between processes through Redis pub/sub"""
+
+    def __init__(self, url, queue_size=100, prefix='events'):
+        super().__init__(queue_size=queue_size)
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        # Event loop -> (pub/sub connection, reader task). Redis asyncio
+        # connections are bound to the loop that opened them, so every loop
+        # serving streams gets its own.
+        self._connections = {}
+
+    def channel(self, user_id):
+        return f'{self.prefix}:user:{user_id}'
+
+    def publish_many(self, items):
+        pipeline = self._client.pipeline(transaction=False)
+        for user_id, message in items:
+            pipeline.publish(self.channel(user_id), json.dumps(message, cls=DjangoJSONEncoder))
+        pipeline.execute()
+
+    async def _listen(self, user_id):
+        import redis.asyncio
+
+        loop = asyncio.get_running_loop()
+        pubsub, reader = self._connections.get(loop, (None, None))
+        if pubsub is None:
+            pubsub = redis.asyncio.Redis.from_url(self.url).pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel(user_id))
+        if reader is None or reader.done():
+            reader = loop.create_task(self._read(pubsub, loop))
+        self._connections[loop] = (pubsub, reader)
+
+    async def _unlisten(self, user_id):
+        loop = asyncio.get_running_loop()
+        pubsub, reader = self._connections.get(loop, (None, None))
+        if pubsub is None:
+            return
+        try:
+            await pubsub.unsubscribe(self.channel(user_id))
+        except Exception:
+            logger.exception("Could not unsubscribe from %s", self.channel(user_id))
+        if not pubsub.subscribed:
+            # The reader stops once nothing is subscribed; drop the connection with it.
+            del self._connections[loop]
+            try:
+                await pubsub.close()
+            except Exception:
+                logger.exception("Could not close an event subscription connection")
+
+    async def _read(self, pubsub, loop):
+        while pubsub.subscribed:
+            try:
+                message = await pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event subscription failed; retrying")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message['type'] != 'message':
+                continue
+            channel = message['channel'].decode()
+            try:
+                user_id = int(channel.rsplit(':', 1)[1])
+                payload = json.loads(message['data'])
+            except (IndexError, ValueError):
+                logger.warning("Ignoring malformed event on %s", channel)
+                continue
+            self.dispatch(user_id, payload, loop=loop)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """This process's broker: Redis when ``EVENT_BROKER_URL`` is set, otherwise in-memory"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if settings.EVENT_BROKER_URL:
+                _broker = RedisBroker(settings.EVENT_BROKER_URL, queue_size=settings.EVENT_STREAM_QUEUE_SIZE)
+            else:
+                _broker = InMemoryBroker(queue_size=settings.EVENT_STREAM_QUEUE_SIZE)
+        return _broker
+
+
+def publish_many(events):
+    """Push ``[(user_id, event, data), ...]`` to connected clients after the transaction commits"""
+    items = [(user_id, {'event': event, 'data': data}) for user_id, event, data in events]
+    if not items:
+        return
+
+    def send():
+        try:
+            get_broker().publish_many(items)
+        except Exception:
+            # Push is best effort; clients can always re-read the REST endpoints.
+            logger.exception("Could not publish %d event(s)", len(items))
+
+    transaction.on_commit(send)
+
+
+def publish(user_id, event, data):
+    publish_many([(user_id, event, data)])
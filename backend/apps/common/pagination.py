@@ -0,0 +1,134 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a composite ordering.
+
+    The ordering is taken from the queryset's ``order_by()`` (falling back to
+    ``ordering``), with the primary key appended as a tie-breaker. The cursor
+    encodes the ordering values of the last row served, and the next page is
+    fetched with a range condition on them, so deep pages cost the same as the
+    first one instead of an ``OFFSET`` scan.
+    """
+    ordering = ('-date_posted', '-id')
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.fields)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.cursor_filter(queryset.model, cursor))
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_ordering(self, queryset):
+        fields = [f for f in queryset.query.order_by if isinstance(f, str)] or list(self.ordering)
+        if not any(f.lstrip('-') in ('id', 'pk') for f in fields):
+            fields.append('-id' if fields[-1].startswith('-') else 'id')
+        return fields
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def cursor_filter(self, model, values):
+        """``(f1, f2, ...) > (v1, v2, ...)`` spelled out for the ordering's directions"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.fields, self.parse_values(model, values)):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def parse_values(self, model, values):
+        parsed = []
+        for field, value in zip(self.fields, values):
+            try:
+                model_field = model._meta.get_field(field.lstrip('-'))
+            except FieldDoesNotExist:
+                # Annotations such as ``search_rank`` are compared as given.
+                if isinstance(value, (list, dict)):
+                    raise NotFound(self.invalid_cursor_message)
+                parsed.append(value)
+                continue
+            try:
+                parsed.append(model_field.to_python(value))
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+        return parsed
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        return self.decode_token(encoded)
+
+    def decode_token(self, encoded):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, obj):
+        values = [_json_value(getattr(obj, field.lstrip('-'))) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
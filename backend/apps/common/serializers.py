@@ -0,0 +1,33 @@
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_list(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def selected_fields(request, available):
+    """
+    The subset of ``available`` field names requested with ``?fields=a,b``
+    and/or ``?omit=c``, in their original order.
+    """
+    fields = parse_field_list(request.query_params.get('fields'))
+    omit = parse_field_list(request.query_params.get('omit'))
+    return [
+        name for name in available
+        if (not fields or name in fields) and name not in omit
+    ]
+
+
+class FieldSelectionMixin:
+    """Lets clients trim a serializer's output with ``?fields=`` and ``?omit=``"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        # Only reads are trimmed; writes always validate the full field set.
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        keep = set(selected_fields(request, self.fields))
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
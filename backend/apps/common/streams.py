@@ -0,0 +1,121 @@
+"""
+Server-Sent Events endpoint for the real-time push channel.
+
+The view is a native async view, so under an ASGI server each open stream
+is a coroutine waiting on its subscription queue rather than a worker
+thread. Browsers' ``EventSource`` cannot send headers, so besides the
+session cookie and an ``Authorization: Bearer`` header a stream may be
+opened with ``?ticket=``: a signed ticket from ``POST /api/v1/events/ticket/``
+that expires after ``EVENT_STREAM_TICKET_MAX_AGE`` seconds, which keeps
+access tokens out of URLs and access logs.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from apps.authentication.models import User
+
+from .events import get_broker
+
+
+TICKET_SALT = 'apps.common.streams.ticket'
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+def issue_ticket(user):
+    return signing.dumps({'user': user.pk}, salt=TICKET_SALT)
+
+
+async def ticket_user(ticket):
+    """The active user a stream ticket was issued to; ``None`` if it is invalid or expired"""
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=settings.EVENT_STREAM_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return await User.objects.filter(pk=payload.get('user'), is_active=True).afirst()
+
+
+async def authenticate(request):
+    """The requesting user from a JWT header, a ``?ticket=`` or the session; ``None`` if anonymous"""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token:
+        try:
+            return await sync_to_async(auth.get_user)(auth.get_validated_token(raw_token))
+        except (InvalidToken, TokenError):
+            return None
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return await ticket_user(ticket)
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+class EventStreamTicketView(APIView):
+    """
+    ``POST`` returns a ticket for opening the event stream as
+    ``GET /api/v1/events/?ticket=...``; it expires after
+    ``EVENT_STREAM_TICKET_MAX_AGE`` seconds, so fetch one per connection.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            'ticket': issue_ticket(request.user),
+            'expires_in': settings.EVENT_STREAM_TICKET_MAX_AGE,
+        })
+
+
+class EventStreamView(View):
+    """
+    ``GET`` opens a ``text/event-stream`` of the user's events:
+    ``notification``, ``alert_matches``, ``application_status``,
+    ``recommendations`` and ``resume``. A comment line is sent every
+    ``EVENT_STREAM_HEARTBEAT`` seconds to keep proxies from closing an idle
+    stream and to notice disconnected clients.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {'detail': 'The event stream is only served by the ASGI application (core.asgi).'},
+                status=501,
+            )
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        response = StreamingHttpResponse(self.events(user.id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def events(self, user_id):
+        heartbeat = settings.EVENT_STREAM_HEARTBEAT
+        async with get_broker().subscribe(user_id) as queue:
+            yield f'retry: {settings.EVENT_STREAM_RETRY_MS}\n\n'
+            yield format_event('ready', {'user': user_id})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_event(message['event'], message['data'])
@@ -0,0 +1,11 @@
+"""Factories shared by the apps' tests"""
+from apps.jobs.models import Job
+
+
+def make_job(title, **fields):
+    defaults = dict(
+        company_name='Acme', description='', location='Remote', tags='',
+        required_skills='', employment_type='full_time',
+    )
+    defaults.update(fields)
+    return Job.objects.create(title=title, **defaults)
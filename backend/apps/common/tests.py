@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+
+from .events import InMemoryBroker, RedisBroker
+from .streams import authenticate, issue_ticket
+
+
+class RecordingBroker(InMemoryBroker):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    async def _listen(self, user_id):
+        self.calls.append(('listen', user_id, asyncio.get_running_loop()))
+
+    async def _unlisten(self, user_id):
+        self.calls.append(('unlisten', user_id, asyncio.get_running_loop()))
+
+
+class BrokerTests(TestCase):
+    def test_listens_once_per_event_loop(self):
+        broker = RecordingBroker()
+        subscribed, done = threading.Event(), threading.Event()
+        received = {}
+
+        async def hold():
+            async with broker.subscribe(1) as queue:
+                async with broker.subscribe(1):
+                    subscribed.set()
+                    await asyncio.get_running_loop().run_in_executor(None, done.wait)
+                received['other'] = queue.qsize()
+
+        other = threading.Thread(target=asyncio.run, args=(hold(),))
+        other.start()
+        subscribed.wait()
+
+        async def visit():
+            async with broker.subscribe(1) as queue:
+                broker.dispatch(1, {'event': 'ping'}, loop=asyncio.get_running_loop())
+                await asyncio.sleep(0)
+                received['here'] = queue.qsize()
+
+        asyncio.run(visit())
+        done.set()
+        other.join()
+
+        self.assertEqual([call[0] for call in broker.calls], ['listen', 'listen', 'unlisten', 'unlisten'])
+        self.assertIsNot(broker.calls[0][2], broker.calls[1][2])
+        self.assertEqual(received, {'here': 1, 'other': 0})
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.closed = False
+
+    @property
+    def subscribed(self):
+        return bool(self.channels)
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def get_message(self, timeout):
+        await asyncio.sleep(0)
+
+    async def close(self):
+        self.closed = True
+
+
+class RedisBrokerTests(TestCase):
+    def test_last_unlisten_closes_the_connection(self):
+        pubsub = FakePubSub()
+        broker = RedisBroker('redis://localhost:6379/0')
+
+        async def visit():
+            async with broker.subscribe(1):
+                async with broker.subscribe(2):
+                    self.assertEqual(pubsub.channels, {'events:user:1', 'events:user:2'})
+                self.assertFalse(pubsub.closed)
+            self.assertTrue(pubsub.closed)
+            self.assertEqual(broker._connections, {})
+
+        with mock.patch('redis.asyncio.Redis.from_url') as client:
+            client.return_value.pubsub.return_value = pubsub
+            with self.assertNoLogs('apps.common.events', 'ERROR'):
+                asyncio.run(visit())
+        client.assert_called_once()
+
+
+class StreamTicketTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+
+    def authenticate(self, **params):
+        request = RequestFactory().get('/api/v1/events/', params)
+
+        async def anonymous():
+            return AnonymousUser()
+
+        request.auser = anonymous
+        return async_to_sync(authenticate)(request)
+
+    def test_ticket_opens_stream_for_its_user(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        ticket = client.post('/api/v1/events/ticket/').json()['ticket']
+        self.assertEqual(self.authenticate(ticket=ticket), self.user)
+
+    def test_anonymous_users_get_no_ticket(self):
+        self.assertEqual(APIClient().post('/api/v1/events/ticket/').status_code, 401)
+
+    def test_bad_or_expired_tickets_are_refused(self):
+        ticket = issue_ticket(self.user)
+        self.assertIsNone(self.authenticate(ticket=ticket + 'x'))
+        with override_settings(EVENT_STREAM_TICKET_MAX_AGE=-1):
+            self.assertIsNone(self.authenticate(ticket=ticket))
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.authenticate(ticket=ticket))
+
+    def test_access_token_is_not_accepted_in_the_url(self):
+        self.assertIsNone(self.authenticate(token='anything'))
@@ -0,0 +1,56 @@
+"""
+Precomputed skill demand.
+
+``SkillDemand`` holds, per skill, how many active jobs require it and how
+many list it as optional. Changes recount only the skills they touch; the
+``refresh_skill_demand`` command recounts everything.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import JobSkill, SkillDemand
+
+
+def refresh_skill_demand(skill_ids=None):
+    """Recount demand for ``skill_ids`` (every skill when omitted); returns rows written"""
+    rows = JobSkill.objects.filter(job__is_active=True)
+    stale = SkillDemand.objects.all()
+    if skill_ids is not None:
+        skill_ids = list(skill_ids)
+        if not skill_ids:
+            return 0
+        rows = rows.filter(skill_id__in=skill_ids)
+        stale = stale.filter(skill_id__in=skill_ids)
+
+    counts = rows.values('skill_id').annotate(
+        required_jobs=Count('job', filter=Q(required=True), distinct=True),
+        optional_jobs=Count('job', filter=Q(required=False), distinct=True),
+    )
+    now = timezone.now()
+    demand = [
+        SkillDemand(
+            skill_id=row['skill_id'],
+            required_jobs=row['required_jobs'],
+            optional_jobs=row['optional_jobs'],
+            updated_at=now,
+        )
+        for row in counts
+    ]
+    with transaction.atomic():
+        # Skills no active job asks for any more.
+        stale.exclude(skill_id__in=[d.skill_id for d in demand]).delete()
+        SkillDemand.objects.bulk_create(
+            demand,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['skill'],
+            update_fields=['required_jobs', 'optional_jobs', 'updated_at'],
+        )
+    return len(demand)
+
+
+def refresh_skill_demand_on_commit(skill_ids):
+    skill_ids = set(skill_ids)
+    if skill_ids:
+        transaction.on_commit(lambda: refresh_skill_demand(skill_ids))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.skills import backfill_job_skills
+
+
+class Command(BaseCommand):
+    help = (
+        "Resolve every job's required skills and tags into JobSkill rows "
+        "(run after importing jobs or adding skills or aliases)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        jobs, skills = backfill_job_skills(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated skills of {jobs} jobs ({skills} skills affected)"))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ml.embeddings import build_job_embedding_snapshot
+
+
+class Command(BaseCommand):
+    help = "Embed every active job, train the ANN partitions and snapshot the index to disk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(settings.JOB_EMBEDDING_SNAPSHOT),
+                            help="Snapshot path (defaults to JOB_EMBEDDING_SNAPSHOT)")
+
+    def handle(self, *args, **options):
+        embeddings = build_job_embedding_snapshot(options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedded {len(embeddings)} jobs into {embeddings.index.nlist} partitions at {options['output']}"
+        ))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ml.skill_index import SkillIndex
+
+
+class Command(BaseCommand):
+    help = "Build the skill -> active job index and snapshot it to disk for warm worker starts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(settings.SKILL_INDEX_SNAPSHOT),
+                            help="Snapshot path (defaults to SKILL_INDEX_SNAPSHOT)")
+
+    def handle(self, *args, **options):
+        index = SkillIndex.from_db()
+        index.save(options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(index)} jobs into {options['output']}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Re-index every job in the full-text search index (after bulk imports or raw SQL edits)"
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS("Job search index rebuilt"))
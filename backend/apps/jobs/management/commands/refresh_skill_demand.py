@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.demand import refresh_skill_demand
+
+
+class Command(BaseCommand):
+    help = "Recount how many active jobs require or list each skill"
+
+    def handle(self, *args, **options):
+        skills = refresh_skill_demand()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed demand for {skills} skills"))
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE jobs_job_fts USING fts5(
+        title, description, tags, required_skills,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO jobs_job_fts (rowid, title, description, tags, required_skills)
+    SELECT id, title, description, tags, required_skills FROM jobs_job
+    """,
+]
+SQLITE_REVERSE = ["DROP TABLE IF EXISTS jobs_job_fts"]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE jobs_job ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(required_skills, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX jobs_job_search_vector_gin ON jobs_job USING gin (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS jobs_job_search_vector_gin",
+    "ALTER TABLE jobs_job DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0002_job_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run_for_vendor({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
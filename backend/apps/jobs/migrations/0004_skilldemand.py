@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_skill_demand(apps, schema_editor):
+    JobSkill = apps.get_model("jobs", "JobSkill")
+    SkillDemand = apps.get_model("jobs", "SkillDemand")
+    counts = (
+        JobSkill.objects.filter(job__is_active=True)
+        .values("skill_id")
+        .annotate(
+            required_jobs=Count("job", filter=Q(required=True), distinct=True),
+            optional_jobs=Count("job", filter=Q(required=False), distinct=True),
+        )
+    )
+    SkillDemand.objects.bulk_create(
+        [SkillDemand(**row) for row in counts], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0003_profile_updated_at_indexes"),
+        ("jobs", "0003_job_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SkillDemand",
+            fields=[
+                (
+                    "skill",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="demand",
+                        serialize=False,
+                        to="authentication.skill",
+                    ),
+                ),
+                ("required_jobs", models.IntegerField(default=0)),
+                ("optional_jobs", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(count_skill_demand, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:13
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, Min
+from django.db.models.functions import Cast
+
+
+def delete_duplicate_job_skills(apps, schema_editor):
+    """Keep the oldest row of each (job, skill) pair, required if any duplicate was"""
+    JobSkill = apps.get_model("jobs", "JobSkill")
+    duplicates = (
+        JobSkill.objects.values("job_id", "skill_id")
+        # Postgres has no MAX(boolean).
+        .annotate(
+            rows=Count("id"),
+            keep=Min("id"),
+            required=Max(Cast("required", IntegerField())),
+        ).filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        rows = JobSkill.objects.filter(job_id=dup["job_id"], skill_id=dup["skill_id"])
+        rows.exclude(id=dup["keep"]).delete()
+        rows.update(required=bool(dup["required"]))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0004_skillalias"),
+        ("jobs", "0004_skilldemand"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobskill",
+            name="from_text",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(delete_duplicate_job_skills, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="jobskill",
+            constraint=models.UniqueConstraint(
+                fields=("job", "skill"), name="unique_job_skill"
+            ),
+        ),
+    ]
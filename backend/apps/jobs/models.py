@@ -14,11 +14,49 @@ class Job(models.Model):
     posted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='posted_jobs')
     is_active = models.BooleanField(default=True)
     date_posted = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets saves tell an activation change from any other edit without a query.
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_is_active = self.is_active
 
 class JobSkill(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
     required = models.BooleanField(default=True)
+    # Derived from the job's ``required_skills``/``tags`` strings and kept in
+    # step with them (see ``apps.jobs.skills``); other rows are left alone.
+    from_text = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'skill'], name='unique_job_skill'),
+        ]
+
+class SkillDemand(models.Model):
+    """
+    Number of active jobs asking for a skill, kept current from ``JobSkill``
+    and ``Job`` changes (see ``apps.jobs.demand``).
+    """
+    skill = models.OneToOneField(Skill, on_delete=models.CASCADE, primary_key=True, related_name='demand')
+    required_jobs = models.IntegerField(default=0)
+    optional_jobs = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.skill_id}: {self.required_jobs} required, {self.optional_jobs} optional"
 
 class Company(models.Model):
     name = models.CharField(max_length=100, unique=True)
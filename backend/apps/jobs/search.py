@@ -0,0 +1,179 @@
+"""
+Full-text job search.
+
+One interface over two index implementations: an FTS5 virtual table ranked
+with BM25 on SQLite, and a generated ``tsvector`` column with a GIN index on
+PostgreSQL. Both index ``title``, ``description``, ``tags`` and
+``required_skills``; matches are annotated with ``search_rank`` (higher is
+more relevant). Other databases fall back to ``icontains`` scans.
+"""
+import re
+from abc import ABC, abstractmethod
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Job
+
+SEARCH_FIELDS = ('title', 'description', 'tags', 'required_skills')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall((query or '').lower())
+
+
+class SearchBackend(ABC):
+    """Interface implemented by the vendor-specific search backends"""
+
+    @abstractmethod
+    def filter(self, queryset, query, fields=None, rank=True):
+        """
+        Restrict ``queryset`` to jobs matching every term of ``query`` (the
+        last term as a prefix) in ``fields`` and, with ``rank``, annotate
+        ``search_rank``.
+        """
+
+    def index_job(self, job):
+        """Add or refresh ``job`` in the index"""
+
+    def remove_job(self, job_id):
+        """Drop ``job_id`` from the index"""
+
+    def rebuild(self):
+        """Re-index every job"""
+
+
+class SQLiteSearchBackend(SearchBackend):
+    table = 'jobs_job_fts'
+    # bm25() column weights, in SEARCH_FIELDS order.
+    weights = (10.0, 1.0, 4.0, 4.0)
+
+    def match_expression(self, query, fields=None):
+        terms = tokenize(query)
+        if not terms:
+            return None
+        phrases = [f'"{term}"' for term in terms]
+        phrases[-1] += '*'
+        expression = ' '.join(phrases)
+        if fields:
+            expression = '{%s} : (%s)' % (' '.join(fields), expression)
+        return expression
+
+    def filter(self, queryset, query, fields=None, rank=True):
+        match = self.match_expression(query, fields)
+        if match is None:
+            return queryset.none()
+        if not rank:
+            matches = RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", (match,))
+            return queryset.filter(id__in=matches)
+        # Joined once so bm25() reads the rank of the row the MATCH produced,
+        # instead of re-running the query per job in a correlated subquery.
+        # bm25() needs the FTS table in the FROM clause, which only
+        # ``extra(tables=...)`` can add.
+        weights = ', '.join(str(w) for w in self.weights)
+        return queryset.extra(
+            tables=[self.table],
+            where=[f"{self.table} MATCH %s", f"{self.table}.rowid = {Job._meta.db_table}.id"],
+            params=[match],
+        ).annotate(search_rank=RawSQL(f"-bm25({self.table}, {weights})", ()))
+
+    def index_job(self, job):
+        columns = ', '.join(SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [job.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {columns}) VALUES (%s, %s, %s, %s, %s)",
+                [job.pk] + [getattr(job, field) or '' for field in SEARCH_FIELDS],
+            )
+
+    def remove_job(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [job_id])
+
+    def rebuild(self):
+        columns = ', '.join(SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM {Job._meta.db_table}"
+            )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    ``search_vector`` is a stored generated column, so PostgreSQL maintains
+    the index itself on every insert, update and delete. Ranking uses
+    ``ts_rank_cd`` with document-length normalisation, the closest built-in
+    to BM25.
+    """
+    config = 'english'
+    # tsvector weight label per field, in SEARCH_FIELDS order.
+    labels = {'title': 'A', 'tags': 'B', 'required_skills': 'C', 'description': 'D'}
+
+    def tsquery(self, query, fields=None):
+        terms = tokenize(query)
+        if not terms:
+            return None
+        labels = ''.join(self.labels[field] for field in fields) if fields else ''
+        parts = [f'{term}:{labels}' if labels else term for term in terms[:-1]]
+        parts.append(f'{terms[-1]}:*{labels}')
+        return ' & '.join(parts)
+
+    def filter(self, queryset, query, fields=None, rank=True):
+        tsquery = self.tsquery(query, fields)
+        if tsquery is None:
+            return queryset.none()
+        table = Job._meta.db_table
+        matches = RawSQL(
+            f"SELECT id FROM {table} WHERE search_vector @@ to_tsquery(%s, %s)",
+            (self.config, tsquery),
+        )
+        queryset = queryset.filter(id__in=matches)
+        if rank:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"ts_rank_cd({table}.search_vector, to_tsquery(%s, %s), 1)",
+                (self.config, tsquery),
+            ))
+        return queryset
+
+
+class SubstringSearchBackend(SearchBackend):
+    """
+    Fallback for databases without a supported full-text index: every term
+    must appear in one of the fields (``icontains``), and ``search_rank``
+    adds up the weights of the fields each term appears in. Saves keep
+    working but searches scan the table.
+    """
+    weights = {'title': 10.0, 'description': 1.0, 'tags': 4.0, 'required_skills': 4.0}
+
+    def filter(self, queryset, query, fields=None, rank=True):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        fields = fields or SEARCH_FIELDS
+        score = Value(0.0, output_field=FloatField())
+        for term in terms:
+            matches = [Q(**{f'{field}__icontains': term}) for field in fields]
+            queryset = queryset.filter(reduce(or_, matches))
+            for field, match in zip(fields, matches):
+                score += Case(
+                    When(match, then=Value(self.weights[field])),
+                    default=Value(0.0), output_field=FloatField(),
+                )
+        if rank:
+            queryset = queryset.annotate(search_rank=score)
+        return queryset
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return SubstringSearchBackend()
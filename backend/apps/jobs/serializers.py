@@ -1,17 +1,31 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+from apps.common.serializers import FieldSelectionMixin
 from .models import Job, JobSkill, Company
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = '__all__'
 
+class JobListSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    """Compact representation for job lists; the description is detail-only"""
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'title', 'company_name', 'location', 'tags', 'required_skills',
+            'salary_min', 'salary_max', 'employment_type', 'posted_by', 'is_active',
+            'date_posted', 'updated_at',
+        )
+
 class JobSkillSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobSkill
         fields = '__all__'
+        read_only_fields = ('from_text',)
+        validators = [UniqueTogetherValidator(queryset=JobSkill.objects.all(), fields=('job', 'skill'))]
 
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
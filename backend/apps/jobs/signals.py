@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ml.embeddings import loaded_job_embedding_index
+from ml.skill_index import loaded_skill_index
+
+from .demand import refresh_skill_demand_on_commit
+from .models import Job, JobSkill
+from .search import get_search_backend
+from .skills import sync_job_skills
+
+SKILL_TEXT_FIELDS = {'required_skills', 'tags'}
+
+
+def _reindex(job_id):
+    for index in (loaded_skill_index(), loaded_job_embedding_index()):
+        if index is not None:
+            transaction.on_commit(
+                lambda index=index: index.refresh_jobs(Job.objects.filter(pk=job_id))
+            )
+
+
+@receiver(post_save, sender=Job)
+def reindex_job(sender, instance, created, update_fields=None, **kwargs):
+    get_search_backend().index_job(instance)
+    if update_fields is None or SKILL_TEXT_FIELDS & set(update_fields):
+        sync_job_skills([instance])
+    _reindex(instance.pk)
+    # ``sync_job_skills`` recounts the skills whose rows it changed; an
+    # activation change moves every skill the job asks for.
+    if not created and getattr(instance, '_loaded_is_active', None) != instance.is_active:
+        refresh_skill_demand_on_commit(
+            JobSkill.objects.filter(job_id=instance.pk).values_list('skill_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    get_search_backend().remove_job(instance.pk)
+    job_id = instance.pk
+    for index in (loaded_skill_index(), loaded_job_embedding_index()):
+        if index is not None:
+            transaction.on_commit(lambda index=index: index.remove_job(job_id))
+
+
+@receiver(post_save, sender=JobSkill)
+@receiver(post_delete, sender=JobSkill)
+def touch_job_on_skill_change(sender, instance, **kwargs):
+    """Skill edits change a job's candidates, so move its ``updated_at`` too"""
+    Job.objects.filter(pk=instance.job_id).update(updated_at=timezone.now())
+    _reindex(instance.job_id)
+    refresh_skill_demand_on_commit([instance.skill_id])
@@ -0,0 +1,96 @@
+"""
+Normalised job skills.
+
+``Job.required_skills`` and ``Job.tags`` are free text; matching, demand and
+the skill index work on ``JobSkill`` rows keyed by ``Skill.id``. The text is
+resolved through the canonical skill dictionary into ``from_text`` rows
+(required skills as required, tags as optional) whenever a job is saved, so
+every downstream query is an integer join. Rows added by hand are never
+touched. ``backfill_job_skills`` does the same for existing jobs in bulk,
+e.g. after a deploy or after adding skills or aliases.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.authentication.skill_dictionary import get_skill_dictionary
+
+from .demand import refresh_skill_demand, refresh_skill_demand_on_commit
+from .models import Job, JobSkill
+
+
+def parsed_skills(job, dictionary):
+    """``{skill_id: required}`` for the skills named in the job's text"""
+    skills = dict.fromkeys(dictionary.resolve(job.tags), False)
+    skills.update(dict.fromkeys(dictionary.resolve(job.required_skills), True))
+    return skills
+
+
+def sync_job_skills(jobs, dictionary=None, refresh_demand=True):
+    """
+    Bring the ``from_text`` ``JobSkill`` rows of ``jobs`` in line with their
+    text. Returns ``(job_ids, skill_ids)`` of the rows that changed.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return set(), set()
+    dictionary = dictionary or get_skill_dictionary()
+
+    existing = {}
+    for row in JobSkill.objects.filter(job_id__in=[job.pk for job in jobs]).only(
+        'id', 'job_id', 'skill_id', 'required', 'from_text'
+    ):
+        existing[row.job_id, row.skill_id] = row
+
+    create, update, delete = [], [], []
+    for job in jobs:
+        wanted = parsed_skills(job, dictionary)
+        for skill_id, required in wanted.items():
+            row = existing.get((job.pk, skill_id))
+            if row is None:
+                create.append(JobSkill(job_id=job.pk, skill_id=skill_id, required=required, from_text=True))
+            elif row.from_text and row.required != required:
+                row.required = required
+                update.append(row)
+        delete.extend(
+            row for (job_id, skill_id), row in existing.items()
+            if job_id == job.pk and row.from_text and skill_id not in wanted
+        )
+    if not (create or update or delete):
+        return set(), set()
+
+    with transaction.atomic():
+        # ``ignore_conflicts`` so a row added concurrently is kept as is.
+        JobSkill.objects.bulk_create(create, batch_size=1000, ignore_conflicts=True)
+        JobSkill.objects.bulk_update(update, ['required'], batch_size=1000)
+        if delete:
+            JobSkill.objects.filter(id__in=[row.id for row in delete]).delete()
+
+    changed = create + update + delete
+    skill_ids = {row.skill_id for row in changed}
+    if refresh_demand:
+        refresh_skill_demand_on_commit(skill_ids)
+    return {row.job_id for row in changed}, skill_ids
+
+
+def backfill_job_skills(batch_size=1000):
+    """
+    Sync the ``from_text`` rows of every job, ``batch_size`` jobs at a time.
+    Returns ``(jobs changed, skills affected)``.
+    """
+    dictionary = get_skill_dictionary()
+    columns = Job.objects.order_by('id').only('id', 'required_skills', 'tags')
+    changed_jobs, changed_skills = 0, set()
+    last_id = 0
+    while True:
+        batch = list(columns.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        job_ids, skill_ids = sync_job_skills(batch, dictionary, refresh_demand=False)
+        if job_ids:
+            # So recommendation materialization and index syncs see the new skills.
+            Job.objects.filter(id__in=job_ids).update(updated_at=timezone.now())
+        changed_jobs += len(job_ids)
+        changed_skills |= skill_ids
+    refresh_skill_demand(changed_skills)
+    return changed_jobs, len(changed_skills)
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from ml.embeddings import build_job_embedding_snapshot
+
+
+@shared_task(ignore_result=True)
+def build_job_embedding_index():
+    """Embed the catalogue and write the snapshot request handlers load"""
+    return len(build_job_embedding_snapshot())
@@ -1,3 +1,231 @@
-from django.test import TestCase
+import base64
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Skill, SkillAlias, User
+from apps.authentication.skill_dictionary import SkillDictionary, invalidate_skill_dictionary
+from apps.common.testing import make_job
+
+from .models import Job, JobSkill, SkillDemand
+from .search import SQLiteSearchBackend, SubstringSearchBackend
+from .skills import backfill_job_skills
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.title_match = make_job('Python Developer')
+        self.body_match = make_job('Backend Engineer', description='We write python services')
+        self.other = make_job('Rust Engineer', description='Systems work')
+
+    def ids(self, queryset):
+        return [job.id for job in queryset]
+
+    def test_sqlite_ranks_title_matches_first(self):
+        queryset = SQLiteSearchBackend().filter(Job.objects.all(), 'python').order_by('-search_rank')
+        self.assertEqual(self.ids(queryset), [self.title_match.id, self.body_match.id])
+
+    def test_sqlite_rank_joins_index_once(self):
+        queryset = SQLiteSearchBackend().filter(Job.objects.all(), 'pyth')
+        with CaptureQueriesContext(connection) as queries:
+            list(queryset)
+        sql = queries.captured_queries[0]['sql']
+        self.assertEqual(sql.count('MATCH'), 1)
+        self.assertNotIn('SELECT -bm25', sql)
+
+    def test_unranked_filter_keeps_existing_rank(self):
+        backend = SQLiteSearchBackend()
+        queryset = backend.filter(Job.objects.all(), 'engineer', fields=['title'], rank=False)
+        queryset = backend.filter(queryset, 'python').order_by('-search_rank')
+        self.assertEqual(self.ids(queryset), [self.body_match.id])
+
+    def test_substring_fallback(self):
+        backend = SubstringSearchBackend()
+        queryset = backend.filter(Job.objects.all(), 'python').order_by('-search_rank')
+        self.assertEqual(self.ids(queryset), [self.title_match.id, self.body_match.id])
+        self.assertEqual(self.ids(backend.filter(Job.objects.all(), 'python rust')), [])
+        self.assertFalse(backend.filter(Job.objects.all(), '  ').exists())
+
+    def test_search_view_pages_by_rank(self):
+        client = APIClient()
+        first = client.get('/api/v1/jobs/search/', {'q': 'python', 'page_size': 1}).json()
+        self.assertEqual([row['id'] for row in first['results']], [self.title_match.id])
+        second = client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], [self.body_match.id])
+        self.assertIsNone(second['next'])
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.jobs = [make_job(f'Job {i}') for i in range(5)]
+        self.client = APIClient()
+
+    def test_cursor_round_trip(self):
+        seen = []
+        url, params = '/api/v1/jobs/search/', {'page_size': 2}
+        while url:
+            page = self.client.get(url, params).json()
+            seen.extend(row['id'] for row in page['results'])
+            url, params = page['next'], None
+        self.assertEqual(seen, sorted((job.id for job in self.jobs), reverse=True))
+
+    def test_bad_cursors_are_not_found(self):
+        for bad in ('!!!', cursor({'a': 1}), cursor([1]), cursor(['abc', 1]), cursor(['2024-01-01', 'x'])):
+            with self.subTest(cursor=bad):
+                response = self.client.get('/api/v1/jobs/search/', {'cursor': bad})
+                self.assertEqual(response.status_code, 404)
+
+    def test_bad_rank_cursor_is_not_found(self):
+        response = self.client.get('/api/v1/jobs/search/', {'q': 'job', 'cursor': cursor([[1], '2024-01-01', 1])})
+        self.assertEqual(response.status_code, 404)
+
+
+class FieldSelectionTests(TestCase):
+    def setUp(self):
+        self.job = make_job('Python Developer', description='A long description')
+        self.user = User.objects.create(username='poster', email='poster@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lists_leave_out_the_description(self):
+        with CaptureQueriesContext(connection) as queries:
+            row, = self.client.get('/api/v1/jobs/search/').json()['results']
+        self.assertNotIn('description', row)
+        self.assertNotIn('description', queries.captured_queries[0]['sql'])
+        detail = self.client.get(f'/api/v1/jobs/{self.job.id}/').json()
+        self.assertEqual(detail['description'], 'A long description')
+
+    def test_fields_and_omit_trim_reads(self):
+        row, = self.client.get('/api/v1/jobs/', {'fields': 'id,title,location', 'omit': 'location'}).json()['results']
+        self.assertEqual(set(row), {'id', 'title'})
+        detail = self.client.get(f'/api/v1/jobs/{self.job.id}/', {'fields': 'description'}).json()
+        self.assertEqual(detail, {'description': 'A long description'})
+
+    def test_writes_validate_every_field(self):
+        response = self.client.post('/api/v1/jobs/?fields=title', {'title': 'Incomplete'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('company_name', response.json())
+
+
+@mock.patch('apps.jobs.signals.refresh_skill_demand_on_commit')
+class SkillDemandSignalTests(TestCase):
+    def setUp(self):
+        self.skill = Skill.objects.create(name='Python', category='technical')
+        self.job = make_job('Developer')
+        JobSkill.objects.create(job=self.job, skill=self.skill)
+        self.job = Job.objects.get(pk=self.job.pk)
+
+    def test_plain_edit_skips_recount(self, refresh):
+        self.job.title = 'Senior Developer'
+        self.job.save()
+        refresh.assert_not_called()
+
+    def test_activation_change_recounts_job_skills(self, refresh):
+        self.job.is_active = False
+        self.job.save()
+        refresh.assert_called_once()
+        self.assertEqual(list(refresh.call_args.args[0]), [self.skill.id])
+        refresh.reset_mock()
+        self.job.title = 'Still inactive'
+        self.job.save()
+        refresh.assert_not_called()
+
+
+class SkillDictionaryTests(TestCase):
+    def setUp(self):
+        self.python, self.javascript, self.ml = (
+            Skill.objects.create(name=name, category='technical')
+            for name in ('Python', 'JavaScript', 'Machine Learning')
+        )
+        self.java = Skill.objects.create(name='Java', category='technical')
+        SkillAlias.objects.create(alias='js', skill=self.javascript)
+        SkillAlias.objects.create(alias='java', skill=self.javascript)
+        self.dictionary = SkillDictionary.from_db()
+
+    def test_names_and_aliases_resolve(self):
+        self.assertEqual(self.dictionary.lookup('  PYTHON '), self.python.id)
+        self.assertEqual(self.dictionary.lookup('JS'), self.javascript.id)
+        # A skill's own name wins over another skill's alias.
+        self.assertEqual(self.dictionary.lookup('java'), self.java.id)
+        self.assertEqual(self.dictionary.resolve('js, Python,javascript', 'cobol'), [self.javascript.id, self.python.id])
+
+    def test_find_prefers_the_longest_name(self):
+        self.assertEqual(
+            self.dictionary.find('Machine learning with Python (and some JS).'),
+            [self.ml.id, self.python.id, self.javascript.id],
+        )
+
+    def test_token_follows_the_tables(self):
+        self.assertEqual(SkillDictionary.from_db().token, self.dictionary.token)
+        SkillAlias.objects.create(alias='py', skill=self.python)
+        self.assertNotEqual(SkillDictionary.from_db().token, self.dictionary.token)
+
+
+class JobSkillSyncTests(TestCase):
+    def setUp(self):
+        self.python, self.django, self.rust = (
+            Skill.objects.create(name=name, category='technical') for name in ('Python', 'Django', 'Rust')
+        )
+        invalidate_skill_dictionary()
+        self.addCleanup(invalidate_skill_dictionary)
+
+    def rows(self, job):
+        return set(JobSkill.objects.filter(job=job).values_list('skill__name', 'required', 'from_text'))
+
+    def test_saves_sync_rows_from_text(self):
+        job = make_job('Backend', required_skills='Python, Django', tags='rust, unknown')
+        self.assertEqual(self.rows(job), {('Python', True, True), ('Django', True, True), ('Rust', False, True)})
+        JobSkill.objects.create(job=job, skill=Skill.objects.create(name='Go', category='technical'))
+
+        job.required_skills = 'Python, Rust'
+        job.tags = ''
+        job.save()
+        # Rows added by hand are left alone.
+        self.assertEqual(self.rows(job), {('Python', True, True), ('Rust', True, True), ('Go', True, False)})
+
+    def test_backfill_syncs_existing_jobs(self):
+        job = make_job('Backend', required_skills='Python, Django')
+        JobSkill.objects.all().delete()
+        Job.objects.filter(pk=job.pk).update(tags='Rust')
+        self.assertEqual(backfill_job_skills(batch_size=1), (1, 3))
+        self.assertEqual(self.rows(job), {('Python', True, True), ('Django', True, True), ('Rust', False, True)})
+        self.assertEqual(
+            dict(SkillDemand.objects.values_list('skill__name', 'required_jobs')),
+            {'Python': 1, 'Django': 1, 'Rust': 0},
+        )
+        self.assertEqual(backfill_job_skills(), (0, 0))
+
+
+class JobSkillDeduplicationMigrationTests(TransactionTestCase):
+    before = [('jobs', '0004_skilldemand')]
+    after = [('jobs', '0005_jobskill_from_text')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_merges_duplicates_keeping_required(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+        job = old_apps.get_model('jobs', 'Job').objects.create(
+            title='Developer', company_name='Acme', description='', location='Remote', employment_type='full_time',
+        )
+        skill = old_apps.get_model('authentication', 'Skill').objects.create(name='Python', category='technical')
+        JobSkill = old_apps.get_model('jobs', 'JobSkill')
+        first = JobSkill.objects.create(job=job, skill=skill, required=False)
+        JobSkill.objects.create(job=job, skill=skill, required=True)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        JobSkill = executor.loader.project_state(self.after).apps.get_model('jobs', 'JobSkill')
+        self.assertEqual(list(JobSkill.objects.values_list('id', 'required')), [(first.id, True)])
@@ -1,13 +1,51 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
-from rest_framework import viewsets
+from rest_framework import generics, viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.settings import api_settings
+from apps.common.pagination import KeysetPagination
+from apps.common.renderers import NDJSONRenderer
+from apps.common.serializers import selected_fields
 from .models import Job, JobSkill, Company
-from .serializers import JobSerializer, JobSkillSerializer, CompanySerializer
+from .serializers import JobSerializer, JobListSerializer, JobSkillSerializer, CompanySerializer
+from .search import get_search_backend
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
 # Create your views here.
 
+def search_jobs(queryset, params):
+    """Apply the ``q``, ``title``, ``company`` and ``location`` query parameters"""
+    query = params.get('q', None)
+    title = params.get('title', None)
+    company = params.get('company', None)
+    location = params.get('location', None)
+
+    # Keyword terms go through the full-text index; when both are given,
+    # ``q`` is the one whose relevance is kept in ``search_rank``.
+    backend = get_search_backend()
+    if title:
+        queryset = backend.filter(queryset, title, fields=['title'], rank=not query)
+    if query:
+        queryset = backend.filter(queryset, query)
+    if company:
+        queryset = queryset.filter(company_name__icontains=company)
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+
+    if query or title:
+        queryset = queryset.order_by('-search_rank', '-date_posted')
+    return queryset
+
+def only_list_columns(queryset, request):
+    """Load just the columns ``JobListSerializer`` will render (never ``description``)"""
+    fields = selected_fields(request, JobListSerializer.Meta.fields)
+    # ``id`` and ``date_posted`` back the default ordering and keyset cursors.
+    return queryset.only('id', 'date_posted', *fields)
+
 class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
@@ -19,19 +57,16 @@ class JobViewSet(viewsets.ModelViewSet):
         queryset = queryset.filter(is_active=True)
         
         # Add filters for search
-        title = self.request.query_params.get('title', None)
-        company = self.request.query_params.get('company', None)
-        location = self.request.query_params.get('location', None)
-        
-        if title:
-            queryset = queryset.filter(title__icontains=title)
-        if company:
-            queryset = queryset.filter(company_name__icontains=company)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-            
+        queryset = search_jobs(queryset, self.request.query_params)
+        if self.action == 'list':
+            queryset = only_list_columns(queryset, self.request)
         return queryset
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return JobListSerializer
+        return JobSerializer
+
 class JobSkillViewSet(viewsets.ModelViewSet):
     queryset = JobSkill.objects.all()
     serializer_class = JobSkillSerializer
@@ -42,19 +77,41 @@ class CompanyViewSet(viewsets.ModelViewSet):
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticated]
 
-class JobSearchView(APIView):
+class JobSearchView(generics.ListAPIView):
+    """
+    Public job search, served in keyset-paginated pages.
+
+    Authenticated bulk consumers can instead ask for every match as
+    newline-delimited JSON (``?format=ndjson`` or ``Accept:
+    application/x-ndjson``), streamed from a chunked database iterator so
+    memory stays flat however many jobs match.
+    """
+    serializer_class = JobListSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+    filter_backends = []
+    stream_chunk_size = 500
+
+    def get_queryset(self):
+        queryset = search_jobs(Job.objects.filter(is_active=True), self.request.query_params)
+        return only_list_columns(queryset, self.request)
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, NDJSONRenderer):
+            return super().list(request, *args, **kwargs)
+        if not request.user.is_authenticated:
+            self.permission_denied(request, message='Streaming search results requires authentication.')
+
+        queryset = self.get_queryset()
+        if not queryset.ordered:
+            queryset = queryset.order_by(*KeysetPagination.ordering)
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+
+        def rows():
+            for job in queryset.iterator(chunk_size=self.stream_chunk_size):
+                data = serializer_class(job, context=context).data
+                yield json.dumps(data, cls=DjangoJSONEncoder) + '\n'
 
-    def get(self, request):
-        queryset = Job.objects.filter(is_active=True)
-        title = request.query_params.get('title')
-        location = request.query_params.get('location')
-        company = request.query_params.get('company')
-        if title:
-            queryset = queryset.filter(title__icontains=title)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        if company:
-            queryset = queryset.filter(company_name__icontains=company)
-        serializer = JobSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return StreamingHttpResponse(rows(), content_type=NDJSONRenderer.media_type)
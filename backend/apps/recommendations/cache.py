@@ -0,0 +1,76 @@
+"""
+Per-user cache of recommendation list responses.
+
+Every cached page is keyed by the user's current cache version, so
+invalidating a user is a single write of a fresh version token; pages cached
+under the old token are never read again and age out through the cache's TTL
+and size-bounded eviction.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_cache():
+    return caches[settings.RECOMMENDATION_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'user:{user_id}:version'
+
+
+def _user_version(cache, user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        # A concurrent request may have created the version first; use theirs.
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def list_key(cache, user_id, params):
+    query = '&'.join(f'{k}={v}' for k, v in sorted(params.lists()))
+    digest = hashlib.md5(query.encode('utf-8')).hexdigest()
+    return f'user:{user_id}:{_user_version(cache, user_id)}:list:{digest}'
+
+
+def get_list(user_id, params):
+    cache = get_cache()
+    return cache.get(list_key(cache, user_id, params))
+
+
+def set_list(user_id, params, data):
+    cache = get_cache()
+    cache.set(list_key(cache, user_id, params), _plain(data))
+
+
+def invalidate_users(user_ids):
+    """Drop every cached page of ``user_ids`` once the current transaction commits"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    def invalidate():
+        get_cache().set_many(
+            {_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout=None
+        )
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_user(user_id):
+    invalidate_users([user_id])
+
+
+def _plain(data):
+    """Copy serializer output into plain dicts/lists so it pickles without the serializer"""
+    if isinstance(data, dict):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_plain(value) for value in data]
+    return data
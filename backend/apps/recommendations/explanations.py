@@ -0,0 +1,145 @@
+"""
+Structured recommendation explanations.
+
+Explanations are built while materialization scores a batch, from the same
+engine matrices that produced the score, and stored as JSON in
+``Recommendation.reason``; serving one is a lookup, never a re-score.
+"""
+import json
+import re
+from decimal import Decimal, InvalidOperation
+
+from apps.authentication.models import Skill, User
+from apps.jobs.models import Job
+
+EXPLANATION_VERSION = 1
+
+# Seniority inferred from job titles; jobs carry no explicit level.
+LEVELS = {'entry': 0, 'mid': 1, 'senior': 2, 'executive': 3}
+TITLE_LEVELS = {
+    'intern': 0, 'internship': 0, 'junior': 0, 'jr': 0, 'graduate': 0, 'entry': 0, 'trainee': 0,
+    'mid': 1, 'intermediate': 1,
+    'senior': 2, 'sr': 2, 'lead': 2,
+    'principal': 3, 'staff': 3, 'head': 3, 'director': 3, 'vp': 3, 'chief': 3,
+}
+WORD_RE = re.compile(r'[a-z]+')
+
+
+def title_level(title):
+    levels = [TITLE_LEVELS[w] for w in WORD_RE.findall((title or '').lower()) if w in TITLE_LEVELS]
+    return max(levels) if levels else None
+
+
+def experience_fit(user_level, title):
+    user = LEVELS.get(user_level)
+    job = title_level(title)
+    if user is None or job is None:
+        return 'unknown'
+    if user == job:
+        return 'match'
+    return 'overqualified' if user > job else 'underqualified'
+
+
+def _places(location):
+    return {part.strip() for part in (location or '').lower().split(',') if part.strip()}
+
+
+def location_fit(user_location, job_location):
+    job = _places(job_location)
+    if any('remote' in place for place in job):
+        return 'remote'
+    user = _places(user_location)
+    if not user or not job:
+        return 'unknown'
+    return 'match' if user & job else 'mismatch'
+
+
+def desired_salary(profile_details):
+    value = (profile_details or {}).get('desired_salary')
+    try:
+        return Decimal(str(value)) if value not in (None, '') else None
+    except InvalidOperation:
+        return None
+
+
+def salary_fit(desired, salary_min, salary_max):
+    if desired is None or (salary_min is None and salary_max is None):
+        return 'unknown'
+    if salary_max is not None and desired > salary_max:
+        return 'below_expectation'
+    if salary_min is not None and desired < salary_min:
+        return 'above_expectation'
+    return 'within_range'
+
+
+class ExplanationBuilder:
+    """Builds explanation JSON for the scored pairs of one materialization pass"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.skill_names = dict(Skill.objects.values_list('id', 'name'))
+
+    def build(self, user_ids, user_matrix, results):
+        """
+        ``results`` maps user id to ``(job_id, score)`` pairs; ``user_ids`` lists
+        the rows of ``user_matrix``. Returns ``{(user_id, job_id): json}``,
+        leaving out pairs whose user or job no longer exists.
+        """
+        users = {
+            u['id']: u for u in User.objects.filter(id__in=user_ids)
+            .values('id', 'location', 'experience_level', 'profile_details')
+        }
+        job_ids = {job_id for pairs in results.values() for job_id, _ in pairs}
+        jobs = {
+            j['id']: j for j in Job.objects.filter(id__in=job_ids)
+            .values('id', 'title', 'location', 'salary_min', 'salary_max')
+        }
+
+        pairs = [
+            (row, user_id, job_id, score)
+            for row, user_id in enumerate(user_ids)
+            for job_id, score in results.get(user_id, ())
+        ]
+        indptr, skill_ids, required, matched = self.engine.skill_overlaps(
+            user_matrix, [p[0] for p in pairs], [p[2] for p in pairs]
+        )
+        skill_ids, required, matched = skill_ids.tolist(), required.tolist(), matched.tolist()
+
+        reasons = {}
+        for i, (row, user_id, job_id, score) in enumerate(pairs):
+            # Users and jobs deleted since the engine was built get no explanation.
+            user, job = users.get(user_id), jobs.get(job_id)
+            if user is None or job is None:
+                continue
+            entries = range(indptr[i], indptr[i + 1])
+            reasons[(user_id, job_id)] = json.dumps({
+                'version': EXPLANATION_VERSION,
+                'score': round(score, 4),
+                'matched_skills': self.skills(skill_ids, required, [e for e in entries if matched[e]]),
+                'missing_skills': self.skills(skill_ids, required, [e for e in entries if not matched[e]]),
+                'experience_fit': experience_fit(user['experience_level'], job['title']),
+                'location_fit': location_fit(user['location'], job['location']),
+                'salary_fit': salary_fit(
+                    desired_salary(user['profile_details']), job['salary_min'], job['salary_max']
+                ),
+            })
+        return reasons
+
+    def skills(self, skill_ids, required, entries):
+        # Required skills first, then by id.
+        entries = sorted(entries, key=lambda e: (not required[e], skill_ids[e]))
+        return [
+            {'id': skill_ids[e], 'name': self.skill_names.get(skill_ids[e], ''), 'required': required[e]}
+            for e in entries
+        ]
+
+
+def parse_reason(reason):
+    """Decode a stored ``Recommendation.reason``; free-text reasons become a summary"""
+    if not reason:
+        return None
+    try:
+        explanation = json.loads(reason)
+    except ValueError:
+        return {'summary': reason}
+    return explanation if isinstance(explanation, dict) else {'summary': reason}
@@ -0,0 +1,146 @@
+"""
+Buffered ingestion of recommendation feedback.
+
+The frontend sends many small feedback events, so accepted events are held
+in a per-process buffer and written with one ``bulk_create`` when the buffer
+fills up, when the oldest event has waited ``RECOMMENDATION_FEEDBACK_FLUSH_INTERVAL``
+seconds, or when the process exits. Events pointing at rows deleted while
+they waited are repaired or dropped one by one, never with their batch.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from apps.analytics import metrics
+from apps.authentication.models import User
+from apps.jobs.models import Job
+
+from .models import Recommendation, RecommendationFeedback
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackBuffer:
+    def __init__(self, max_size, flush_interval):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._events = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, events):
+        """Queue unsaved ``RecommendationFeedback`` instances for writing"""
+        with self._lock:
+            self._events.extend(events)
+            full = len(self._events) >= self.max_size
+            if not full and self._timer is None and self._events:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered event; returns the number written"""
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+        try:
+            return write_feedback(events)
+        except Exception:
+            logger.exception("Dropped %d recommendation feedback events", len(events))
+            return 0
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread got its own connection; don't leak it.
+            connection.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = FeedbackBuffer(
+                settings.RECOMMENDATION_FEEDBACK_BUFFER_SIZE,
+                settings.RECOMMENDATION_FEEDBACK_FLUSH_INTERVAL,
+            )
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def resolve_references(events):
+    """
+    Unlink events from recommendations that have since been replaced (the
+    event keeps its user and job) and drop events whose user or job is gone.
+    """
+    def existing(model, ids):
+        return set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+
+    recommendations = existing(Recommendation, {e.recommendation_id for e in events if e.recommendation_id})
+    users = existing(User, {e.user_id for e in events})
+    jobs = existing(Job, {e.job_id for e in events})
+    kept = []
+    for event in events:
+        if event.user_id not in users or event.job_id not in jobs:
+            continue
+        if event.recommendation_id not in recommendations:
+            event.recommendation_id = None
+        kept.append(event)
+    if len(kept) < len(events):
+        logger.warning("Dropped %d feedback events for deleted users or jobs", len(events) - len(kept))
+    return kept
+
+
+def _write_each(events):
+    written = []
+    for event in events:
+        event.pk = None
+        event._state.adding = True
+        try:
+            with transaction.atomic():
+                event.save()
+        except IntegrityError:
+            logger.warning("Dropped feedback event %r for a deleted row", event.event)
+        else:
+            written.append(event)
+    return written
+
+
+def write_feedback(events):
+    """Write ``events``; returns how many were written"""
+    events = resolve_references(events)
+    try:
+        with transaction.atomic():
+            RecommendationFeedback.objects.bulk_create(events, batch_size=500)
+    except IntegrityError:
+        # Something was deleted after the references were resolved.
+        events = _write_each(events)
+    metrics.record(
+        (metrics.RECOMMENDATION_FEEDBACK, event.event, 1, event.created_at) for event in events
+    )
+    return len(events)
+
+
+def record_feedback(events):
+    """Write ``events`` now when buffering is disabled, otherwise buffer them"""
+    if settings.RECOMMENDATION_FEEDBACK_BUFFER_SIZE <= 0:
+        write_feedback(events)
+        return
+    get_buffer().add(events)
@@ -0,0 +1,87 @@
+import statistics
+import time
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+
+from apps.authentication.models import User
+from apps.jobs.models import Job
+from apps.recommendations.models import Recommendation
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure top-N recommendation list latency against the number of rows per user. "
+        "Synthetic rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                            help="Recommendation rows per user to measure")
+        parser.add_argument('--users', type=int, default=20, help="Users at each size")
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=50, help="Timed reads per size")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        max_rows = max(options['rows'])
+        jobs = Job.objects.bulk_create(
+            [
+                Job(title=f'Benchmark job {i}', company_name='Benchmark', description='',
+                    location='', tags='', required_skills='', employment_type='full_time')
+                for i in range(max_rows)
+            ],
+            batch_size=1000,
+        )
+        job_ids = [job.id for job in jobs]
+
+        self.stdout.write(f"{'rows/user':>10} {'median ms':>10} {'p95 ms':>10}  plan")
+        for rows in options['rows']:
+            users = User.objects.bulk_create([
+                User(username=f'benchmark-{rows}-{i}', email=f'benchmark-{rows}-{i}@example.com')
+                for i in range(options['users'])
+            ])
+            Recommendation.objects.bulk_create(
+                [
+                    Recommendation(user=user, job_id=job_id, score=((job_id * 7919) % 1000) / 1000)
+                    for user in users
+                    for job_id in job_ids[:rows]
+                ],
+                batch_size=1000,
+            )
+
+            timings = []
+            for i in range(options['repeat']):
+                queryset = (
+                    Recommendation.objects.filter(user=users[i % len(users)])
+                    .order_by('-score')[:options['page_size']]
+                )
+                start = time.perf_counter()
+                list(queryset)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{rows:>10} {statistics.median(timings):>10.3f} {p95:>10.3f}  {self.plan(queryset)}"
+            )
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return '; '.join(row[-1] for row in cursor.fetchall())
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return ' '.join(row[0].strip() for row in cursor.fetchall())
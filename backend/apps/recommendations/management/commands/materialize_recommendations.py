@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.recommendations.materialization import materialize, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = "Materialize the top-K recommendations of users whose profile or candidate jobs changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every user")
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="Recompute only this user (repeatable)")
+        parser.add_argument('--top-k', type=int, help="Recommendations kept per user")
+        parser.add_argument('--batch-size', type=int, help="Users scored per batch")
+
+    def handle(self, *args, **options):
+        if options['user_ids']:
+            users, rows = materialize(
+                options['user_ids'], top_k=options['top_k'], batch_size=options['batch_size']
+            )
+        else:
+            run = refresh_recommendations(
+                full=options['full'], top_k=options['top_k'], batch_size=options['batch_size']
+            )
+            users, rows = run.users_refreshed, run.recommendations_written
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {users} users ({rows} recommendations)"))
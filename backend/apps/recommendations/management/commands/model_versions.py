@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ml.artifacts import ArtifactNotFound, get_artifact_store
+from ml.training import RANKER_ARTIFACT
+
+
+class Command(BaseCommand):
+    help = "List the stored versions of a model artifact or switch the active one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=RANKER_ARTIFACT, help="Artifact name")
+        parser.add_argument('--activate', metavar='VERSION',
+                            help="Make VERSION the active version (workers pick it up without a restart)")
+
+    def handle(self, *args, **options):
+        store = get_artifact_store(options['model'])
+        if options['activate']:
+            try:
+                store.activate(options['activate'])
+            except ArtifactNotFound as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"Activated {store.name} {options['activate']}"))
+            return
+
+        active = store.active_version()
+        for version in store.versions():
+            marker = '*' if version == active else ' '
+            self.stdout.write(f"{marker} {version}")
@@ -0,0 +1,178 @@
+"""
+Materializes the top-K ``Recommendation`` rows per user.
+
+Only users whose inputs changed since the last finished run are recomputed:
+profile rows (``UserSkill``, ``WorkExperience``, ``Education``) are tracked
+through their ``updated_at`` columns, and jobs through ``Job.updated_at``,
+which also moves when a job is added or deactivated. Each batch of users is
+scored only against the jobs ``ml.skill_index`` lists for their skills, and
+once a ranking model has been trained the best skill matches are reordered
+by its predicted application probability.
+"""
+import logging
+
+import numpy as np
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics import metrics
+from apps.authentication.models import User, UserSkill, Education, WorkExperience
+from apps.common.events import publish_many
+from apps.jobs.models import Job, JobSkill
+from ml.recommendation import SkillMatchEngine
+from ml.skill_index import get_skill_index
+from ml.training import active_ranker
+
+from . import cache
+from .explanations import ExplanationBuilder
+from .models import Recommendation, RecommendationRun
+
+logger = logging.getLogger(__name__)
+
+
+def changed_user_ids(since):
+    """Users whose profile inputs changed after ``since``"""
+    user_ids = set(User.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+    for model in (UserSkill, WorkExperience, Education):
+        user_ids.update(
+            model.objects.filter(updated_at__gt=since).values_list('user_id', flat=True)
+        )
+    return user_ids
+
+
+def users_affected_by_jobs(since):
+    """Users who may gain or lose a candidate because a job changed after ``since``"""
+    job_ids = Job.objects.filter(updated_at__gt=since).values('id')
+    skill_ids = JobSkill.objects.filter(job_id__in=job_ids).values('skill_id')
+    user_ids = set(
+        UserSkill.objects.filter(skill_id__in=skill_ids).values_list('user_id', flat=True)
+    )
+    user_ids.update(
+        Recommendation.objects.filter(job_id__in=job_ids).values_list('user_id', flat=True)
+    )
+    return user_ids
+
+
+def users_to_refresh(since):
+    """All users whose materialized recommendations may be stale since ``since``"""
+    return changed_user_ids(since) | users_affected_by_jobs(since)
+
+
+def write_recommendations(user_ids, results, reasons=None):
+    """
+    Replace the recommendations of ``user_ids`` with ``results``.
+
+    ``results`` maps user id to a list of ``(job_id, score)`` pairs and
+    ``reasons`` optionally maps ``(user_id, job_id)`` to the explanation
+    stored in ``reason``. Rows are upserted on the unique ``(user, job)``
+    pair and everything else the users had is deleted.
+    """
+    reasons = reasons or {}
+    now = timezone.now()
+    rows = [
+        Recommendation(
+            user_id=user_id, job_id=job_id, score=score,
+            reason=reasons.get((user_id, job_id)), date_generated=now,
+        )
+        for user_id in user_ids
+        for job_id, score in results.get(user_id, ())
+    ]
+    keep = {(rec.user_id, rec.job_id) for rec in rows}
+    existing = set()
+    stale_ids = []
+    for rec_id, user_id, job_id in Recommendation.objects.filter(user_id__in=user_ids).values_list(
+        'id', 'user_id', 'job_id'
+    ):
+        if (user_id, job_id) in keep:
+            existing.add((user_id, job_id))
+        else:
+            stale_ids.append(rec_id)
+    # ``bulk_create`` sends no signals, so new pairs are counted here.
+    inserted = len(keep - existing)
+
+    with transaction.atomic():
+        if stale_ids:
+            Recommendation.objects.filter(id__in=stale_ids).delete()
+        Recommendation.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['user', 'job'],
+            update_fields=['score', 'reason', 'date_generated'],
+        )
+        cache.invalidate_users(user_ids)
+        metrics.record([
+            (metrics.RECOMMENDATIONS, '', inserted, None),
+            (metrics.RECOMMENDATIONS_GENERATED, '', inserted, now),
+        ])
+        publish_many(
+            (user_id, 'recommendations', {'count': len(results.get(user_id, ())), 'generated_at': now})
+            for user_id in user_ids
+        )
+    return len(rows)
+
+
+def materialize(user_ids, engine=None, index=None, top_k=None, batch_size=None):
+    """
+    Score ``user_ids`` against the candidates from ``index`` and write their
+    top-K rows with explanations; returns ``(users, rows)``.
+    """
+    engine = engine or SkillMatchEngine.from_db()
+    # Caught up now so jobs posted since the last sync are candidates.
+    index = index or get_skill_index(max_age=0)
+    top_k = top_k or settings.RECOMMENDATION_TOP_K
+    batch_size = batch_size or settings.RECOMMENDATION_BATCH_SIZE
+    user_ids = sorted(user_ids)
+    ranker = active_ranker(settings.ML_ARTIFACT_ROOT)
+    pool = top_k * settings.RECOMMENDATION_RERANK_POOL if ranker is not None else top_k
+
+    explainer = ExplanationBuilder(engine)
+    written = 0
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        matrix = engine.load_users(batch)
+        candidates = index.candidates(engine.skill_ids[np.unique(matrix.indices)].tolist())
+        ranked = list(engine.top_n_for_matrix(matrix, pool, candidates=candidates))
+        if ranker is not None:
+            ranked = ranker.rerank(engine, matrix, ranked, top_k)
+        results = dict(zip(batch, ranked))
+        reasons = explainer.build(batch, matrix, results)
+        # Pairs left unexplained point at a user or job deleted mid-pass.
+        results = {
+            user_id: [(job_id, score) for job_id, score in pairs if (user_id, job_id) in reasons]
+            for user_id, pairs in results.items()
+        }
+        written += write_recommendations(batch, results, reasons)
+    return len(user_ids), written
+
+
+def refresh_recommendations(full=False, top_k=None, batch_size=None):
+    """
+    Run one materialization pass and record it as a ``RecommendationRun``.
+
+    The pass covers every user when ``full`` is set or no run has finished
+    yet, and only users changed since the last finished run otherwise.
+    """
+    last_run = RecommendationRun.objects.filter(finished_at__isnull=False).first()
+    run = RecommendationRun.objects.create(
+        started_at=timezone.now(),
+        full_refresh=full or last_run is None,
+    )
+
+    if run.full_refresh:
+        user_ids = User.objects.values_list('id', flat=True)
+    else:
+        user_ids = users_to_refresh(last_run.started_at)
+
+    run.users_refreshed, run.recommendations_written = materialize(
+        user_ids, top_k=top_k, batch_size=batch_size
+    )
+    run.finished_at = timezone.now()
+    run.save(update_fields=['users_refreshed', 'recommendations_written', 'finished_at'])
+    logger.info(
+        "Refreshed recommendations for %d users (%d rows) in %s",
+        run.users_refreshed, run.recommendations_written, run.finished_at - run.started_at,
+    )
+    return run
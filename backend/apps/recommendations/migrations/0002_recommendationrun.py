@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recommendations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecommendationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("full_refresh", models.BooleanField(default=False)),
+                ("users_refreshed", models.IntegerField(default=0)),
+                ("recommendations_written", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["finished_at"], name="recommendat_finishe_9321b6_idx"
+                    )
+                ],
+            },
+        ),
+    ]
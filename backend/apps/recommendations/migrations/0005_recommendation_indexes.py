@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 00:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def delete_duplicate_recommendations(apps, schema_editor):
+    """Keep the newest row of each (user, job) pair"""
+    Recommendation = apps.get_model("recommendations", "Recommendation")
+    duplicates = (
+        Recommendation.objects.values("user_id", "job_id")
+        .annotate(rows=Count("id"), keep=Max("id"))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        Recommendation.objects.filter(
+            user_id=dup["user_id"], job_id=dup["job_id"]
+        ).exclude(id=dup["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0004_skilldemand"),
+        ("recommendations", "0004_recommendationfeedback"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recommendation",
+            index=models.Index(fields=["user", "-score"], name="rec_user_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recommendation",
+            index=models.Index(
+                fields=["user", "date_generated"], name="rec_user_generated_idx"
+            ),
+        ),
+        migrations.RunPython(
+            delete_duplicate_recommendations, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="recommendation",
+            constraint=models.UniqueConstraint(
+                fields=("user", "job"), name="unique_user_job_recommendation"
+            ),
+        ),
+    ]
@@ -1,4 +1,9 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from apps.authentication.models import User
 from apps.jobs.models import Job
 
@@ -8,3 +13,127 @@ class Recommendation(models.Model):
     score = models.FloatField()
     reason = models.TextField(blank=True, null=True)
     date_generated = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-score'], name='rec_user_score_idx'),
+            models.Index(fields=['user', 'date_generated'], name='rec_user_generated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'job'], name='unique_user_job_recommendation'),
+        ]
+
+class RecommendationRun(models.Model):
+    """A materialization pass over the ``Recommendation`` table"""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    full_refresh = models.BooleanField(default=False)
+    users_refreshed = models.IntegerField(default=0)
+    recommendations_written = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['finished_at']),
+        ]
+
+    def __str__(self):
+        return f"Recommendation run at {self.started_at}"
+
+class RecommendationFeedback(models.Model):
+    """
+    A user interaction with a served recommendation.
+
+    ``user`` and ``job`` are copied from the recommendation so feedback
+    survives the recommendation being replaced by a later materialization.
+    """
+    EVENT_CLICK = 'click'
+    EVENT_DISMISS = 'dismiss'
+    EVENT_SAVE = 'save'
+    EVENT_APPLY = 'apply'
+
+    recommendation = models.ForeignKey(
+        Recommendation, on_delete=models.SET_NULL, null=True, blank=True, related_name='feedback'
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE)
+    event = models.CharField(
+        max_length=10,
+        choices=[
+            (EVENT_CLICK, 'Click'),
+            (EVENT_DISMISS, 'Dismiss'),
+            (EVENT_SAVE, 'Save'),
+            (EVENT_APPLY, 'Apply'),
+        ]
+    )
+    score = models.FloatField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['job', 'event']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.event} {self.job}"
+
+class ModelTrainingRun(models.Model):
+    """A ranking-model retraining job executed on a Celery worker"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    model_name = models.CharField(max_length=50, default='ranker')
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (STATUS_QUEUED, 'Queued'),
+            (STATUS_RUNNING, 'Running'),
+            (STATUS_SUCCEEDED, 'Succeeded'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_QUEUED
+    )
+    progress = models.FloatField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    model_version = models.CharField(max_length=50, blank=True)
+    metrics = models.JSONField(default=dict, blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one queued or running job per model: concurrent retrain
+            # requests collapse onto it.
+            models.UniqueConstraint(
+                fields=['model_name'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_training_run',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} training {self.id} ({self.status})"
+
+    @classmethod
+    def fail_stale(cls, model_name='ranker'):
+        """
+        Fail active runs older than ``MODEL_TRAINING_TIMEOUT`` -- lost with a
+        dead worker or a dropped message -- so they stop blocking new ones.
+        Returns how many were failed.
+        """
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=settings.MODEL_TRAINING_TIMEOUT)
+        return cls.objects.filter(
+            models.Q(started_at__lt=cutoff) | models.Q(started_at__isnull=True, created_at__lt=cutoff),
+            model_name=model_name,
+            status__in=cls.ACTIVE_STATUSES,
+        ).update(status=cls.STATUS_FAILED, message='Timed out', finished_at=now)
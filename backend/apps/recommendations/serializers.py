@@ -1,8 +1,21 @@
 from rest_framework import serializers
-from .models import Recommendation
+from .models import Recommendation, RecommendationFeedback, ModelTrainingRun
 
 class RecommendationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recommendation
         fields = '__all__'
-        read_only_fields = ('date_generated',)
\ No newline at end of file
+        read_only_fields = ('date_generated',)
+class ModelTrainingRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ModelTrainingRun
+        fields = (
+            'id', 'model_name', 'status', 'progress', 'message', 'model_version',
+            'metrics', 'created_at', 'started_at', 'finished_at',
+        )
+        read_only_fields = fields
+class FeedbackEventSerializer(serializers.Serializer):
+    # A plain id: the view resolves a whole batch of them in one query.
+    recommendation = serializers.IntegerField(min_value=1)
+    event = serializers.ChoiceField(choices=RecommendationFeedback._meta.get_field('event').choices)
+    occurred_at = serializers.DateTimeField(required=False)
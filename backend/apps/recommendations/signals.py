@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.authentication.models import UserSkill, Education, WorkExperience
+from apps.jobs.models import Job
+
+from . import cache
+from .models import Recommendation
+
+
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+@receiver(post_save, sender=Education)
+@receiver(post_delete, sender=Education)
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_delete, sender=WorkExperience)
+@receiver(post_save, sender=Recommendation)
+@receiver(post_delete, sender=Recommendation)
+def invalidate_owner(sender, instance, **kwargs):
+    cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Job)
+def invalidate_job_audience(sender, instance, **kwargs):
+    """Edits and ``is_active`` flips reach every user the job is recommended to"""
+    cache.invalidate_users(
+        Recommendation.objects.filter(job_id=instance.pk).values_list('user_id', flat=True)
+    )
@@ -0,0 +1,118 @@
+"""
+Skill-gap analysis.
+
+Compares a user's skill vector with the skill demand of their target jobs
+(explicitly chosen, or their top recommendations). Demand is aggregated
+with ``numpy.bincount`` over the target jobs' ``JobSkill`` rows, falling
+back to the precomputed market-wide ``SkillDemand`` counts for users with
+no target jobs, so no request walks jobs one by one in Python.
+"""
+import numpy as np
+from django.conf import settings
+
+from apps.authentication.models import Skill, UserSkill
+from apps.jobs.models import Job, JobSkill, SkillDemand
+from ml.recommendation import OPTIONAL_SKILL_WEIGHT, REQUIRED_SKILL_WEIGHT, id_positions, proficiency_weight
+
+from .models import Recommendation
+
+DEFAULT_LIMIT = 20
+
+
+def target_job_ids(user, job_ids=None):
+    """``job_ids`` restricted to active jobs, or the user's top recommendations"""
+    if job_ids:
+        return list(Job.objects.filter(id__in=job_ids, is_active=True).values_list('id', flat=True))
+    return list(
+        Recommendation.objects.filter(user=user, job__is_active=True)
+        .order_by('-score')
+        .values_list('job_id', flat=True)[:settings.RECOMMENDATION_GAP_JOBS]
+    )
+
+
+def job_demand(job_ids):
+    """
+    Demand of ``job_ids`` as arrays ``(skill_ids, weight, required_jobs)``:
+    the summed required/optional weight and the number of jobs requiring
+    each skill.
+    """
+    rows = np.array(
+        list(JobSkill.objects.filter(job_id__in=job_ids).values_list('skill_id', 'required')),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    skill_ids, inverse = np.unique(rows[:, 0], return_inverse=True)
+    required = rows[:, 1].astype(bool)
+    weight = np.bincount(
+        inverse, weights=np.where(required, REQUIRED_SKILL_WEIGHT, OPTIONAL_SKILL_WEIGHT),
+        minlength=len(skill_ids),
+    )
+    required_jobs = np.bincount(inverse, weights=required, minlength=len(skill_ids))
+    return skill_ids, weight, required_jobs
+
+
+def market_demand():
+    """Market-wide demand in the same shape as :func:`job_demand`"""
+    rows = np.array(
+        list(SkillDemand.objects.order_by('skill_id').values_list('skill_id', 'required_jobs', 'optional_jobs')),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    weight = rows[:, 1] * REQUIRED_SKILL_WEIGHT + rows[:, 2] * OPTIONAL_SKILL_WEIGHT
+    return rows[:, 0], weight, rows[:, 1].astype(np.float64)
+
+
+def user_levels(user, skill_ids):
+    """The user's proficiency weight (0 when missing) for each of ``skill_ids``"""
+    rows = list(
+        UserSkill.objects.filter(user=user, skill_id__in=skill_ids.tolist())
+        .values_list('skill_id', 'proficiency_level', 'years_of_experience')
+    )
+    levels = np.zeros(len(skill_ids))
+    if rows:
+        positions, found = id_positions(skill_ids, [r[0] for r in rows])
+        weights = proficiency_weight([r[1] for r in rows], [float(r[2] or 0) for r in rows])
+        # Several rows for one skill: keep the strongest.
+        np.maximum.at(levels, positions[found], weights[found])
+    return levels
+
+
+def skill_gaps(user, job_ids=None, limit=DEFAULT_LIMIT):
+    """
+    Rank the skills the user is missing or weak in.
+
+    A skill's gap is its share of the target jobs' skill demand times how far
+    the user is from full proficiency in it.
+    """
+    targets = target_job_ids(user, job_ids)
+    if targets:
+        skill_ids, weight, required_jobs = job_demand(targets)
+        job_count = len(targets)
+    else:
+        skill_ids, weight, required_jobs = market_demand()
+        job_count = Job.objects.filter(is_active=True).count()
+
+    levels = user_levels(user, skill_ids)
+    demand = weight / max(job_count, 1)
+    gap = demand * (1.0 - levels)
+
+    candidates = np.flatnonzero(gap > 0)
+    order = candidates[np.lexsort((skill_ids[candidates], -required_jobs[candidates], -gap[candidates]))]
+    order = order[:limit]
+
+    skills = Skill.objects.in_bulk(skill_ids[order].tolist())
+    return {
+        'basis': ('target_jobs' if job_ids else 'recommendations') if targets else 'market',
+        'jobs_analyzed': job_count,
+        'gaps': [
+            {
+                'skill_id': int(skill_ids[i]),
+                'skill': skills[skill_ids[i]].name,
+                'category': skills[skill_ids[i]].category,
+                'required_by': int(required_jobs[i]),
+                'demand': round(float(demand[i]), 4),
+                'current_level': round(float(levels[i]), 4),
+                'gap': round(float(gap[i]), 4),
+            }
+            for i in order
+            if skill_ids[i] in skills
+        ],
+    }
@@ -0,0 +1,54 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from ml.training import train_ranker
+
+from .materialization import refresh_recommendations as run_refresh
+from .models import ModelTrainingRun
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def refresh_recommendations(full=False):
+    """Periodic incremental refresh of the materialized recommendations"""
+    run = run_refresh(full=full)
+    return run.id
+
+
+@shared_task(ignore_result=True, time_limit=settings.MODEL_TRAINING_TIMEOUT)
+def train_ranking_model(run_id):
+    """Train the ranking model for a queued ``ModelTrainingRun``"""
+    started = ModelTrainingRun.objects.filter(
+        pk=run_id, status=ModelTrainingRun.STATUS_QUEUED
+    ).update(status=ModelTrainingRun.STATUS_RUNNING, started_at=timezone.now())
+    if not started:
+        # Already picked up, or failed as stale while it waited in the queue.
+        logger.warning("Training run %s is no longer queued; skipping", run_id)
+        return
+    run = ModelTrainingRun.objects.get(pk=run_id)
+
+    def progress(fraction, message):
+        ModelTrainingRun.objects.filter(pk=run_id).update(progress=fraction, message=message)
+
+    try:
+        version, metrics = train_ranker(
+            settings.ML_ARTIFACT_ROOT, progress=progress,
+            keep_versions=settings.ML_ARTIFACT_KEEP_VERSIONS,
+            holdout=settings.MODEL_TRAINING_HOLDOUT,
+        )
+    except Exception as exc:
+        logger.exception("Training run %s failed", run_id)
+        run.status = ModelTrainingRun.STATUS_FAILED
+        run.message = str(exc)[:255]
+    else:
+        run.status = ModelTrainingRun.STATUS_SUCCEEDED
+        run.progress = 1.0
+        run.message = 'Training complete'
+        run.model_version = version
+        run.metrics = metrics
+    run.finished_at = timezone.now()
+    run.save(update_fields=['status', 'progress', 'message', 'model_version', 'metrics', 'finished_at'])
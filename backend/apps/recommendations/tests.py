@@ -1,3 +1,505 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Skill, User, UserSkill
+from apps.common.testing import make_job
+from apps.jobs.models import Job, JobSkill, SkillDemand
+from ml.recommendation import SkillMatchEngine, proficiency_weight
+from ml.skill_index import SkillIndex
+from ml import embeddings
+from ml.artifacts import ArtifactNotFound, ArtifactStore, get_artifact_store
+from ml.job_index import ProcessIndex
+from ml.training import FEATURE_NAMES, RANKER_ARTIFACT, split_holdout
+
+from .cache import get_cache as get_recommendation_cache, invalidate_user
+from .feedback import write_feedback
+from .materialization import materialize, refresh_recommendations, users_to_refresh, write_recommendations
+from .models import ModelTrainingRun, Recommendation, RecommendationFeedback, RecommendationRun
+from .tasks import train_ranking_model
+
+
+class ScoringEngineTests(TestCase):
+    # Skills 1-3; job 10 needs 1 and 2, job 20 needs 1 and would like 3.
+    def engine(self):
+        return SkillMatchEngine.from_arrays(
+            [1, 2, 3], [10, 20, 30],
+            row_job_ids=[10, 10, 20, 20, 20, 99], row_skill_ids=[1, 2, 1, 3, 3, 1],
+            required=[True, True, True, False, False, True],
+        )
+
+    def users(self, engine, rows):
+        user_ids = sorted({user for user, _ in rows})
+        return engine.user_matrix(
+            user_ids, [u for u, _ in rows], [s for _, s in rows],
+            proficiency=[4] * len(rows), years=[10] * len(rows),
+        )
+
+    def test_scores_are_the_covered_share_of_demand(self):
+        engine = self.engine()
+        self.assertEqual(proficiency_weight(4, 10), 1.0)
+        scores = engine.score(self.users(engine, [(1, 1), (2, 3)])).toarray()
+        # Job 20's duplicate optional rows add up to one required-strength entry.
+        np.testing.assert_allclose(scores, [[0.5, 0.5, 0.0], [0.0, 0.5, 0.0]])
+
+    def test_top_n_orders_by_score_then_job(self):
+        engine = self.engine()
+        matrix = self.users(engine, [(1, 1), (1, 2), (2, 3)])
+        first, second = engine.top_n_for_matrix(matrix, n=2)
+        self.assertEqual([job for job, _ in first], [10, 20])
+        self.assertEqual(second, [(20, 0.5)])
+
+    def test_candidate_scoring_matches_full_scoring(self):
+        engine = self.engine()
+        matrix = self.users(engine, [(1, 1), (1, 3)])
+        full = next(engine.top_n_for_matrix(matrix))
+        self.assertEqual(next(engine.top_n_for_matrix(matrix, candidates=[10, 20, 99])), full)
+        self.assertEqual(engine.top_n_among(matrix, [10, 20]), full)
+        self.assertEqual(engine.top_n_among(matrix, [10]), [job for job in full if job[0] == 10])
+
+    def test_unknown_ids_are_ignored(self):
+        engine = self.engine()
+        matrix = engine.user_matrix([1], [1, 1, 7], [1, 42, 2], proficiency=[4, 4, 4], years=[10, 10, 10])
+        self.assertEqual(matrix.nnz, 1)
+        self.assertEqual(engine.shape, (3, 3))
+
+
+class MaterializationTests(TestCase):
+    def setUp(self):
+        self.python, self.django, self.rust = (
+            Skill.objects.create(name=name, category='technical') for name in ('Python', 'Django', 'Rust')
+        )
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        UserSkill.objects.create(user=self.user, skill=self.python, proficiency_level=3)
+        UserSkill.objects.create(user=self.user, skill=self.django, proficiency_level=2)
+
+        self.backend = make_job('Backend')
+        self.web = make_job('Web')
+        self.systems = make_job('Systems')
+        JobSkill.objects.bulk_create([
+            JobSkill(job=self.backend, skill=self.python, required=True),
+            JobSkill(job=self.web, skill=self.django, required=True),
+            JobSkill(job=self.systems, skill=self.rust, required=True),
+        ])
+
+    def test_scores_only_index_candidates(self):
+        index = SkillIndex.from_db()
+        index.remove_job(self.web.id)
+        materialize([self.user.id], engine=SkillMatchEngine.from_db(), index=index)
+        self.assertEqual(
+            set(Recommendation.objects.filter(user=self.user).values_list('job_id', flat=True)),
+            {self.backend.id},
+        )
+
+    def test_candidates_match_full_scoring(self):
+        engine = SkillMatchEngine.from_db()
+        index = SkillIndex.from_db()
+        candidates = index.candidates([self.python.id, self.django.id])
+        self.assertEqual(
+            engine.top_n(self.user.id, candidates=candidates), engine.top_n(self.user.id)
+        )
+
+    def test_active_ranker_reorders_matches(self):
+        partial = make_job('Polyglot')
+        JobSkill.objects.bulk_create([
+            JobSkill(job=partial, skill=self.python, required=True),
+            JobSkill(job=partial, skill=self.rust, required=True),
+        ])
+        engine = SkillMatchEngine.from_db()
+        # Full matches first by skill score alone.
+        self.assertEqual(engine.top_n(self.user.id, n=1)[0][0], self.backend.id)
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        weights = np.zeros(len(FEATURE_NAMES))
+        weights[FEATURE_NAMES.index('skill_match')] = -5.0
+        get_artifact_store(RANKER_ARTIFACT, root).save(
+            {'weights': weights, 'mean': np.zeros(len(FEATURE_NAMES)), 'scale': np.ones(len(FEATURE_NAMES))},
+            {'bias': 0.0, 'features': FEATURE_NAMES},
+        )
+        with override_settings(ML_ARTIFACT_ROOT=root):
+            materialize([self.user.id], engine=engine, index=SkillIndex.from_db(), top_k=1)
+        rec = Recommendation.objects.get(user=self.user)
+        self.assertEqual(rec.job_id, partial.id)
+        self.assertLess(rec.score, 0.5)
+
+    def test_jobs_deleted_mid_pass_are_skipped(self):
+        engine = SkillMatchEngine.from_db()
+        index = SkillIndex.from_db()
+        Job.objects.filter(pk=self.web.pk).delete()
+        materialize([self.user.id], engine=engine, index=index)
+        self.assertEqual(
+            list(Recommendation.objects.filter(user=self.user).values_list('job_id', flat=True)),
+            [self.backend.id],
+        )
+
+    def test_sync_drops_deleted_jobs(self):
+        index = SkillIndex.from_db()
+        Job.objects.filter(pk=self.backend.pk).delete()
+        index.sync()
+        self.assertNotIn(self.backend.id, index)
+        self.assertEqual(index.candidates([self.python.id]), set())
+
+
+@mock.patch('apps.recommendations.materialization.get_skill_index', lambda max_age=None: SkillIndex.from_db())
+class RefreshTests(TestCase):
+    def setUp(self):
+        self.python, self.rust = (
+            Skill.objects.create(name=name, category='technical') for name in ('Python', 'Rust')
+        )
+        self.pythonista, self.rustacean = (
+            User.objects.create(username=name, email=f'{name}@example.com') for name in ('pythonista', 'rustacean')
+        )
+        UserSkill.objects.create(user=self.pythonista, skill=self.python, proficiency_level=3)
+        UserSkill.objects.create(user=self.rustacean, skill=self.rust, proficiency_level=3)
+        self.backend = make_job('Backend')
+        JobSkill.objects.create(job=self.backend, skill=self.python, required=True)
+
+    def recommended(self, user):
+        return list(Recommendation.objects.filter(user=user).values_list('job_id', flat=True))
+
+    def test_first_run_is_full_then_incremental(self):
+        first = refresh_recommendations()
+        self.assertTrue(first.full_refresh)
+        self.assertEqual(first.users_refreshed, 2)
+        self.assertEqual(self.recommended(self.pythonista), [self.backend.id])
+
+        systems = make_job('Systems')
+        JobSkill.objects.create(job=systems, skill=self.rust, required=True)
+        self.assertEqual(users_to_refresh(first.started_at), {self.rustacean.id})
+
+        second = refresh_recommendations()
+        self.assertFalse(second.full_refresh)
+        self.assertEqual(second.users_refreshed, 1)
+        self.assertEqual(self.recommended(self.rustacean), [systems.id])
+        self.assertEqual(RecommendationRun.objects.count(), 2)
+
+    def test_deactivated_job_is_dropped_on_refresh(self):
+        first = refresh_recommendations()
+        job = Job.objects.get(pk=self.backend.pk)
+        job.is_active = False
+        job.save()
+        self.assertEqual(users_to_refresh(first.started_at), {self.pythonista.id})
+        refresh_recommendations()
+        self.assertEqual(self.recommended(self.pythonista), [])
+
+    def test_write_replaces_a_users_rows(self):
+        other = make_job('Other')
+        write_recommendations([self.pythonista.id], {self.pythonista.id: [(self.backend.id, 0.5), (other.id, 0.2)]})
+        write_recommendations([self.pythonista.id], {self.pythonista.id: [(self.backend.id, 0.9)]})
+        self.assertEqual(
+            list(Recommendation.objects.filter(user=self.pythonista).values_list('job_id', 'score')),
+            [(self.backend.id, 0.9)],
+        )
+
+
+class SkillGapTests(TestCase):
+    def setUp(self):
+        self.python, self.django, self.rust = (
+            Skill.objects.create(name=name, category='technical') for name in ('Python', 'Django', 'Rust')
+        )
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        UserSkill.objects.create(user=self.user, skill=self.python, proficiency_level=4, years_of_experience=10)
+        self.web = make_job('Web')
+        self.systems = make_job('Systems')
+        JobSkill.objects.bulk_create([
+            JobSkill(job=self.web, skill=self.python, required=True),
+            JobSkill(job=self.web, skill=self.django, required=True),
+            JobSkill(job=self.systems, skill=self.python, required=True),
+            JobSkill(job=self.systems, skill=self.rust, required=False),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def gaps(self, **params):
+        return self.client.get('/api/v1/recommendations/skill-gaps/', params).json()
+
+    def test_target_jobs_rank_missing_skills_by_demand(self):
+        result = self.gaps(job=[self.web.id, self.systems.id])
+        self.assertEqual((result['basis'], result['jobs_analyzed']), ('target_jobs', 2))
+        self.assertEqual(
+            [(g['skill'], g['required_by'], g['gap']) for g in result['gaps']],
+            [('Django', 1, 0.5), ('Rust', 0, 0.25)],
+        )
+        self.assertEqual(len(self.gaps(job=[self.web.id, self.systems.id], limit=1)['gaps']), 1)
+
+    def test_defaults_to_recommendations_then_market(self):
+        SkillDemand.objects.bulk_create([
+            SkillDemand(skill=self.python, required_jobs=2),
+            SkillDemand(skill=self.django, required_jobs=1),
+            SkillDemand(skill=self.rust, optional_jobs=1),
+        ])
+        result = self.gaps()
+        self.assertEqual(result['basis'], 'market')
+        self.assertEqual([(g['skill'], g['gap']) for g in result['gaps']], [('Django', 0.5), ('Rust', 0.25)])
+
+        Recommendation.objects.create(user=self.user, job=self.web, score=0.5)
+        result = self.gaps()
+        self.assertEqual((result['basis'], result['jobs_analyzed']), ('recommendations', 1))
+        self.assertEqual([(g['skill'], g['gap']) for g in result['gaps']], [('Django', 1.0)])
+
+    def test_weak_skills_and_inactive_targets(self):
+        UserSkill.objects.filter(user=self.user).update(proficiency_level=2, years_of_experience=0)
+        Job.objects.filter(pk=self.systems.pk).update(is_active=False)
+        result = self.gaps(job=[self.web.id, self.systems.id])
+        self.assertEqual(result['jobs_analyzed'], 1)
+        self.assertEqual(
+            [(g['skill'], g['current_level'], g['gap']) for g in result['gaps']],
+            [('Django', 0.0, 1.0), ('Python', 0.375, 0.625)],
+        )
+        self.assertEqual(self.client.get('/api/v1/recommendations/skill-gaps/', {'job': 'x'}).status_code, 400)
+
+
+class RecommendationCacheTests(TestCase):
+    def setUp(self):
+        get_recommendation_cache().clear()
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.job = make_job('Backend')
+        Recommendation.objects.create(user=self.user, job=self.job, score=0.5)
+
+    def scores(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [r['score'] for r in self.client.get('/api/v1/recommendations/').json()['results']]
+
+    def test_lists_are_served_from_the_cache(self):
+        self.assertEqual(self.scores(), [0.5])
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/recommendations/')
+        # A different query string is a different page.
+        self.assertEqual(self.client.get('/api/v1/recommendations/', {'ordering': 'score'}).status_code, 200)
+
+    def test_writes_invalidate_their_users(self):
+        self.scores()
+        with self.captureOnCommitCallbacks(execute=True):
+            Recommendation.objects.filter(user=self.user).update(score=0.9)
+            UserSkill.objects.create(
+                user=self.user, skill=Skill.objects.create(name='Python', category='technical'), proficiency_level=3
+            )
+        self.assertEqual(self.scores(), [0.9])
+
+    def test_job_edits_invalidate_its_audience(self):
+        self.scores()
+        with self.captureOnCommitCallbacks(execute=True):
+            Recommendation.objects.filter(user=self.user).update(score=0.7)
+            make_job('Unrelated').save()
+        self.assertEqual(self.scores(), [0.5])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Backend Engineer'
+            self.job.save()
+        self.assertEqual(self.scores(), [0.7])
+
+    def test_invalidation_waits_for_commit(self):
+        self.scores()
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate_user(self.user.id)
+        self.assertEqual(len(callbacks), 1)
+        Recommendation.objects.filter(user=self.user).update(score=0.9)
+        self.assertEqual(self.scores(), [0.5])
+
+
+class ArtifactStoreTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.store = ArtifactStore(root, 'ranker')
+
+    def test_versions_are_memory_mapped_and_swapped_on_activation(self):
+        self.assertIsNone(self.store.current())
+        first = self.store.save({'weights': np.arange(3.0)}, {'bias': 1.0})
+        loaded = self.store.current()
+        self.assertEqual((loaded.version, loaded.meta), (first, {'bias': 1.0}))
+        self.assertIsInstance(loaded['weights'], np.memmap)
+        self.assertIs(self.store.current(), loaded)
+
+        second = self.store.save({'weights': np.ones(3)}, activate=False)
+        self.assertEqual(self.store.versions(), [first, second])
+        self.assertIs(self.store.current(), loaded)
+        self.store.activate(second)
+        np.testing.assert_array_equal(self.store.current()['weights'], np.ones(3))
+        # A store in another process sees the same manifest.
+        self.assertEqual(ArtifactStore(os.path.dirname(self.store.path), 'ranker').current().version, second)
+
+    def test_unknown_versions(self):
+        with self.assertRaises(ArtifactNotFound):
+            self.store.load()
+        with self.assertRaises(ArtifactNotFound):
+            self.store.activate('missing')
+
+    def test_prune_keeps_the_active_version(self):
+        versions = [self.store.save({'weights': np.zeros(1)}, activate=False) for _ in range(3)]
+        self.store.activate(versions[0])
+        self.store.prune(keep=1)
+        self.assertEqual(self.store.versions(), [versions[0], versions[2]])
+
+
+class RecommendationUniquenessTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.job = make_job('Backend')
+
+    def test_rewrites_update_rows_in_place(self):
+        write_recommendations([self.user.id], {self.user.id: [(self.job.id, 0.5)]})
+        rec = Recommendation.objects.get(user=self.user)
+        write_recommendations([self.user.id], {self.user.id: [(self.job.id, 0.8)]})
+        self.assertEqual(list(Recommendation.objects.values_list('id', 'score')), [(rec.id, 0.8)])
+
+    def test_duplicate_create_is_a_validation_error(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = {'user': self.user.id, 'job': self.job.id, 'score': 0.5}
+        self.assertEqual(client.post('/api/v1/recommendations/', payload, format='json').status_code, 201)
+        response = client.post('/api/v1/recommendations/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('job', response.json())
+
+
+class RecommendationDeduplicationMigrationTests(TransactionTestCase):
+    before = [('recommendations', '0004_recommendationfeedback')]
+    after = [('recommendations', '0005_recommendation_indexes')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_keeps_the_newest_row_of_a_pair(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        # Users and jobs are untouched by going back, so the current models still fit them.
+        user = User.objects.create(username='seeker', email='seeker@example.com')
+        job = make_job('Backend')
+        Old = executor.loader.project_state(self.before).apps.get_model('recommendations', 'Recommendation')
+        Old.objects.create(user_id=user.id, job_id=job.id, score=0.2)
+        newest = Old.objects.create(user_id=user.id, job_id=job.id, score=0.4)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        New = executor.loader.project_state(self.after).apps.get_model('recommendations', 'Recommendation')
+        self.assertEqual(list(New.objects.values_list('id', 'score')), [(newest.id, 0.4)])
+
+
+class RetrainingTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@example.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @mock.patch('apps.recommendations.views.train_ranking_model.delay')
+    def test_active_run_is_reused(self, delay):
+        first = self.client.post('/api/v1/recommendations/retrain/').json()
+        second = self.client.post('/api/v1/recommendations/retrain/').json()
+        self.assertEqual(first['id'], second['id'])
+        self.assertTrue(second['deduplicated'])
+        delay.assert_called_once()
+
+    @mock.patch('apps.recommendations.views.train_ranking_model.delay')
+    def test_stale_run_no_longer_blocks(self, delay):
+        lost = ModelTrainingRun.objects.create(
+            status=ModelTrainingRun.STATUS_RUNNING, started_at=timezone.now() - timedelta(days=1)
+        )
+        response = self.client.post('/api/v1/recommendations/retrain/').json()
+        self.assertNotEqual(response['id'], str(lost.id))
+        self.assertFalse(response['deduplicated'])
+        lost.refresh_from_db()
+        self.assertEqual(lost.status, ModelTrainingRun.STATUS_FAILED)
+
+    @mock.patch('apps.recommendations.tasks.train_ranker')
+    def test_task_skips_runs_that_are_not_queued(self, train_ranker):
+        run = ModelTrainingRun.objects.create(status=ModelTrainingRun.STATUS_FAILED)
+        train_ranking_model(str(run.id))
+        train_ranker.assert_not_called()
+        run.refresh_from_db()
+        self.assertEqual(run.status, ModelTrainingRun.STATUS_FAILED)
+
+
+class HoldoutTests(TestCase):
+    def test_holds_out_each_class(self):
+        labels = np.array([1.0] * 10 + [0.0] * 30)
+        held_out = split_holdout(labels, 0.2)
+        self.assertEqual(int(labels[held_out].sum()), 2)
+        self.assertEqual(int((labels[held_out] == 0).sum()), 6)
+
+    def test_keeps_a_training_example_of_each_class(self):
+        labels = np.array([1.0, 0.0, 0.0])
+        held_out = split_holdout(labels, 0.5)
+        self.assertEqual(set(labels[~held_out]), {0.0, 1.0})
+
+
+class FeedbackTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.kept, self.replaced, self.removed = (make_job(title) for title in ('Kept', 'Replaced', 'Removed'))
+        self.recs = {
+            job.id: Recommendation.objects.create(user=self.user, job=job, score=0.5)
+            for job in (self.kept, self.replaced, self.removed)
+        }
+
+    def event(self, job):
+        rec = self.recs[job.id]
+        return RecommendationFeedback(
+            recommendation_id=rec.id, user_id=self.user.id, job_id=job.id,
+            event=RecommendationFeedback.EVENT_CLICK, score=rec.score, created_at=timezone.now(),
+        )
+
+    def test_stale_references_do_not_drop_the_batch(self):
+        events = [self.event(job) for job in (self.kept, self.replaced, self.removed)]
+        self.recs[self.replaced.id].delete()
+        self.removed.delete()
+
+        self.assertEqual(write_feedback(events), 2)
+        self.assertEqual(
+            set(RecommendationFeedback.objects.values_list('job_id', 'recommendation_id')),
+            {(self.kept.id, self.recs[self.kept.id].id), (self.replaced.id, None)},
+        )
+
+
+class SemanticRecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='seeker', email='seeker@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.job = make_job('Python Developer', description='Build python services')
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.snapshot = f'{root}/job_embeddings.npz'
+        settings = override_settings(JOB_EMBEDDING_SNAPSHOT=self.snapshot)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        process_index = ProcessIndex(
+            embeddings._load, embeddings._build, 'JOB_EMBEDDING_SNAPSHOT', 'JOB_EMBEDDING_SYNC_INTERVAL'
+        )
+        patcher = mock.patch.object(embeddings, '_process_index', process_index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch('apps.recommendations.views.build_job_embedding_index.delay')
+    def test_unavailable_until_snapshot_exists(self, delay):
+        response = self.client.get('/api/v1/recommendations/semantic/')
+        self.assertEqual(response.status_code, 503)
+        self.client.get('/api/v1/recommendations/semantic/')
+        delay.assert_called_once()
+
+    def test_serves_from_snapshot(self):
+        python = Skill.objects.create(name='Python', category='technical')
+        UserSkill.objects.create(user=self.user, skill=python, proficiency_level=3)
+        embeddings.build_job_embedding_snapshot()
+        results = self.client.get('/api/v1/recommendations/semantic/').json()['results']
+        self.assertEqual([r['job']['id'] for r in results], [self.job.id])
+
+    def test_empty_profile_has_no_matches(self):
+        embeddings.build_job_embedding_snapshot()
+        response = self.client.get('/api/v1/recommendations/semantic/')
+        self.assertEqual(response.json(), {'results': []})
@@ -8,9 +8,12 @@ router.register(r'', views.RecommendationViewSet, basename='recommendation')
 urlpatterns = [
     # Recommendation endpoints
     path('feedback/', views.RecommendationFeedbackView.as_view(), name='recommendation-feedback'),
+    path('semantic/', views.SemanticRecommendationView.as_view(), name='recommendation-semantic'),
     path('skill-gaps/', views.SkillGapAnalysisView.as_view(), name='skill-gaps'),
+    path('explain/', views.RecommendationExplanationBulkView.as_view(), name='recommendation-explain-bulk'),
     path('explain/<int:job_id>/', views.RecommendationExplanationView.as_view(), name='recommendation-explain'),
     path('retrain/', views.ModelRetrainingView.as_view(), name='model-retrain'),
+    path('retrain/<uuid:job_id>/', views.ModelRetrainingStatusView.as_view(), name='model-retrain-status'),
     
     # Include router URLs
     path('', include(router.urls)),
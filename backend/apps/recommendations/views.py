@@ -1,11 +1,31 @@
-from django.shortcuts import render
-from rest_framework import viewsets, filters
-from rest_framework.permissions import IsAuthenticated
-from .models import Recommendation
-from .serializers import RecommendationSerializer
+import logging
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from rest_framework import viewsets, filters, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from apps.jobs.models import Job
+from apps.jobs.serializers import JobListSerializer
+from apps.jobs.tasks import build_job_embedding_index
+from ml.embeddings import get_job_embedding_index
+
+from . import cache, skill_gaps
+from .explanations import parse_reason
+from .feedback import record_feedback
+from .models import Recommendation, RecommendationFeedback, ModelTrainingRun
+from .serializers import RecommendationSerializer, FeedbackEventSerializer, ModelTrainingRunSerializer
+from .tasks import train_ranking_model
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+logger = logging.getLogger(__name__)
+
 # Create your views here.
 
 class RecommendationViewSet(viewsets.ModelViewSet):
@@ -20,25 +40,228 @@ class RecommendationViewSet(viewsets.ModelViewSet):
             return Recommendation.objects.all()
         return Recommendation.objects.filter(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        # Staff list everyone's rows; only per-user lists are cached.
+        if request.user.is_staff:
+            return super().list(request, *args, **kwargs)
+        data = cache.get_list(request.user.id, request.query_params)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            cache.set_list(request.user.id, request.query_params, response.data)
+            return response
+        return Response(data)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            raise ValidationError({'job': ['This job is already recommended to the user.']})
 
 class RecommendationFeedbackView(APIView):
+    """
+    Record feedback events on the user's recommendations.
+
+    Accepts one event, a list of events or ``{"events": [...]}``. Events are
+    buffered and bulk-inserted, so they may reach the database a moment
+    after the ``202`` response.
+    """
     permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        return Response({'message': 'Feedback received.'})
+        payload = request.data
+        if isinstance(payload, dict) and 'events' in payload:
+            payload = payload['events']
+        if isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list) or not payload:
+            return Response({'detail': 'Expected a feedback event or a list of them.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > settings.RECOMMENDATION_FEEDBACK_MAX_BATCH:
+            return Response(
+                {'detail': f'At most {settings.RECOMMENDATION_FEEDBACK_MAX_BATCH} events per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = FeedbackEventSerializer(data=payload, many=True)
+        serializer.is_valid(raise_exception=True)
+        events = serializer.validated_data
+
+        recommendations = Recommendation.objects.filter(
+            user=request.user, id__in={e['recommendation'] for e in events}
+        ).only('id', 'job_id', 'score').in_bulk()
+        unknown = sorted({e['recommendation'] for e in events} - recommendations.keys())
+        if unknown:
+            return Response({'detail': 'Unknown recommendations.', 'recommendations': unknown}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        record_feedback([
+            RecommendationFeedback(
+                recommendation_id=e['recommendation'],
+                user_id=request.user.id,
+                job_id=recommendations[e['recommendation']].job_id,
+                event=e['event'],
+                score=recommendations[e['recommendation']].score,
+                created_at=e.get('occurred_at') or now,
+            )
+            for e in events
+        ])
+        return Response({'message': 'Feedback received.', 'accepted': len(events)}, status=status.HTTP_202_ACCEPTED)
 
 class SkillGapAnalysisView(APIView):
+    """
+    Skills the user lacks for their target jobs (``?job=<id>``, repeatable)
+    or, by default, for their top recommendations.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            job_ids = [int(j) for j in request.query_params.getlist('job')]
+            limit = int(request.query_params.get('limit', skill_gaps.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'detail': 'job and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, 100))
+        return Response(skill_gaps.skill_gaps(request.user, job_ids, limit))
+
+def _explanation(rec):
+    return {
+        'recommendation': rec['id'],
+        'job': rec['job_id'],
+        'score': rec['score'],
+        'date_generated': rec['date_generated'],
+        'explanation': parse_reason(rec['reason']),
+    }
+
+class SemanticRecommendationView(APIView):
+    """
+    Active jobs closest to the user's profile embedding, retrieved through
+    the approximate nearest-neighbour job index.
+
+    The index is never built on a request thread: until a snapshot exists
+    the view queues a build on the workers and answers ``503``.
+    """
     permission_classes = [IsAuthenticated]
+    build_lock_key = 'job-embedding-index-build'
+    build_lock_timeout = 600  # seconds before another build may be queued
+    retry_after = 30  # seconds
+
     def get(self, request):
-        return Response({'gaps': []})
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, 100))
+
+        index = get_job_embedding_index(build=False)
+        if index is None:
+            if default_cache.add(self.build_lock_key, True, self.build_lock_timeout):
+                try:
+                    build_job_embedding_index.delay()
+                except Exception:
+                    logger.exception("Could not enqueue the job embedding index build")
+                    default_cache.delete(self.build_lock_key)
+            return Response(
+                {'detail': 'Semantic search is warming up; try again shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(self.retry_after)},
+            )
+        matches = index.similar_to_user(request.user.id, k=limit)
+        jobs = Job.objects.filter(id__in=[job_id for job_id, _ in matches], is_active=True)
+        jobs = jobs.only(*JobListSerializer.Meta.fields).in_bulk()
+        return Response({
+            'results': [
+                {'job': JobListSerializer(jobs[job_id]).data, 'similarity': round(similarity, 4)}
+                for job_id, similarity in matches
+                if job_id in jobs
+            ],
+        })
 
 class RecommendationExplanationView(APIView):
+    """The stored explanation of the user's recommendation for ``job_id``"""
     permission_classes = [IsAuthenticated]
+
     def get(self, request, job_id):
-        return Response({'explanation': f'Explanation for job {job_id}'})
+        rec = (
+            Recommendation.objects.filter(user=request.user, job_id=job_id)
+            .values('id', 'job_id', 'score', 'reason', 'date_generated')
+            .first()
+        )
+        if rec is None:
+            return Response({'detail': 'No recommendation for this job.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_explanation(rec))
 
-class ModelRetrainingView(APIView):
+class RecommendationExplanationBulkView(APIView):
+    """
+    Explanations for a page of the user's recommendations in one query, by
+    ``?id=`` (recommendation ids) and/or ``?job=`` (job ids), both repeatable.
+    """
     permission_classes = [IsAuthenticated]
+    max_items = 100
+
+    def get(self, request):
+        try:
+            ids = [int(i) for i in request.query_params.getlist('id')]
+            job_ids = [int(j) for j in request.query_params.getlist('job')]
+        except ValueError:
+            return Response({'detail': 'id and job must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids and not job_ids:
+            return Response({'detail': 'Pass at least one id or job.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) + len(job_ids) > self.max_items:
+            return Response({'detail': f'At most {self.max_items} items per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        recs = (
+            Recommendation.objects.filter(user=request.user)
+            .filter(Q(id__in=ids) | Q(job_id__in=job_ids))
+            .order_by('-score', 'id')
+            .values('id', 'job_id', 'score', 'reason', 'date_generated')
+        )
+        return Response({'results': [_explanation(rec) for rec in recs]})
+
+class ModelRetrainingView(APIView):
+    """
+    Queue a ranking-model retrain on the training workers.
+
+    Training never runs on the request thread. While a run is queued or
+    running, further requests return that run instead of starting another;
+    runs past ``MODEL_TRAINING_TIMEOUT`` are failed first so a lost one does
+    not block retraining.
+    """
+    permission_classes = [IsAdminUser]
+
     def post(self, request):
-        return Response({'message': 'Model retraining started.'})
+        ModelTrainingRun.fail_stale()
+        try:
+            with transaction.atomic():
+                run = ModelTrainingRun.objects.create(requested_by=request.user)
+        except IntegrityError:
+            run = ModelTrainingRun.objects.filter(
+                status__in=ModelTrainingRun.ACTIVE_STATUSES
+            ).first()
+            if run is not None:
+                return Response(self.describe(request, run, deduplicated=True), status=status.HTTP_202_ACCEPTED)
+            raise
+
+        try:
+            train_ranking_model.delay(str(run.id))
+        except Exception as exc:
+            logger.exception("Could not enqueue training run %s", run.id)
+            run.status = ModelTrainingRun.STATUS_FAILED
+            run.message = f'Could not enqueue training job: {exc}'[:255]
+            run.save(update_fields=['status', 'message'])
+            return Response(self.describe(request, run), status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(self.describe(request, run), status=status.HTTP_202_ACCEPTED)
+
+    def describe(self, request, run, deduplicated=False):
+        data = ModelTrainingRunSerializer(run).data
+        data['deduplicated'] = deduplicated
+        data['status_url'] = request.build_absolute_uri(
+            reverse('model-retrain-status', kwargs={'job_id': run.id})
+        )
+        return data
+
+class ModelRetrainingStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        run = get_object_or_404(ModelTrainingRun, pk=job_id)
+        return Response(ModelTrainingRunSerializer(run).data)
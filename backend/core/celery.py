@@ -0,0 +1,14 @@
+"""
+Celery application for background work (recommendation refreshes, model
+training and other jobs that must not run on a request thread).
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+app = Celery("core")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
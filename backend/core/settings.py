@@ -12,11 +12,19 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from datetime import timedelta
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The machine learning package (``ml/``) lives next to ``backend/``.
+PROJECT_ROOT = BASE_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -88,6 +96,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "core.wsgi.application"
+ASGI_APPLICATION = "core.asgi.application"
 
 
 # Database
@@ -209,6 +218,133 @@ CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only allow all origins in development
 
+# Celery Configuration
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False').lower() == 'true'
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'refresh-recommendations': {
+        'task': 'apps.recommendations.tasks.refresh_recommendations',
+        'schedule': timedelta(minutes=15),
+    },
+    'match-job-alerts': {
+        'task': 'apps.alerts.tasks.match_new_jobs',
+        'schedule': timedelta(minutes=1),
+    },
+    'send-instant-alert-digests': {
+        'task': 'apps.alerts.tasks.send_alert_digests',
+        'schedule': timedelta(minutes=1),
+        'args': ('instant',),
+    },
+    'send-daily-alert-digests': {
+        'task': 'apps.alerts.tasks.send_alert_digests',
+        'schedule': crontab(hour=7, minute=0),
+        'args': ('daily',),
+    },
+    'send-weekly-alert-digests': {
+        'task': 'apps.alerts.tasks.send_alert_digests',
+        'schedule': crontab(hour=7, minute=0, day_of_week='mon'),
+        'args': ('weekly',),
+    },
+    'compact-metric-buckets': {
+        'task': 'apps.analytics.tasks.compact_metric_buckets',
+        'schedule': crontab(minute=5),
+    },
+}
+CELERY_TASK_ROUTES = {
+    # Keep long training jobs from starving short tasks: run a dedicated
+    # worker with ``-Q training``.
+    'apps.recommendations.tasks.train_ranking_model': {'queue': 'training'},
+    # Resume parsing is CPU-bound; ``-Q resumes`` workers keep it off the web
+    # processes and away from short tasks.
+    'apps.authentication.tasks.parse_resume_upload': {'queue': 'resumes'},
+}
+
+# Application counters
+APPLICATION_COUNTER_STRIPES = 8  # rows the global counters are spread over
+
+# Resume uploads
+RESUME_MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # bytes
+RESUME_MAX_TEXT_LENGTH = 100_000  # characters parsed per resume
+RESUME_PARSE_TIMEOUT = 300  # seconds before a stuck parse may be retried
+
+# Cache Configuration
+# Local memory by default; set REDIS_URL to share caches between workers
+# (configure the Redis server with an LRU ``maxmemory-policy`` to bound it).
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        },
+        'recommendations': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'recommendations',
+            'TIMEOUT': 300,
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'default',
+        },
+        'recommendations': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'recommendations',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+# Analytics
+ANALYTICS_HOURLY_RETENTION_DAYS = 7  # then hourly buckets are compacted into days
+ANALYTICS_MAX_SERIES_POINTS = 2000  # per metric and dimension in one series request
+
+# Real-time Events
+# Redis pub/sub when available; otherwise events only reach clients of the
+# publishing process (fine for a single development server).
+EVENT_BROKER_URL = os.getenv('EVENT_BROKER_URL', REDIS_URL)
+EVENT_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+EVENT_STREAM_RETRY_MS = 5000  # client reconnect delay
+EVENT_STREAM_QUEUE_SIZE = 100  # undelivered events held per connection
+EVENT_STREAM_TICKET_MAX_AGE = 60  # seconds a stream ticket can be used for
+
+# Recommendation Engine
+RECOMMENDATION_CACHE_ALIAS = 'recommendations'
+RECOMMENDATION_TOP_K = 50
+RECOMMENDATION_BATCH_SIZE = 1000
+RECOMMENDATION_RERANK_POOL = 3  # skill matches per kept row the trained ranker reorders
+RECOMMENDATION_GAP_JOBS = 50  # top recommendations analysed for skill gaps
+RECOMMENDATION_FEEDBACK_BUFFER_SIZE = 500  # events; 0 writes every batch immediately
+RECOMMENDATION_FEEDBACK_FLUSH_INTERVAL = 2  # seconds
+RECOMMENDATION_FEEDBACK_MAX_BATCH = 200  # events per request
+SKILL_INDEX_SNAPSHOT = BASE_DIR / 'var' / 'skill_index.npz'
+SKILL_INDEX_SYNC_INTERVAL = 30  # seconds
+SKILL_DICTIONARY_SYNC_INTERVAL = 30  # seconds
+JOB_EMBEDDING_SNAPSHOT = BASE_DIR / 'var' / 'job_embeddings.npz'
+JOB_EMBEDDING_SYNC_INTERVAL = 30  # seconds
+JOB_EMBEDDING_NPROBE = 8  # IVF partitions scanned per query
+ML_ARTIFACT_ROOT = BASE_DIR / 'var' / 'models'
+ML_ARTIFACT_KEEP_VERSIONS = 5
+MODEL_TRAINING_TIMEOUT = 2 * 60 * 60  # seconds before an active run counts as lost
+MODEL_TRAINING_HOLDOUT = 0.2  # share of examples held out for the run's metrics
+
+# Job Alerts
+ALERT_DIGEST_BATCH_SIZE = 500  # users per digest batch
+ALERT_MATCHER_SYNC_INTERVAL = 30  # seconds
+NOTIFICATION_CACHE_ALIAS = 'default'
+NOTIFICATION_UNREAD_TIMEOUT = 3600  # seconds a cached unread counter is trusted
+
+# Email
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'alerts@localhost')
+
 # Environment Variables
 SECRET_KEY = os.getenv('SECRET_KEY', SECRET_KEY)
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
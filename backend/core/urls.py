@@ -28,6 +28,7 @@ from drf_spectacular.views import (
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
+from apps.common.streams import EventStreamTicketView, EventStreamView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -48,6 +49,10 @@ urlpatterns = [
     path('api/v1/recommendations/', include('apps.recommendations.urls')),
     path('api/v1/alerts/', include('apps.alerts.urls')),
     path('api/v1/analytics/', include('apps.analytics.urls')),
+
+    # Real-time push (Server-Sent Events; ASGI only)
+    path('api/v1/events/', EventStreamView.as_view(), name='event-stream'),
+    path('api/v1/events/ticket/', EventStreamTicketView.as_view(), name='event-stream-ticket'),
     
     # DRF Browsable API
     path('api-auth/', include('rest_framework.urls')),
@@ -0,0 +1,217 @@
+"""
+Approximate nearest-neighbour search over unit vectors.
+
+``IVFIndex`` is an inverted-file index: vectors are partitioned among
+``nlist`` centroids found with spherical k-means, and a query scans only the
+``nprobe`` partitions whose centroids are closest to it. Inserts go to the
+nearest existing centroid and deletes swap the last vector of a partition
+into the freed slot, so the catalogue can change without a rebuild;
+rebuilding re-trains the centroids once the data has drifted.
+"""
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+
+
+def default_nlist(count):
+    """Roughly ``sqrt(count)`` partitions, at least one"""
+    return max(1, min(1024, int(np.sqrt(count))))
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def spherical_kmeans(vectors, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """Centroids (``k x dim``, unit length) maximising cosine similarity"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~np.bincount(assignment, minlength=k).astype(bool)
+        # Re-seed empty partitions with random points rather than dropping them.
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class _Partition:
+    """One inverted list: ids and vectors in growable arrays"""
+
+    def __init__(self, dim):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.size = 0
+
+    def append(self, item_id, vector):
+        if self.size == len(self.ids):
+            capacity = max(8, 2 * len(self.ids))
+            self.ids = np.resize(self.ids, capacity)
+            vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[:self.size] = self.vectors[:self.size]
+            self.vectors = vectors
+        self.ids[self.size] = item_id
+        self.vectors[self.size] = vector
+        self.size += 1
+        return self.size - 1
+
+    def remove(self, slot):
+        """Delete ``slot``; returns the id moved into it, if any"""
+        last = self.size - 1
+        moved = None
+        if slot != last:
+            self.ids[slot] = self.ids[last]
+            self.vectors[slot] = self.vectors[last]
+            moved = int(self.ids[slot])
+        self.size = last
+        return moved
+
+
+class IVFIndex:
+    """Inverted-file ANN index over unit vectors of dimension ``dim``"""
+
+    def __init__(self, dim, nprobe=DEFAULT_NPROBE):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.centroids = np.empty((0, dim), dtype=np.float32)
+        self._partitions = []
+        self._locations = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, item_id):
+        return item_id in self._locations
+
+    def item_ids(self):
+        with self._lock:
+            return list(self._locations)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def build(self, ids, vectors, nlist=None):
+        """Train the centroids on ``vectors`` and replace the contents with them"""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = normalize(vectors).reshape(-1, self.dim)
+        nlist = min(nlist or default_nlist(len(ids)), len(ids))
+        with self._lock:
+            self.centroids = (
+                spherical_kmeans(vectors, nlist) if nlist else np.empty((0, self.dim), dtype=np.float32)
+            )
+            self._partitions = [_Partition(self.dim) for _ in range(self.nlist)]
+            self._locations = {}
+            if len(ids):
+                for item_id, vector, partition in zip(ids.tolist(), vectors, self._assign(vectors)):
+                    self._insert(item_id, vector, partition)
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _insert(self, item_id, vector, partition):
+        slot = self._partitions[partition].append(item_id, vector)
+        self._locations[item_id] = (partition, slot)
+
+    def add(self, item_id, vector):
+        """Insert or replace ``item_id``"""
+        vector = normalize(vector).reshape(self.dim)
+        with self._lock:
+            self._discard(item_id)
+            if not self.nlist:
+                # First vector of an untrained index seeds a single partition.
+                self.centroids = vector[None, :].copy()
+                self._partitions = [_Partition(self.dim)]
+            self._insert(item_id, vector, int(self._assign(vector[None, :])[0]))
+
+    def remove(self, item_id):
+        with self._lock:
+            self._discard(item_id)
+
+    def _discard(self, item_id):
+        location = self._locations.pop(item_id, None)
+        if location is None:
+            return
+        partition, slot = location
+        moved = self._partitions[partition].remove(slot)
+        if moved is not None:
+            self._locations[moved] = (partition, slot)
+
+    def search(self, query, k=10, nprobe=None, exclude=()):
+        """The ``k`` best ``(id, cosine)`` pairs among the ``nprobe`` closest partitions"""
+        query = normalize(query).reshape(self.dim)
+        with self._lock:
+            if not self._locations:
+                return []
+            nprobe = min(nprobe or self.nprobe, self.nlist)
+            probes = np.argsort(-(self.centroids @ query))[:nprobe]
+            partitions = [self._partitions[p] for p in probes.tolist() if self._partitions[p].size]
+            ids = np.concatenate([p.ids[:p.size] for p in partitions])
+            scores = np.concatenate([p.vectors[:p.size] @ query for p in partitions])
+
+        if exclude:
+            keep = ~np.isin(ids, np.fromiter(exclude, dtype=np.int64))
+            ids, scores = ids[keep], scores[keep]
+        if k < len(scores):
+            best = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[best], scores[best]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def arrays(self):
+        """``(ids, vectors, partition_of_each)`` for every stored vector"""
+        with self._lock:
+            parts = list(self._partitions)
+            ids = np.concatenate([p.ids[:p.size] for p in parts] or [np.empty(0, np.int64)])
+            vectors = np.concatenate(
+                [p.vectors[:p.size] for p in parts] or [np.empty((0, self.dim), np.float32)]
+            )
+            assignment = np.repeat(np.arange(len(parts)), [p.size for p in parts])
+            return ids, vectors, assignment
+
+    def save(self, path, **extra):
+        """Write the index (and ``extra`` scalar arrays) to an ``.npz`` snapshot"""
+        with self._lock:
+            ids, vectors, assignment = self.arrays()
+            centroids = self.centroids.copy()
+        directory = os.path.dirname(os.fspath(path)) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                np.savez(
+                    fh, centroids=centroids, ids=ids, vectors=vectors, assignment=assignment,
+                    **{key: np.asarray(value) for key, value in extra.items()},
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, nprobe=DEFAULT_NPROBE):
+        """Load a snapshot; returns ``(index, extra)`` where ``extra`` holds the other arrays"""
+        with np.load(path) as data:
+            centroids = data['centroids']
+            index = cls(centroids.shape[1], nprobe=nprobe)
+            index.centroids = centroids
+            index._partitions = [_Partition(index.dim) for _ in range(len(centroids))]
+            for item_id, vector, partition in zip(
+                data['ids'].tolist(), data['vectors'], data['assignment'].tolist()
+            ):
+                index._insert(item_id, vector, partition)
+            extra = {
+                key: data[key] for key in data.files
+                if key not in ('centroids', 'ids', 'vectors', 'assignment')
+            }
+        return index, extra
@@ -0,0 +1,172 @@
+"""
+Versioned model artifact store.
+
+Each model gets a directory of immutable versions plus a ``manifest.json``
+naming the active one::
+
+    <root>/<name>/manifest.json
+    <root>/<name>/<version>/meta.json
+    <root>/<name>/<version>/<array>.npy
+
+Arrays are plain ``.npy`` files opened with ``mmap_mode='r'``, so every
+worker process maps the same page-cache pages instead of holding a private
+copy, and loading costs a few ``open()`` calls rather than a full read.
+Activating a version atomically replaces the manifest; processes notice the
+new manifest on their next lookup and swap without a restart.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+MANIFEST = 'manifest.json'
+META = 'meta.json'
+
+
+class ArtifactNotFound(LookupError):
+    pass
+
+
+class Artifact:
+    """One loaded artifact version: memory-mapped ``arrays`` and JSON ``meta``"""
+
+    def __init__(self, name, version, arrays, meta):
+        self.name = name
+        self.version = version
+        self.arrays = arrays
+        self.meta = meta
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def __repr__(self):
+        return f'<Artifact {self.name}@{self.version}>'
+
+
+class ArtifactStore:
+    """Versions of the artifact ``name`` kept under ``root``"""
+
+    def __init__(self, root, name):
+        self.name = name
+        self.path = os.path.join(os.fspath(root), name)
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._manifest_key = None
+
+    def version_path(self, version):
+        return os.path.join(self.path, version)
+
+    def versions(self):
+        """Complete versions, oldest first"""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.path)
+            if os.path.isfile(os.path.join(self.path, entry, META))
+        )
+
+    def save(self, arrays, meta=None, activate=True):
+        """
+        Write ``arrays`` (name -> ndarray) and ``meta`` as a new version and
+        return its name. The version is staged in a temporary directory and
+        renamed into place, so readers never see a partial version.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        version = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+        staging = tempfile.mkdtemp(dir=self.path, prefix='.staging-')
+        try:
+            for key, array in arrays.items():
+                np.save(os.path.join(staging, f'{key}.npy'), np.ascontiguousarray(array))
+            with open(os.path.join(staging, META), 'w') as fh:
+                json.dump({'arrays': sorted(arrays), **(meta or {})}, fh)
+            os.rename(staging, self.version_path(version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """Point the manifest at ``version``"""
+        if version not in self.versions():
+            raise ArtifactNotFound(f"{self.name} has no version {version}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                json.dump({'active': version}, fh)
+            os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def active_version(self):
+        try:
+            with open(os.path.join(self.path, MANIFEST)) as fh:
+                return json.load(fh)['active']
+        except FileNotFoundError:
+            return None
+
+    def load(self, version=None):
+        """Memory-map ``version`` (the active one by default)"""
+        version = version or self.active_version()
+        if version is None:
+            raise ArtifactNotFound(f"{self.name} has no active version")
+        directory = self.version_path(version)
+        try:
+            with open(os.path.join(directory, META)) as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            raise ArtifactNotFound(f"{self.name} has no version {version}")
+        arrays = {
+            key: np.load(os.path.join(directory, f'{key}.npy'), mmap_mode='r')
+            for key in meta.pop('arrays')
+        }
+        return Artifact(self.name, version, arrays, meta)
+
+    def current(self):
+        """
+        The active version, loaded once per process and reloaded whenever the
+        manifest is replaced. Returns ``None`` until a version is activated.
+        """
+        try:
+            stat = os.stat(os.path.join(self.path, MANIFEST))
+        except FileNotFoundError:
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            if key != self._manifest_key:
+                self._loaded = self.load()
+                self._manifest_key = key
+            return self._loaded
+
+    def prune(self, keep):
+        """Delete all but the newest ``keep`` versions, never the active one"""
+        active = self.active_version()
+        stale = self.versions()[:-keep] if keep > 0 else self.versions()
+        for version in stale:
+            if version != active:
+                # Processes still mapping the old files keep their pages until
+                # they swap; unlinking does not invalidate existing mappings.
+                shutil.rmtree(self.version_path(version), ignore_errors=True)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(name, root=None):
+    """This process's shared store for ``name`` under ``ML_ARTIFACT_ROOT``"""
+    if root is None:
+        from django.conf import settings
+
+        root = settings.ML_ARTIFACT_ROOT
+    key = (os.fspath(root), name)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ArtifactStore(root, name)
+        return _stores[key]
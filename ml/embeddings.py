@@ -0,0 +1,193 @@
+"""
+Job and profile embeddings for semantic retrieval.
+
+``HashingEncoder`` maps text to fixed-size vectors with signed feature
+hashing of words and word bigrams, so it needs no trained vocabulary or
+model download and produces the same vector in every process. Jobs are
+embedded from their title, description, tags and required skills; users
+from their skills, work history and fields of study. Active jobs live in an
+``ml.ann.IVFIndex`` that is updated as jobs are posted, edited and
+deactivated, and snapshotted to disk for warm worker starts. Building the
+index embeds the whole catalogue, so request handlers only ever load a
+snapshot; ``build_job_embedding_snapshot`` writes one off the request path.
+"""
+import hashlib
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from .ann import DEFAULT_NPROBE, IVFIndex
+from .job_index import JobIndex, ProcessIndex
+
+EMBEDDING_DIM = 512
+WORD_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or our that the this to '
+    'we will with you your'.split()
+)
+
+JOB_FIELD_WEIGHTS = {'title': 3.0, 'required_skills': 2.0, 'tags': 2.0, 'description': 1.0}
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature, dim):
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+    value = int.from_bytes(digest, 'little')
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+def words(text):
+    return [w.rstrip('.') for w in WORD_RE.findall((text or '').lower()) if w not in STOP_WORDS]
+
+
+class HashingEncoder:
+    """Signed feature-hashing encoder with sub-linear term weighting"""
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def features(self, text):
+        tokens = words(text)
+        return tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+
+    def encode(self, weighted_texts):
+        """Unit vector for ``[(text, weight), ...]``"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for text, weight in weighted_texts:
+            for feature, count in Counter(self.features(text)).items():
+                bucket, sign = _bucket(feature, self.dim)
+                vector[bucket] += sign * weight * (1.0 + np.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def encode_job(self, job):
+        return self.encode(
+            (getattr(job, field), weight) for field, weight in JOB_FIELD_WEIGHTS.items()
+        )
+
+
+def encode_user(user_id, encoder=None):
+    """Profile vector from skills (by proficiency), positions, experience and education"""
+    from apps.authentication.models import Education, UserSkill, WorkExperience
+
+    encoder = encoder or HashingEncoder()
+    texts = [
+        (name, 2.0 * level / 4)
+        for name, level in UserSkill.objects.filter(user_id=user_id)
+        .values_list('skill__name', 'proficiency_level')
+    ]
+    for position, description in WorkExperience.objects.filter(user_id=user_id).values_list(
+        'position', 'description'
+    ):
+        texts.append((position, 2.0))
+        texts.append((description, 0.5))
+    texts.extend(
+        (field, 1.5)
+        for field in Education.objects.filter(user_id=user_id).values_list('field_of_study', flat=True)
+    )
+    return encoder.encode(texts)
+
+
+class JobEmbeddingIndex(JobIndex):
+    """ANN index of active job embeddings kept in step with the ``Job`` table"""
+
+    def __init__(self, index=None, encoder=None, nprobe=DEFAULT_NPROBE):
+        self.encoder = encoder or HashingEncoder()
+        self.index = index or IVFIndex(self.encoder.dim, nprobe=nprobe)
+        self.synced_at = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, job_id):
+        return job_id in self.index
+
+    def job_ids(self):
+        return self.index.item_ids()
+
+    @classmethod
+    def from_db(cls, nprobe=DEFAULT_NPROBE):
+        """Embed every active job and train the partitions on them"""
+        from apps.jobs.models import Job
+
+        embeddings = cls(nprobe=nprobe)
+        embeddings.synced_at = time.time()
+        jobs = Job.objects.filter(is_active=True).only(*JOB_FIELD_WEIGHTS).order_by('id')
+        ids, vectors = [], []
+        for job in jobs.iterator(chunk_size=2000):
+            ids.append(job.id)
+            vectors.append(embeddings.encoder.encode_job(job))
+        embeddings.index.build(ids, np.array(vectors, dtype=np.float32).reshape(-1, embeddings.encoder.dim))
+        return embeddings
+
+    def refresh_jobs(self, jobs):
+        """Re-embed ``jobs`` (a ``Job`` queryset); inactive jobs are removed"""
+        for job in jobs.only('is_active', *JOB_FIELD_WEIGHTS).iterator(chunk_size=2000):
+            if job.is_active:
+                self.index.add(job.id, self.encoder.encode_job(job))
+            else:
+                self.index.remove(job.id)
+
+    def remove_job(self, job_id):
+        self.index.remove(job_id)
+
+    def search(self, vector, k=10, exclude=()):
+        # An empty profile encodes to the zero vector, which is close to nothing.
+        if not np.any(vector):
+            return []
+        return self.index.search(vector, k=k, exclude=exclude)
+
+    def similar_to_user(self, user_id, k=10, exclude=()):
+        return self.search(encode_user(user_id, self.encoder), k=k, exclude=exclude)
+
+    def save(self, path):
+        self.index.save(path, synced_at=self.synced_at or time.time())
+
+    @classmethod
+    def load(cls, path, nprobe=DEFAULT_NPROBE):
+        index, extra = IVFIndex.load(path, nprobe=nprobe)
+        embeddings = cls(index=index)
+        embeddings.synced_at = float(extra['synced_at'])
+        return embeddings
+
+
+def _load(path):
+    from django.conf import settings
+
+    return JobEmbeddingIndex.load(path, nprobe=settings.JOB_EMBEDDING_NPROBE)
+
+
+def _build():
+    from django.conf import settings
+
+    return JobEmbeddingIndex.from_db(nprobe=settings.JOB_EMBEDDING_NPROBE)
+
+
+_process_index = ProcessIndex(_load, _build, 'JOB_EMBEDDING_SNAPSHOT', 'JOB_EMBEDDING_SYNC_INTERVAL')
+
+
+def build_job_embedding_snapshot(path=None):
+    """Embed every active job and write the snapshot (``JOB_EMBEDDING_SNAPSHOT`` by default)"""
+    from django.conf import settings
+
+    embeddings = _build()
+    embeddings.save(path or settings.JOB_EMBEDDING_SNAPSHOT)
+    return embeddings
+
+
+def get_job_embedding_index(build=True):
+    """
+    Return this process's job embedding index, loaded from the snapshot when
+    there is one and caught up with other processes' job changes every
+    ``JOB_EMBEDDING_SYNC_INTERVAL`` seconds. Without a snapshot the index is
+    built here, or with ``build=False`` ``None`` is returned.
+    """
+    return _process_index.get(build=build)
+
+
+def loaded_job_embedding_index():
+    """The process's job embedding index if it has been loaded, otherwise ``None``"""
+    return _process_index.loaded()
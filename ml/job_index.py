@@ -0,0 +1,92 @@
+"""
+Scaffolding shared by the in-memory indexes over active jobs.
+
+``ml.skill_index`` and ``ml.embeddings`` each keep one index per process.
+It is loaded from a disk snapshot (or built from the database) on first use
+and caught up with other processes' job changes every few seconds, while
+``apps.jobs.signals`` applies this process's own changes as they commit.
+"""
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+
+class JobIndex(ABC):
+    """Base for indexes holding the active rows of ``Job``"""
+
+    synced_at = None
+
+    @abstractmethod
+    def job_ids(self):
+        """Ids of every indexed job"""
+
+    @abstractmethod
+    def refresh_jobs(self, jobs):
+        """Re-index ``jobs`` (a ``Job`` queryset), removing inactive ones"""
+
+    @abstractmethod
+    def remove_job(self, job_id):
+        """Drop ``job_id`` from the index"""
+
+    def sync(self):
+        """Catch up with jobs added, edited, deactivated or deleted since the last sync"""
+        from apps.jobs.models import Job
+
+        started = time.time()
+        since = datetime.fromtimestamp(self.synced_at or 0, tz=timezone.utc)
+        self.refresh_jobs(Job.objects.filter(updated_at__gte=since))
+        # Deleted jobs leave no row behind to match on ``updated_at``.
+        active = set(Job.objects.filter(is_active=True).values_list('id', flat=True))
+        for job_id in set(self.job_ids()) - active:
+            self.remove_job(job_id)
+        self.synced_at = started
+
+
+class ProcessIndex:
+    """
+    This process's copy of an index.
+
+    ``load(path)`` reads the snapshot named by the ``snapshot_setting``
+    setting and ``build()`` creates the index from the database when there
+    is none; the index is synced once ``interval_setting`` seconds have
+    passed since its last sync.
+    """
+
+    def __init__(self, load, build, snapshot_setting, interval_setting):
+        self._load = load
+        self._build = build
+        self.snapshot_setting = snapshot_setting
+        self.interval_setting = interval_setting
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self, max_age=None, build=True):
+        """
+        Return the index, synced first when it is older than ``max_age``
+        seconds (the interval setting by default). Without a snapshot to
+        load, ``build=False`` returns ``None`` instead of building it here.
+        """
+        from django.conf import settings
+
+        if max_age is None:
+            max_age = getattr(settings, self.interval_setting)
+        with self._lock:
+            if self._index is None:
+                path = getattr(settings, self.snapshot_setting)
+                if os.path.exists(path):
+                    index = self._load(path)
+                    index.sync()
+                elif build:
+                    index = self._build()
+                else:
+                    return None
+                self._index = index
+            elif time.time() - (self._index.synced_at or 0) >= max_age:
+                self._index.sync()
+            return self._index
+
+    def loaded(self):
+        """The index if this process has loaded it, otherwise ``None``"""
+        return self._index
@@ -0,0 +1,231 @@
+"""
+Skill-match scoring engine.
+
+Users and active jobs are projected onto a shared skill vocabulary as sparse
+matrices (user x skill and job x skill), so scoring a user against the whole
+catalogue is a single sparse matrix product instead of a Python loop.
+"""
+import numpy as np
+from scipy import sparse
+
+REQUIRED_SKILL_WEIGHT = 1.0
+OPTIONAL_SKILL_WEIGHT = 0.5
+MAX_PROFICIENCY = 4
+EXPERIENCE_CAP_YEARS = 10.0
+DEFAULT_TOP_N = 10
+DEFAULT_BATCH_SIZE = 1000
+
+
+def proficiency_weight(proficiency, years):
+    """Map proficiency levels (1-4) and years of experience to weights in (0, 1]"""
+    proficiency = np.asarray(proficiency, dtype=np.float64) / MAX_PROFICIENCY
+    years = np.clip(np.asarray(years, dtype=np.float64), 0.0, EXPERIENCE_CAP_YEARS)
+    return proficiency * (0.75 + 0.25 * years / EXPERIENCE_CAP_YEARS)
+
+
+def top_n_from_row(job_ids, indices, scores, n):
+    """Return the ``n`` best ``(job_id, score)`` pairs from one sparse score row"""
+    if n < len(scores):
+        best = np.argpartition(-scores, n - 1)[:n]
+        indices, scores = indices[best], scores[best]
+    order = np.lexsort((job_ids[indices], -scores))
+    return [(int(job_ids[indices[i]]), float(scores[i])) for i in order]
+
+
+class SkillMatchEngine:
+    """
+    Scores users against active jobs by weighted skill coverage.
+
+    A job's skill row is normalised so its weights sum to one (required skills
+    count double optional ones), which keeps every score in ``[0, 1]``: the
+    share of the job's skill demand the user covers, discounted by the user's
+    proficiency and experience in each skill.
+    """
+
+    def __init__(self, skill_ids, job_ids, job_matrix):
+        self.skill_ids = np.asarray(skill_ids, dtype=np.int64)
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.job_matrix = sparse.csr_matrix(job_matrix, dtype=np.float64)
+
+        totals = np.asarray(self.job_matrix.sum(axis=1)).ravel()
+        inverse = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+        self.normalized_job_matrix = (sparse.diags(inverse) @ self.job_matrix).tocsr()
+        # Stored skill-major so a user's few skills touch only their own rows.
+        self._skill_job = self.normalized_job_matrix.T.tocsr()
+
+    @property
+    def shape(self):
+        return self.job_matrix.shape
+
+    @classmethod
+    def from_db(cls):
+        """Build the engine from ``Skill``, active ``Job`` and ``JobSkill`` rows"""
+        from apps.authentication.models import Skill
+        from apps.jobs.models import Job, JobSkill
+
+        skill_ids = np.fromiter(
+            Skill.objects.order_by('id').values_list('id', flat=True), dtype=np.int64
+        )
+        job_ids = np.fromiter(
+            Job.objects.filter(is_active=True).order_by('id').values_list('id', flat=True),
+            dtype=np.int64,
+        )
+        rows = np.array(
+            list(
+                JobSkill.objects.filter(job__is_active=True)
+                .values_list('job_id', 'skill_id', 'required')
+            ),
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        return cls.from_arrays(skill_ids, job_ids, rows[:, 0], rows[:, 1], rows[:, 2])
+
+    @classmethod
+    def from_arrays(cls, skill_ids, job_ids, row_job_ids, row_skill_ids, required):
+        """Build the engine from parallel ``JobSkill`` column arrays"""
+        skill_ids = np.asarray(skill_ids, dtype=np.int64)
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        job_pos, job_known = id_positions(job_ids, row_job_ids)
+        skill_pos, skill_known = id_positions(skill_ids, row_skill_ids)
+        known = job_known & skill_known
+
+        weights = np.where(
+            np.asarray(required, dtype=bool), REQUIRED_SKILL_WEIGHT, OPTIONAL_SKILL_WEIGHT
+        )[known]
+        matrix = sparse.coo_matrix(
+            (weights, (job_pos[known], skill_pos[known])),
+            shape=(len(job_ids), len(skill_ids)),
+        ).tocsr()
+        # Duplicate JobSkill rows collapse to a single required-strength entry.
+        matrix.data = np.minimum(matrix.data, REQUIRED_SKILL_WEIGHT)
+        return cls(skill_ids, job_ids, matrix)
+
+    def user_matrix(self, user_ids, row_user_ids, row_skill_ids, proficiency, years):
+        """Build a ``len(user_ids) x skills`` matrix from parallel ``UserSkill`` arrays"""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        order = np.argsort(user_ids)
+        user_pos, user_known = id_positions(user_ids[order], row_user_ids)
+        skill_pos, skill_known = id_positions(self.skill_ids, row_skill_ids)
+        known = user_known & skill_known
+
+        weights = proficiency_weight(proficiency, years)[known]
+        matrix = sparse.coo_matrix(
+            (weights, (order[user_pos[known]], skill_pos[known])),
+            shape=(len(user_ids), len(self.skill_ids)),
+        )
+        return matrix.tocsr()
+
+    def load_users(self, user_ids):
+        """Load the ``UserSkill`` rows of ``user_ids`` into a user x skill matrix"""
+        from apps.authentication.models import UserSkill
+
+        rows = list(
+            UserSkill.objects.filter(user_id__in=list(user_ids))
+            .values_list('user_id', 'skill_id', 'proficiency_level', 'years_of_experience')
+        )
+        row_user_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        row_skill_ids = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+        proficiency = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+        years = np.fromiter((float(r[3] or 0) for r in rows), dtype=np.float64, count=len(rows))
+        return self.user_matrix(user_ids, row_user_ids, row_skill_ids, proficiency, years)
+
+    def score(self, user_matrix):
+        """Score every active job for each row of ``user_matrix`` (sparse users x jobs)"""
+        return (sparse.csr_matrix(user_matrix) @ self._skill_job).tocsr()
+
+    def _candidate_rows(self, candidate_job_ids):
+        candidates = np.fromiter(candidate_job_ids, dtype=np.int64)
+        rows, known = id_positions(self.job_ids, candidates)
+        return np.unique(rows[known])
+
+    def top_n_for_matrix(self, user_matrix, n=DEFAULT_TOP_N, candidates=None):
+        """
+        Yield the top-``n`` ``(job_id, score)`` list for each row of
+        ``user_matrix``, scoring only the ``candidates`` job ids when given.
+        """
+        if candidates is None:
+            scores, job_ids = self.score(user_matrix), self.job_ids
+        else:
+            rows = self._candidate_rows(candidates)
+            scores = (sparse.csr_matrix(user_matrix) @ self.normalized_job_matrix[rows].T).tocsr()
+            job_ids = self.job_ids[rows]
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            yield top_n_from_row(
+                job_ids, scores.indices[start:end], scores.data[start:end], n
+            )
+
+    def top_n_among(self, user_vector, candidate_job_ids, n=DEFAULT_TOP_N):
+        """Score one user (a ``1 x skills`` matrix) against candidate jobs only"""
+        rows = self._candidate_rows(candidate_job_ids)
+        scores = self.normalized_job_matrix[rows] @ sparse.csr_matrix(user_vector).T
+        scores = scores.toarray().ravel()
+        matched = scores > 0
+        return top_n_from_row(self.job_ids, rows[matched], scores[matched], n)
+
+    def top_n(self, user_id, n=DEFAULT_TOP_N, candidates=None):
+        """
+        Return the top-``n`` ``(job_id, score)`` pairs for a single user,
+        optionally restricted to ``candidates`` from the candidate-generation
+        stage (see ``ml.skill_index``).
+        """
+        user_vector = self.load_users([user_id])
+        if candidates is not None:
+            return self.top_n_among(user_vector, candidates, n)
+        return next(self.top_n_for_matrix(user_vector, n))
+
+    def skill_overlaps(self, user_matrix, user_rows, job_ids):
+        """
+        Compare users with jobs pairwise: row ``user_rows[i]`` of
+        ``user_matrix`` with ``job_ids[i]``.
+
+        Returns CSR-style arrays ``(indptr, skill_ids, required, matched)``:
+        pair ``i`` owns entries ``indptr[i]:indptr[i + 1]``, one per skill
+        of its job, flagging whether the skill is required and whether the
+        user has it -- the terms :meth:`score` summed for the pair.
+        """
+        job_rows, _ = id_positions(self.job_ids, job_ids)
+        jobs = self.job_matrix[job_rows]
+        users = sparse.csr_matrix(user_matrix)[np.asarray(user_rows, dtype=np.int64)]
+        pair_of_entry = np.repeat(np.arange(jobs.shape[0]), np.diff(jobs.indptr))
+        matched = np.zeros(len(pair_of_entry), dtype=bool)
+        if len(pair_of_entry):
+            matched = np.asarray(users[pair_of_entry, jobs.indices]).ravel() > 0
+        return (
+            jobs.indptr,
+            self.skill_ids[jobs.indices],
+            jobs.data >= REQUIRED_SKILL_WEIGHT,
+            matched,
+        )
+
+    def score_users(self, user_ids=None, n=DEFAULT_TOP_N, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Yield ``(user_id, [(job_id, score), ...])`` for a whole population.
+
+        Users are scored ``batch_size`` at a time, one query and one matrix
+        product per batch. When ``user_ids`` is omitted every user with at
+        least one skill is scored.
+        """
+        if user_ids is None:
+            from apps.authentication.models import UserSkill
+
+            user_ids = (
+                UserSkill.objects.order_by('user_id')
+                .values_list('user_id', flat=True)
+                .distinct()
+            )
+        user_ids = np.fromiter(user_ids, dtype=np.int64)
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            matrix = self.load_users(batch.tolist())
+            for user_id, results in zip(batch, self.top_n_for_matrix(matrix, n)):
+                yield int(user_id), results
+
+
+def id_positions(sorted_ids, values):
+    """Map ``values`` onto indexes of ``sorted_ids``; returns ``(positions, found_mask)``"""
+    values = np.asarray(values, dtype=np.int64)
+    if not len(sorted_ids):
+        return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_ids, values)
+    positions = np.minimum(positions, len(sorted_ids) - 1)
+    return positions, sorted_ids[positions] == values
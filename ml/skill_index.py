@@ -0,0 +1,164 @@
+"""
+Inverted skill index for candidate generation.
+
+Maps ``Skill.id`` to the ids of active jobs that ask for it, so a user's
+candidate jobs are the union of the posting lists of their skills. The index
+is updated job by job as postings change and can be snapshotted to disk so
+new workers start warm.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from .job_index import JobIndex, ProcessIndex
+
+
+class SkillIndex(JobIndex):
+    """Posting lists from skill id to active job ids"""
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._job_skills = {}
+        self._lock = threading.RLock()
+        self.synced_at = None
+
+    def __len__(self):
+        return len(self._job_skills)
+
+    def __contains__(self, job_id):
+        return job_id in self._job_skills
+
+    def job_ids(self):
+        with self._lock:
+            return list(self._job_skills)
+
+    def add_job(self, job_id, skill_ids):
+        """Index ``job_id`` under ``skill_ids``, replacing any previous postings"""
+        skill_ids = frozenset(int(s) for s in skill_ids)
+        with self._lock:
+            self._discard(job_id)
+            self._job_skills[job_id] = skill_ids
+            for skill_id in skill_ids:
+                self._postings[skill_id].add(job_id)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            self._discard(job_id)
+
+    def _discard(self, job_id):
+        for skill_id in self._job_skills.pop(job_id, ()):
+            posting = self._postings.get(skill_id)
+            if posting is not None:
+                posting.discard(job_id)
+                if not posting:
+                    del self._postings[skill_id]
+
+    def jobs_for_skill(self, skill_id):
+        with self._lock:
+            return set(self._postings.get(skill_id, ()))
+
+    def candidates(self, skill_ids):
+        """Union of the posting lists of ``skill_ids``"""
+        with self._lock:
+            result = set()
+            for skill_id in skill_ids:
+                result.update(self._postings.get(skill_id, ()))
+            return result
+
+    def save(self, path):
+        """Write the index to ``path`` as a compressed-sparse-row ``.npz`` snapshot"""
+        with self._lock:
+            job_ids = np.array(sorted(self._job_skills), dtype=np.int64)
+            lengths = [len(self._job_skills[j]) for j in job_ids.tolist()]
+            indptr = np.zeros(len(job_ids) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=indptr[1:])
+            skill_ids = np.fromiter(
+                (s for j in job_ids.tolist() for s in sorted(self._job_skills[j])),
+                dtype=np.int64, count=int(indptr[-1]),
+            )
+            synced_at = self.synced_at or time.time()
+
+        directory = os.path.dirname(os.fspath(path)) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                np.savez(
+                    fh, job_ids=job_ids, indptr=indptr, skill_ids=skill_ids,
+                    synced_at=np.array(synced_at),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Load a snapshot written by :meth:`save`"""
+        index = cls()
+        with np.load(path) as data:
+            job_ids, indptr, skill_ids = data['job_ids'], data['indptr'], data['skill_ids']
+            for pos, job_id in enumerate(job_ids.tolist()):
+                index.add_job(job_id, skill_ids[indptr[pos]:indptr[pos + 1]].tolist())
+            index.synced_at = float(data['synced_at'])
+        return index
+
+    @classmethod
+    def from_db(cls):
+        """Build the index from every active job"""
+        from apps.jobs.models import Job
+
+        index = cls()
+        index.synced_at = time.time()
+        index.refresh_jobs(Job.objects.filter(is_active=True))
+        return index
+
+    def refresh_jobs(self, jobs):
+        """
+        Re-index ``jobs`` (a ``Job`` queryset) from their ``JobSkill`` rows,
+        which include the skills parsed from ``required_skills``/``tags``;
+        inactive jobs are removed.
+        """
+        from apps.jobs.models import JobSkill
+
+        queryset = jobs
+        jobs = list(queryset.values_list('id', 'is_active'))
+        if not jobs:
+            return
+
+        skills_by_job = defaultdict(set)
+        rows = JobSkill.objects.filter(job_id__in=queryset.values('id'))
+        for job_id, skill_id in rows.values_list('job_id', 'skill_id'):
+            skills_by_job[job_id].add(skill_id)
+
+        for job_id, is_active in jobs:
+            if not is_active:
+                self.remove_job(job_id)
+                continue
+            self.add_job(job_id, skills_by_job[job_id])
+
+
+_process_index = ProcessIndex(
+    SkillIndex.load, SkillIndex.from_db, 'SKILL_INDEX_SNAPSHOT', 'SKILL_INDEX_SYNC_INTERVAL'
+)
+
+
+def get_skill_index(max_age=None):
+    """
+    Return this process's skill index.
+
+    The first call loads the on-disk snapshot when there is one (falling back
+    to a full build); every call catches up with job changes made by other
+    processes once ``max_age`` seconds (``SKILL_INDEX_SYNC_INTERVAL`` by
+    default) have passed since the last sync.
+    """
+    return _process_index.get(max_age)
+
+
+def loaded_skill_index():
+    """The process's skill index if it has been loaded, otherwise ``None``"""
+    return _process_index.loaded()
@@ -0,0 +1,225 @@
+"""
+Ranking model training.
+
+Assembles (user, job) examples from applications and saves (positives) and
+from dismissed or ignored recommendations (negatives), derives skill-match
+features for them with the engine's sparse matrices, and fits a logistic
+ranking model with batch gradient descent. The reported metrics come from a
+stratified holdout the model was not fitted on.
+"""
+import numpy as np
+from scipy import sparse
+
+from .artifacts import ArtifactNotFound, get_artifact_store
+from .recommendation import SkillMatchEngine, id_positions
+
+FEATURE_NAMES = ('skill_match', 'required_coverage', 'optional_coverage', 'skill_count')
+RANKER_ARTIFACT = 'ranker'
+
+
+def _noop_progress(fraction, message):
+    pass
+
+
+def pair_features(engine, user_matrix, user_rows, job_rows):
+    """
+    Feature matrix (pairs x ``FEATURE_NAMES``) for users ``user_rows`` of
+    ``user_matrix`` paired with jobs ``job_rows`` of the engine.
+    """
+    users = sparse.csr_matrix(user_matrix)[user_rows]
+    has_skill = users.copy()
+    has_skill.data = np.ones_like(has_skill.data)
+
+    jobs = engine.job_matrix[job_rows]
+    required = jobs.copy()
+    required.data = (required.data >= 1.0).astype(np.float64)
+    optional = jobs.copy()
+    optional.data = (optional.data < 1.0).astype(np.float64)
+
+    def row_sums(matrix):
+        return np.asarray(matrix.sum(axis=1)).ravel()
+
+    def coverage(mask):
+        total = row_sums(mask)
+        covered = row_sums(has_skill.multiply(mask))
+        return np.divide(covered, total, out=np.zeros_like(total), where=total > 0)
+
+    skill_match = row_sums(users.multiply(engine.normalized_job_matrix[job_rows]))
+    skill_count = np.log1p(row_sums(has_skill))
+    return np.column_stack([skill_match, coverage(required), coverage(optional), skill_count])
+
+
+def assemble_training_set(engine):
+    """Return ``(features, labels)`` built from applications, feedback and recommendations"""
+    from apps.applications.models import Application
+    from apps.recommendations.models import Recommendation, RecommendationFeedback
+
+    feedback = RecommendationFeedback.objects.values_list('user_id', 'job_id')
+    positives = set(Application.objects.values_list('user_id', 'job_id'))
+    positives.update(feedback.filter(event__in=[
+        RecommendationFeedback.EVENT_SAVE, RecommendationFeedback.EVENT_APPLY,
+    ]))
+    negatives = set(Recommendation.objects.values_list('user_id', 'job_id'))
+    negatives.update(feedback.filter(event=RecommendationFeedback.EVENT_DISMISS))
+    negatives -= positives
+    pairs = np.array(sorted(positives) + sorted(negatives), dtype=np.int64).reshape(-1, 2)
+    labels = np.concatenate([np.ones(len(positives)), np.zeros(len(negatives))])
+
+    job_rows, known = id_positions(engine.job_ids, pairs[:, 1])
+    pairs, labels, job_rows = pairs[known], labels[known], job_rows[known]
+
+    user_ids = np.unique(pairs[:, 0])
+    user_rows = np.searchsorted(user_ids, pairs[:, 0])
+    user_matrix = engine.load_users(user_ids.tolist())
+    return pair_features(engine, user_matrix, user_rows, job_rows), labels
+
+
+def train_logistic(features, labels, epochs=500, learning_rate=0.5, l2=1e-3):
+    """
+    Fit class-balanced, L2-regularised logistic regression.
+
+    Returns ``(weights, bias, mean, scale)``; inputs are standardised with
+    ``mean``/``scale`` before the weights apply.
+    """
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    x = (features - mean) / scale
+
+    positives = max(labels.sum(), 1.0)
+    negatives = max(len(labels) - labels.sum(), 1.0)
+    sample_weight = np.where(labels == 1, len(labels) / (2 * positives), len(labels) / (2 * negatives))
+
+    weights = np.zeros(x.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        predictions = _sigmoid(x @ weights + bias)
+        error = (predictions - labels) * sample_weight
+        weights -= learning_rate * (x.T @ error / len(labels) + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return weights, bias, mean, scale
+
+
+def split_holdout(labels, fraction, seed=0):
+    """
+    Mask of held-out examples: ``fraction`` of each class, at least one of
+    every class with two or more examples, and never a class's last one.
+    """
+    rng = np.random.default_rng(seed)
+    holdout = np.zeros(len(labels), dtype=bool)
+    for value in (0, 1):
+        members = np.flatnonzero(labels == value)
+        count = int(round(len(members) * fraction))
+        if fraction > 0 and len(members) > 1:
+            count = max(count, 1)
+        count = min(count, len(members) - 1)
+        if count > 0:
+            holdout[rng.choice(members, size=count, replace=False)] = True
+    return holdout
+
+
+def evaluate(features, labels, weights, bias, mean, scale):
+    if not len(labels):
+        return {'examples': 0, 'positives': 0, 'log_loss': None, 'auc': None}
+    predictions = _sigmoid(((features - mean) / scale) @ weights + bias)
+    eps = 1e-12
+    log_loss = -np.mean(labels * np.log(predictions + eps) + (1 - labels) * np.log(1 - predictions + eps))
+    return {
+        'examples': int(len(labels)),
+        'positives': int(labels.sum()),
+        'log_loss': float(log_loss),
+        'auc': _auc(labels, predictions),
+    }
+
+
+def train_ranker(artifact_root=None, progress=_noop_progress, keep_versions=None, holdout=0.2):
+    """
+    Train the ranking model on all but a ``holdout`` share of the examples
+    and activate it as a new artifact version under ``artifact_root``.
+    Returns ``(version, metrics)``, the metrics measured on the holdout.
+    """
+    progress(0.05, 'Loading skill matrices')
+    engine = SkillMatchEngine.from_db()
+
+    progress(0.25, 'Assembling training examples')
+    features, labels = assemble_training_set(engine)
+    if not len(labels) or labels.min() == labels.max():
+        raise ValueError('Training needs both applied and non-applied recommendations')
+
+    progress(0.5, 'Fitting ranking model')
+    held_out = split_holdout(labels, holdout)
+    weights, bias, mean, scale = train_logistic(features[~held_out], labels[~held_out])
+    metrics = evaluate(features[held_out], labels[held_out], weights, bias, mean, scale)
+    metrics['training_examples'] = int((~held_out).sum())
+
+    progress(0.9, 'Writing model artifact')
+    store = get_artifact_store(RANKER_ARTIFACT, artifact_root)
+    version = store.save(
+        {'weights': weights, 'mean': mean, 'scale': scale},
+        {'bias': float(bias), 'features': FEATURE_NAMES, 'metrics': metrics},
+    )
+    if keep_versions:
+        store.prune(keep_versions)
+    return version, metrics
+
+
+class Ranker:
+    """A trained ranking model backed by a (memory-mapped) artifact"""
+
+    def __init__(self, artifact):
+        self.version = artifact.version
+        self.weights = artifact['weights']
+        self.mean = artifact['mean']
+        self.scale = artifact['scale']
+        self.bias = artifact.meta['bias']
+
+    def predict(self, features):
+        """Probability of an application for each row of ``features``"""
+        return _sigmoid(((features - self.mean) / self.scale) @ self.weights + self.bias)
+
+    def rerank(self, engine, user_matrix, results, n):
+        """
+        Reorder ``results`` -- one list of ``(job_id, score)`` candidates per
+        row of ``user_matrix`` -- by predicted application probability and
+        keep the best ``n`` of each, scored by that probability.
+        """
+        user_rows = np.repeat(np.arange(len(results)), [len(pairs) for pairs in results])
+        job_ids = np.fromiter(
+            (job_id for pairs in results for job_id, _ in pairs), dtype=np.int64, count=len(user_rows)
+        )
+        if not len(job_ids):
+            return [[] for _ in results]
+        job_rows, _ = id_positions(engine.job_ids, job_ids)
+        predictions = self.predict(pair_features(engine, user_matrix, user_rows, job_rows))
+
+        reranked, start = [], 0
+        for pairs in results:
+            end = start + len(pairs)
+            best = sorted(range(start, end), key=lambda i: (-predictions[i], job_ids[i]))[:n]
+            reranked.append([(int(job_ids[i]), float(predictions[i])) for i in best])
+            start = end
+        return reranked
+
+
+def active_ranker(artifact_root=None):
+    """The active ranking model, or ``None`` before one has been trained"""
+    try:
+        artifact = get_artifact_store(RANKER_ARTIFACT, artifact_root).current()
+    except ArtifactNotFound:
+        return None
+    return Ranker(artifact) if artifact is not None else None
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def _auc(labels, predictions):
+    """Area under the ROC curve via the rank-sum statistic"""
+    positives = labels == 1
+    n_pos, n_neg = positives.sum(), (~positives).sum()
+    if not n_pos or not n_neg:
+        return None
+    ranks = np.empty(len(predictions))
+    ranks[np.argsort(predictions, kind='mergesort')] = np.arange(1, len(predictions) + 1)
+    return float((ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))